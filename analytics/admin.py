@@ -10,10 +10,24 @@ class ScrapeMetricsInline(admin.StackedInline):
 
     readonly_fields = (
         "total_urls_discovered",
+        "search_cache_hits",
+        "search_cache_misses",
         "unsafe_quotes_extracted",
         "safe_quotes_extracted",
         "unique_quotes",
         "scrape_duration",
+        "http_cache_hits",
+        "http_cache_revalidated",
+        "http_cache_misses",
+        "browser_pages_rendered",
+        "browser_wait_seconds",
+        "browser_utilization",
+        "browser_ready_seconds",
+        "db_rows_written",
+        "db_write_seconds",
+        "db_rows_per_second",
+        "moderation_requests",
+        "moderation_requests_saved",
         "timestamp",
     )
 
@@ -27,6 +41,11 @@ class TrainingMetricsInline(admin.StackedInline):
         "total_quotes_used",
         "quotes_removed",
         "dataset_size_kb",
+        "db_rows_written",
+        "db_write_seconds",
+        "db_rows_per_second",
+        "moderation_requests",
+        "moderation_requests_saved",
         "fine_tune_start",
         "fine_tune_end",
         "duration_minutes",
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_rewrittenquote'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='http_cache_hits',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='http_cache_misses',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='http_cache_revalidated',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0005_scrapemetrics_http_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='browser_pages_rendered',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='browser_utilization',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='browser_wait_seconds',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
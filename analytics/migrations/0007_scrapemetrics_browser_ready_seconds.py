@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_scrapemetrics_browser_pool'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='browser_ready_seconds',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
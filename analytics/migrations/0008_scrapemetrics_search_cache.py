@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0007_scrapemetrics_browser_ready_seconds'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='search_cache_hits',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='search_cache_misses',
+            field=models.IntegerField(default=0),
+        ),
+    ]
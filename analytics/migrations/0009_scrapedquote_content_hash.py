@@ -0,0 +1,42 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:52
+
+import hashlib
+import re
+
+from django.db import migrations, models
+
+# Frozen copy of scraper.scrape_scripts.near_dup.fingerprint as of this migration,
+# so later changes to the live normalization don't change what the backfill computes
+ATTRIBUTION = re.compile(r"\s*(?:[–—―~]+|\s-+)\s*[\w .,'()]{1,40}$")
+NON_WORD = re.compile(r"[^\w\s]+")
+SPACES = re.compile(r"\s+")
+
+
+def fingerprint(text):
+    text = ATTRIBUTION.sub("", text.strip())
+    text = NON_WORD.sub(" ", text.lower())
+    return hashlib.sha1(SPACES.sub(" ", text).strip().encode("utf-8")).hexdigest()
+
+
+def backfill_content_hash(apps, schema_editor):
+    ScrapedQuote = apps.get_model("analytics", "ScrapedQuote")
+    rows = list(ScrapedQuote.objects.filter(content_hash="").only("id", "quote"))
+    for row in rows:
+        row.content_hash = fingerprint(row.quote)
+    ScrapedQuote.objects.bulk_update(rows, ["content_hash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0008_scrapemetrics_search_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapedquote',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=40),
+        ),
+        migrations.RunPython(backfill_content_hash, migrations.RunPython.noop),
+    ]
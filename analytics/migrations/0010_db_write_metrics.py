@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_scrapedquote_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='db_rows_per_second',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='db_rows_written',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='db_write_seconds',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='trainingmetrics',
+            name='db_rows_per_second',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddField(
+            model_name='trainingmetrics',
+            name='db_rows_written',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trainingmetrics',
+            name='db_write_seconds',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
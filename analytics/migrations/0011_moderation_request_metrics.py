@@ -0,0 +1,33 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0010_db_write_metrics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='moderation_requests',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='scrapemetrics',
+            name='moderation_requests_saved',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trainingmetrics',
+            name='moderation_requests',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='trainingmetrics',
+            name='moderation_requests_saved',
+            field=models.IntegerField(default=0),
+        ),
+    ]
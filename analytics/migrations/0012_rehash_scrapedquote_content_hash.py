@@ -0,0 +1,33 @@
+import hashlib
+import re
+
+from django.db import migrations
+
+# Frozen copy of scraper.scrape_scripts.near_dup.fingerprint as of this migration:
+# the attribution strip is no longer part of the hash
+NON_WORD = re.compile(r"[^\w\s]+")
+SPACES = re.compile(r"\s+")
+
+
+def fingerprint(text):
+    text = NON_WORD.sub(" ", text.lower())
+    return hashlib.sha1(SPACES.sub(" ", text).strip().encode("utf-8")).hexdigest()
+
+
+def rehash_content_hash(apps, schema_editor):
+    ScrapedQuote = apps.get_model("analytics", "ScrapedQuote")
+    rows = list(ScrapedQuote.objects.only("id", "quote"))
+    for row in rows:
+        row.content_hash = fingerprint(row.quote)
+    ScrapedQuote.objects.bulk_update(rows, ["content_hash"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0011_moderation_request_metrics'),
+    ]
+
+    operations = [
+        migrations.RunPython(rehash_content_hash, migrations.RunPython.noop),
+    ]
@@ -1,22 +1,38 @@
 from django.db import models
 
 from scraper.models import Character
+from scraper.scrape_scripts.near_dup import fingerprint
 from training.models import TrainedModel
 
 # Create your models here.
 class ScrapeMetrics(models.Model):
     character = models.OneToOneField("scraper.Character", on_delete=models.CASCADE, related_name="scrape_metrics")
     total_urls_discovered = models.IntegerField(default=0)
+    search_cache_hits = models.IntegerField(default=0)
+    search_cache_misses = models.IntegerField(default=0)
     unsafe_quotes_extracted = models.IntegerField(default=0)
     safe_quotes_extracted = models.IntegerField(default=0)
     unique_quotes = models.IntegerField(default=0)
     scrape_duration = models.FloatField(default=0.0)
+    http_cache_hits = models.IntegerField(default=0)
+    http_cache_revalidated = models.IntegerField(default=0)
+    http_cache_misses = models.IntegerField(default=0)
+    browser_pages_rendered = models.IntegerField(default=0)
+    browser_wait_seconds = models.FloatField(default=0.0)
+    browser_utilization = models.FloatField(default=0.0)
+    browser_ready_seconds = models.FloatField(default=0.0)
+    db_rows_written = models.IntegerField(default=0)
+    db_write_seconds = models.FloatField(default=0.0)
+    db_rows_per_second = models.FloatField(default=0.0)
+    moderation_requests = models.IntegerField(default=0)
+    moderation_requests_saved = models.IntegerField(default=0)  # by the offline pre-filter
     timestamp = models.DateTimeField(auto_now_add=True)
 
 class ScrapedQuote(models.Model):
     character = models.ForeignKey("scraper.Character", on_delete=models.CASCADE, related_name="scraped_quotes")
     source_url = models.URLField()
     quote = models.TextField()
+    content_hash = models.CharField(max_length=40, db_index=True, blank=True)  # near_dup.fingerprint(quote)
 
     is_safe = models.BooleanField(default=True)  # Passed moderation
     timestamp = models.DateTimeField(auto_now_add=True)
@@ -24,6 +40,11 @@ class ScrapedQuote(models.Model):
     class Meta:
         ordering = ["-timestamp"]
 
+    def save(self, *args, **kwargs):
+        if not self.content_hash:
+            self.content_hash = fingerprint(self.quote)
+        super().save(*args, **kwargs)
+
 class TrainingMetrics(models.Model):
     trained_model = models.OneToOneField(
         "training.TrainedModel",
@@ -35,6 +56,11 @@ class TrainingMetrics(models.Model):
     quotes_removed = models.IntegerField(default=0)
     dataset_size_kb = models.FloatField(default=0.0)
     rewritten_preview = models.JSONField(default=list, blank=True)
+    db_rows_written = models.IntegerField(default=0)
+    db_write_seconds = models.FloatField(default=0.0)
+    db_rows_per_second = models.FloatField(default=0.0)
+    moderation_requests = models.IntegerField(default=0)
+    moderation_requests_saved = models.IntegerField(default=0)  # by the offline pre-filter
 
     fine_tune_start = models.DateTimeField(null=True, blank=True)
     fine_tune_end = models.DateTimeField(null=True, blank=True)
@@ -43,6 +43,52 @@ SERPAPI_KEY = env('SERPAPI_KEY')
 OPENAI_KEY = env('OPENAI_KEY')
 OPENAI_WEBHOOK_SECRET = env('OPENAI_WEBHOOK_SECRET')
 
+# Scraper
+SCRAPER_FETCH_ENGINE = env('SCRAPER_FETCH_ENGINE', default='threads')  # "threads" or "async"
+SCRAPER_ASYNC_MAX_IN_FLIGHT = env.int('SCRAPER_ASYNC_MAX_IN_FLIGHT', default=200)
+SCRAPER_ASYNC_PER_HOST = env.int('SCRAPER_ASYNC_PER_HOST', default=4)
+SCRAPER_MAX_PAGE_BYTES = env.int('SCRAPER_MAX_PAGE_BYTES', default=3 * 1024 * 1024)
+SCRAPER_HTML_PARSER = env('SCRAPER_HTML_PARSER', default='auto')  # auto / selectolax / lxml / html.parser
+SCRAPER_BROWSER_POOL_SIZE = env.int('SCRAPER_BROWSER_POOL_SIZE', default=2)
+SCRAPER_BROWSER_MAX_PAGES = env.int('SCRAPER_BROWSER_MAX_PAGES', default=50)  # recycle a driver after N pages
+SCRAPER_DISCOVERY_QUERY_VARIANTS = env.int('SCRAPER_DISCOVERY_QUERY_VARIANTS', default=3)
+SCRAPER_DISCOVERY_PAGES = env.int('SCRAPER_DISCOVERY_PAGES', default=2)  # SerpAPI result pages per query
+SCRAPER_SEARCH_CACHE_TTL = env.int('SCRAPER_SEARCH_CACHE_TTL', default=7 * 24 * 60 * 60)  # seconds
+SCRAPER_CACHE_DIR = env('SCRAPER_CACHE_DIR', default=str(BASE_DIR / 'scraper' / 'cache'))
+SCRAPER_HTTP_CACHE_TTL = env.int('SCRAPER_HTTP_CACHE_TTL', default=24 * 60 * 60)  # seconds
+SCRAPER_HTTP_CACHE_MAX_MB = env.int('SCRAPER_HTTP_CACHE_MAX_MB', default=256)
+SCRAPER_NEAR_DUP_THRESHOLD = env.float('SCRAPER_NEAR_DUP_THRESHOLD', default=0.8)  # Jaccard on quote shingles
+SCRAPER_REFRESH_MIN_AGE_HOURS = env.int('SCRAPER_REFRESH_MIN_AGE_HOURS', default=24)  # refresh skips URLs scraped more recently
+
+# Moderation
+MODERATION_MODEL = env('MODERATION_MODEL', default='omni-moderation-latest')
+MODERATION_BATCH_SIZE = env.int('MODERATION_BATCH_SIZE', default=32)  # inputs per request
+MODERATION_CONCURRENCY = env.int('MODERATION_CONCURRENCY', default=4)  # requests in flight
+MODERATION_CACHE_TTL_DAYS = env.int('MODERATION_CACHE_TTL_DAYS', default=30)  # cached verdicts older than this are re-checked
+MODERATION_PREFILTER = env.bool('MODERATION_PREFILTER', default=True)  # flag blocklist hits offline before the API
+MODERATION_PREFILTER_LOCAL_SAFE = env.bool('MODERATION_PREFILTER_LOCAL_SAFE', default=False)  # also pass narrow positive lines offline
+MODERATION_PREFILTER_SAFE_BELOW = env.float('MODERATION_PREFILTER_SAFE_BELOW', default=0.2)  # risk score under which such a line is safe
+MODERATION_BLOCKLIST_PATH = env('MODERATION_BLOCKLIST_PATH', default='')  # extra blocked terms, one per line
+
+# OpenAI
+OPENAI_REQUESTS_PER_MINUTE = env.int('OPENAI_REQUESTS_PER_MINUTE', default=500)  # client-side budget for chat calls
+OPENAI_TOKENS_PER_MINUTE = env.int('OPENAI_TOKENS_PER_MINUTE', default=200000)
+OPENAI_BASE_URL = env('OPENAI_BASE_URL', default='')  # e.g. the local stub: manage.py openai_stub
+OPENAI_BATCH_POLL_SECONDS = env.int('OPENAI_BATCH_POLL_SECONDS', default=30)
+OPENAI_BATCH_TIMEOUT_SECONDS = env.int('OPENAI_BATCH_TIMEOUT_SECONDS', default=24 * 60 * 60)
+REWRITE_CONCURRENCY = env.int('REWRITE_CONCURRENCY', default=8)  # rewrite requests in flight
+REWRITE_MODE = env('REWRITE_MODE', default='sync')  # "sync" or "batch" (Batch API, for overnight runs)
+
+# Persistence
+BULK_WRITE_CHUNK_SIZE = env.int('BULK_WRITE_CHUNK_SIZE', default=500)  # rows per bulk_create / transaction
+
+# Jobs
+JOBS_WORKER_CONCURRENCY = env.int('JOBS_WORKER_CONCURRENCY', default=2)  # manage.py run_worker threads
+JOBS_LEASE_SECONDS = env.int('JOBS_LEASE_SECONDS', default=60)
+JOBS_POLL_SECONDS = env.float('JOBS_POLL_SECONDS', default=2.0)
+JOBS_PROGRESS_FLUSH_SECONDS = env.float('JOBS_PROGRESS_FLUSH_SECONDS', default=0.5)  # progress DB writes per job
+JOBS_EVENTS_SECONDS = env.float('JOBS_EVENTS_SECONDS', default=1.0)  # progress stream: one query per web process
+
 # Database
 DATABASES = {
     'default': env.db(),  # reads DATABASE_URL
@@ -67,6 +113,7 @@ INSTALLED_APPS = [
     'selection',
     'chat',
     'analytics',
+    'jobs',
     'crispy_forms',
     'crispy_bootstrap5',
 ]
@@ -23,6 +23,7 @@ import training.views as training_views
 import selection.views as selection_views
 import chat.views as chat_views
 import analytics.views as analytics_views
+import jobs.views as jobs_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -45,5 +46,8 @@ urlpatterns = [
     path('session/<int:session_id>/send/', chat_views.send_message, name='send_message'),
     path('session/<int:session_id>/clear/', chat_views.clear_chat, name='clear_chat'),
 
+    path("jobs/<int:job_id>/", jobs_views.job_status, name="job_status"),
+    path("jobs/<int:job_id>/events/", jobs_views.job_events, name="job_events"),
+
     path("openai/webhook/", training_views.openai_webhook, name="openai_webhook"),
 ]
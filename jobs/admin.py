@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "status", "attempts", "leased_by", "created_at", "finished_at")
+    list_filter = ("kind", "status")
+    readonly_fields = ("created_at", "started_at", "finished_at", "lease_expires", "leased_by")
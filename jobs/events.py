@@ -0,0 +1,118 @@
+"""
+Server push of job progress to the progress card (jobs.views.job_events).
+
+A job runs in the run_worker process and publishes through Job.progress
+(jobs.progress writes it at most every JOBS_PROGRESS_FLUSH_SECONDS); there
+is no broker between that process and the web process. So instead of every
+open page polling its own row, each web process runs one watcher task on
+its event loop: while anyone is subscribed it reads all watched jobs in a
+single query every JOBS_EVENTS_SECONDS and pushes the snapshots that
+changed to the subscribers. DB reads grow with the interval, not with the
+number of open pages, and an open stream costs a queue on the loop, not a
+worker thread (serve through core/asgi.py).
+"""
+
+import asyncio
+import json
+import weakref
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Job
+
+INTERVAL = getattr(settings, "JOBS_EVENTS_SECONDS", 1.0)
+KEEPALIVE_SECONDS = 15  # comment line on a quiet stream, so proxies keep it open
+
+
+def as_dict(job):
+    """The job snapshot sent by job_status and the event stream."""
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "done": job.done,
+        "attempts": job.attempts,
+        "result": job.result,
+        "progress": job.progress,
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _offer(queue, payload):
+    # Only the latest snapshot matters to a slow reader
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(payload)
+
+
+class Watcher:
+    def __init__(self, interval=None):
+        self.interval = INTERVAL if interval is None else interval
+        self.subscribers = {}  # job id -> set of queues
+        self.task = None
+
+    def subscribe(self, job_id):
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers.setdefault(job_id, set()).add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._run())
+        return queue
+
+    def unsubscribe(self, job_id, queue):
+        queues = self.subscribers.get(job_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self.subscribers[job_id]
+
+    async def _run(self):
+        last = {}
+        while self.subscribers:
+            async for job in Job.objects.filter(id__in=list(self.subscribers)):
+                payload = as_dict(job)
+                if last.get(job.id) != payload:
+                    last[job.id] = payload
+                    for queue in self.subscribers.get(job.id, ()):
+                        _offer(queue, payload)
+            await asyncio.sleep(self.interval)
+
+
+_watchers = weakref.WeakKeyDictionary()  # event loop -> Watcher
+
+
+def get_watcher():
+    """The watcher of the running event loop."""
+    loop = asyncio.get_running_loop()
+    watcher = _watchers.get(loop)
+    if watcher is None:
+        watcher = _watchers[loop] = Watcher()
+    return watcher
+
+
+def _event(payload):
+    return f"data: {json.dumps(payload, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def stream(job):
+    """Server-Sent Events for job: its current snapshot, then every change until it is done."""
+    yield "retry: 2000\n\n"
+    payload = as_dict(job)
+    yield _event(payload)
+    if payload["done"]:
+        return
+    watcher = get_watcher()
+    queue = watcher.subscribe(job.id)
+    try:
+        while not payload["done"]:
+            try:
+                payload = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _event(payload)
+    finally:
+        watcher.unsubscribe(job.id, queue)
@@ -0,0 +1,42 @@
+"""
+What each Job.kind runs. A handler takes the job params as keyword
+arguments and returns a JSON-serializable result; result_url is where the
+progress page sends the browser once the job has succeeded.
+"""
+
+from django.urls import reverse
+
+from scraper.models import Character
+from scraper.scrape_scripts.scraper_manager import ScraperManager
+from training.models import TrainedModel
+from training.openAI.trainer_manager import TrainerManager
+
+
+def scrape(character, refresh=False):
+    scrape_time = ScraperManager(character_name=character, refresh=refresh).scrape()
+    return {
+        "character": character,
+        "scrape_time": scrape_time,
+        "result_url": reverse("scrape_results", args=[character.strip()]),
+    }
+
+
+def train(character):
+    character = Character.objects.get(name=character)
+    out = TrainerManager(character).train_model()
+    if out is None:
+        # Only one model per character: point at the one that exists
+        model = TrainedModel.objects.get(character=character)
+    else:
+        model, _ = out
+    return {
+        "character": character.name,
+        "model_id": model.id,
+        "result_url": reverse("train_results", args=[model.id]),
+    }
+
+
+HANDLERS = {
+    "scrape": scrape,
+    "train": train,
+}
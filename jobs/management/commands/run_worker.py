@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs.runner import LEASE_SECONDS, POLL_SECONDS, Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued scrape / train jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=getattr(settings, "JOBS_WORKER_CONCURRENCY", 2),
+                            help="Jobs run at the same time (threads).")
+        parser.add_argument("--lease", type=int, default=LEASE_SECONDS,
+                            help="Seconds before a job of a dead worker is handed out again.")
+        parser.add_argument("--poll", type=float, default=POLL_SECONDS,
+                            help="Seconds between queue polls when idle.")
+        parser.add_argument("--once", action="store_true",
+                            help="Exit once the queue is empty.")
+
+    def handle(self, *args, **options):
+        worker = Worker(concurrency=options["concurrency"], lease_seconds=options["lease"],
+                        poll_seconds=options["poll"])
+        self.stdout.write(f"👷 Worker {worker.name} started ({worker.concurrency} threads)")
+        worker.run(once=options["once"])
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0002_job_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='active_key',
+            field=models.CharField(blank=True, max_length=160, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,39 @@
+from django.db import models
+
+# Create your models here.
+
+class Job(models.Model):
+    """A queued scrape / train run, executed by `manage.py run_worker`."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [(s, s) for s in (QUEUED, RUNNING, SUCCEEDED, FAILED)]
+
+    kind = models.CharField(max_length=50)          # key in jobs.runner.HANDLERS
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    result = models.JSONField(default=dict, blank=True)
+    progress = models.JSONField(default=dict, blank=True)  # jobs.progress snapshot: stage, done / total, counters
+    error = models.TextField(blank=True)
+
+    attempts = models.IntegerField(default=0)
+    max_attempts = models.IntegerField(default=3)
+    leased_by = models.CharField(max_length=100, blank=True)
+    lease_expires = models.DateTimeField(null=True, blank=True)  # a crashed worker's job is re-leased after this
+    # "<kind>:<character>" while queued / running, None once finished: at most one active job per pair
+    active_key = models.CharField(max_length=160, null=True, blank=True, unique=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at"]
+
+    @property
+    def done(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
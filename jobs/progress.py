@@ -0,0 +1,119 @@
+"""
+Live progress of the running job, pushed to the progress card by jobs.events.
+
+Pipeline code calls report() / advance() wherever it used to only print:
+
+    progress.report("moderate", done=0, total=len(rows))
+    progress.advance()
+
+Outside a job (shell, management commands) both are no-ops. Inside one,
+updates land in memory under a lock, from any thread, and a single flusher
+thread writes the snapshot to Job.progress at most every FLUSH_SECONDS, so
+per-quote updates never become per-quote DB writes.
+
+Worker pools started by the pipeline do not inherit the context; grab
+current() on the calling thread and use the reporter from the pool.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+
+from .models import Job
+
+FLUSH_SECONDS = getattr(settings, "JOBS_PROGRESS_FLUSH_SECONDS", 0.5)
+
+_current = contextvars.ContextVar("job_progress", default=None)
+
+
+class ProgressReporter:
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.state = {"stage": None, "message": "", "done": 0, "total": 0, "counters": {}, "stages": []}
+        self._lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+
+    def report(self, stage=None, done=None, total=None, message=None, **counters):
+        """Set the stage / counters; a new stage resets done, total and message."""
+        with self._lock:
+            s = self.state
+            if stage and stage != s["stage"]:
+                s.update(stage=stage, done=0, total=0, message="")
+                s["stages"].append(stage)
+            if done is not None:
+                s["done"] = done
+            if total is not None:
+                s["total"] = total
+            if message is not None:
+                s["message"] = message
+            s["counters"].update(counters)
+        self._dirty.set()
+
+    def advance(self, n=1, **counters):
+        """done += n, and each given counter += its value."""
+        with self._lock:
+            s = self.state
+            s["done"] += n
+            for name, value in counters.items():
+                s["counters"][name] = s["counters"].get(name, 0) + value
+        self._dirty.set()
+
+    def snapshot(self):
+        with self._lock:
+            return {**self.state, "counters": dict(self.state["counters"]), "stages": list(self.state["stages"])}
+
+    def flush(self):
+        self._dirty.clear()
+        Job.objects.filter(pk=self.job_id).update(progress=self.snapshot())
+
+    def _flush_loop(self):
+        try:
+            while not self._stop.is_set():
+                if self._dirty.wait(FLUSH_SECONDS):
+                    self.flush()
+                    self._stop.wait(FLUSH_SECONDS)
+        finally:
+            connection.close()
+
+    def start(self):
+        self._flusher.start()
+
+    def stop(self):
+        self._stop.set()
+        self._flusher.join()
+        self.flush()
+
+
+@contextmanager
+def tracking(job):
+    """Route report() / advance() on this thread to job while the block runs."""
+    reporter = ProgressReporter(job.id)
+    reporter.start()
+    token = _current.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _current.reset(token)
+        reporter.stop()
+
+
+def current():
+    """The reporter of the job running on this thread, or None."""
+    return _current.get()
+
+
+def report(stage=None, done=None, total=None, message=None, **counters):
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.report(stage, done, total, message, **counters)
+
+
+def advance(n=1, **counters):
+    reporter = _current.get()
+    if reporter is not None:
+        reporter.advance(n, **counters)
@@ -0,0 +1,168 @@
+"""
+DB-backed job queue for the scrape / train pipelines.
+
+Views enqueue() a Job and return straight away; `manage.py run_worker`
+claims jobs and runs them on a few threads. A job for a character that
+already has one of the same kind queued or running is not created twice:
+enqueue() returns the active one (Job.active_key is unique, so this holds
+for concurrent submits too).
+
+Claiming is a compare-and-swap UPDATE on the job row (status, lease and
+attempt count must still be what the worker read), so two workers never
+run the same job, on any database backend including SQLite. A running job
+holds a lease that its worker renews every lease/3 seconds; if the worker
+process dies the lease runs out and another worker picks the job up
+again, until max_attempts is used up.
+"""
+
+import os
+import socket
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import progress
+from .models import Job
+
+LEASE_SECONDS = getattr(settings, "JOBS_LEASE_SECONDS", 60)
+POLL_SECONDS = getattr(settings, "JOBS_POLL_SECONDS", 2.0)
+CLAIM_BATCH = 10  # candidate rows looked at per claim attempt
+
+
+def active_key(kind, params):
+    character = params.get("character")
+    return f"{kind}:{character.lower()}" if character else None
+
+
+def enqueue(kind, max_attempts=3, **params):
+    """A new queued Job, or the one of this kind already queued / running for params["character"]."""
+    from .handlers import HANDLERS
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind!r}")
+    key = active_key(kind, params)
+    while True:
+        try:
+            with transaction.atomic():
+                return Job.objects.create(kind=kind, params=params, max_attempts=max_attempts, active_key=key)
+        except IntegrityError:
+            active = Job.objects.filter(active_key=key).first()
+            # None: it finished between the insert and this read, so try again
+            if active is not None:
+                return active
+
+
+def claim(worker_id, lease_seconds=LEASE_SECONDS):
+    """Lease the oldest runnable job (queued, or running on an expired lease) to worker_id."""
+    now = timezone.now()
+    runnable = Q(status=Job.QUEUED) | Q(status=Job.RUNNING, lease_expires__lt=now)
+    for job in Job.objects.filter(runnable).order_by("created_at")[:CLAIM_BATCH]:
+        unchanged = Job.objects.filter(
+            pk=job.pk, status=job.status, lease_expires=job.lease_expires, attempts=job.attempts,
+        )
+        if job.attempts >= job.max_attempts:
+            # Its last worker died mid-run; do not try again
+            unchanged.update(status=Job.FAILED, finished_at=now, lease_expires=None, active_key=None,
+                             error=f"Worker {job.leased_by} stopped renewing its lease")
+            continue
+        if unchanged.update(status=Job.RUNNING, leased_by=worker_id, attempts=F("attempts") + 1,
+                            lease_expires=now + timedelta(seconds=lease_seconds), started_at=now):
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def renew(job, worker_id, lease_seconds=LEASE_SECONDS):
+    """Extend the lease; False if another worker has taken the job over."""
+    return bool(Job.objects.filter(pk=job.pk, status=Job.RUNNING, leased_by=worker_id).update(
+        lease_expires=timezone.now() + timedelta(seconds=lease_seconds)))
+
+
+def finish(job, worker_id, result=None, error=None):
+    """Record the outcome, unless the lease was lost meanwhile."""
+    return bool(Job.objects.filter(pk=job.pk, status=Job.RUNNING, leased_by=worker_id).update(
+        status=Job.FAILED if error else Job.SUCCEEDED,
+        result=result or {},
+        error=error or "",
+        lease_expires=None,
+        active_key=None,
+        finished_at=timezone.now(),
+    ))
+
+
+class Worker:
+    """Runs jobs on `concurrency` threads, each with its own lease heartbeat."""
+
+    def __init__(self, concurrency=1, lease_seconds=LEASE_SECONDS, poll_seconds=POLL_SECONDS):
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.stop = threading.Event()
+
+    def run(self, once=False):
+        """Process jobs until stopped (or, with once, until the queue is empty)."""
+        threads = [
+            threading.Thread(target=self._loop, args=(f"{self.name}/{i}", once), daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.5)
+        except KeyboardInterrupt:
+            print("🛑 Stopping worker, waiting for running jobs")
+            self.stop.set()
+            for t in threads:
+                t.join()
+
+    def _loop(self, worker_id, once):
+        try:
+            while not self.stop.is_set():
+                job = claim(worker_id, self.lease_seconds)
+                if job is None:
+                    if once:
+                        return
+                    self.stop.wait(self.poll_seconds)
+                    continue
+                self.run_job(job, worker_id)
+        finally:
+            connection.close()
+
+    def run_job(self, job, worker_id):
+        from .handlers import HANDLERS
+
+        beat_stop = threading.Event()
+
+        def heartbeat():
+            try:
+                while not beat_stop.wait(self.lease_seconds / 3):
+                    if not renew(job, worker_id, self.lease_seconds):
+                        print(f"⚠️ Lost lease on {job}")
+                        return
+            finally:
+                connection.close()
+
+        beat = threading.Thread(target=heartbeat, daemon=True)
+        beat.start()
+        print(f"⏳ [{worker_id}] running {job.kind} #{job.id} (attempt {job.attempts}/{job.max_attempts})")
+        try:
+            with progress.tracking(job):
+                result = HANDLERS[job.kind](**job.params)
+            finish(job, worker_id, result=result)
+            print(f"✅ [{worker_id}] {job.kind} #{job.id} succeeded")
+        except Exception as e:
+            traceback.print_exc()
+            finish(job, worker_id, error=f"{type(e).__name__}: {e}")
+            print(f"❌ [{worker_id}] {job.kind} #{job.id} failed: {e}")
+        finally:
+            beat_stop.set()
+            beat.join()
+            close_old_connections()
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from jobs import events
+from jobs.models import Job
+from jobs.runner import claim, enqueue, finish, renew
+from scraper.scrape_scripts import run_stats
+
+
+class LeaseTests(TestCase):
+    def make_job(self, **fields):
+        return Job.objects.create(kind="scrape", params={"character": "Goku"}, **fields)
+
+    def expire(self, job):
+        Job.objects.filter(pk=job.pk).update(lease_expires=timezone.now() - timedelta(seconds=1))
+
+    def test_claim_leases_the_job(self):
+        job = self.make_job()
+        claimed = claim("w1", lease_seconds=60)
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, Job.RUNNING)
+        self.assertEqual(claimed.leased_by, "w1")
+        self.assertEqual(claimed.attempts, 1)
+        self.assertGreater(claimed.lease_expires, timezone.now())
+
+    def test_double_claim(self):
+        self.make_job()
+        self.assertIsNotNone(claim("w1"))
+        self.assertIsNone(claim("w2"))
+
+    def test_claim_skips_a_row_changed_since_it_was_read(self):
+        job = self.make_job()
+        stale = Job.objects.get(pk=job.pk)
+        self.assertIsNotNone(claim("w1"))
+        # The compare-and-swap a second worker would run with its stale read
+        updated = Job.objects.filter(
+            pk=stale.pk, status=stale.status, lease_expires=stale.lease_expires, attempts=stale.attempts,
+        ).update(leased_by="w2")
+        self.assertEqual(updated, 0)
+
+    def test_expired_lease_is_taken_over(self):
+        job = self.make_job()
+        claim("w1")
+        self.expire(job)
+        taken = claim("w2")
+        self.assertEqual(taken.pk, job.pk)
+        self.assertEqual(taken.leased_by, "w2")
+        self.assertEqual(taken.attempts, 2)
+
+    def test_live_lease_is_not_taken_over(self):
+        self.make_job()
+        claim("w1", lease_seconds=60)
+        self.assertIsNone(claim("w2"))
+
+    def test_expired_lease_out_of_attempts_fails(self):
+        job = self.make_job(max_attempts=1)
+        claim("w1")
+        self.expire(job)
+        self.assertIsNone(claim("w2"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn("w1", job.error)
+
+    def test_lost_lease_finish_is_ignored(self):
+        job = self.make_job()
+        first = claim("w1")
+        self.expire(job)
+        second = claim("w2")
+        self.assertFalse(renew(first, "w1"))
+        self.assertFalse(finish(first, "w1", error="late failure"))
+        self.assertTrue(finish(second, "w2", result={"ok": True}))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {"ok": True})
+
+    def test_renew_extends_own_lease(self):
+        job = self.make_job()
+        claimed = claim("w1", lease_seconds=1)
+        self.assertTrue(renew(claimed, "w1", lease_seconds=60))
+        job.refresh_from_db()
+        self.assertGreater(job.lease_expires, timezone.now() + timedelta(seconds=30))
+
+
+class EnqueueTests(TestCase):
+    def test_active_job_is_returned_instead_of_a_duplicate(self):
+        job = enqueue("scrape", character="Goku", refresh=False)
+        self.assertEqual(enqueue("scrape", character="goku", refresh=True).pk, job.pk)
+        claimed = claim("w1")
+        self.assertEqual(enqueue("scrape", character="Goku").pk, job.pk)
+        self.assertNotEqual(enqueue("train", max_attempts=1, character="Goku").pk, job.pk)
+
+        finish(claimed, "w1", result={})
+        self.assertNotEqual(enqueue("scrape", character="Goku").pk, job.pk)
+        self.assertEqual(Job.objects.filter(kind="scrape").count(), 2)
+
+
+class RunStatsTests(SimpleTestCase):
+    def test_concurrent_runs_count_apart(self):
+        results = {}
+        start = threading.Barrier(2)
+
+        def run(name, n):
+            with run_stats.collecting() as stats:
+                start.wait()
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    list(pool.map(run_stats.bind(lambda _: run_stats.count("http_cache.hits")), range(n)))
+                results[name] = stats.get("http_cache.hits")
+
+        threads = [threading.Thread(target=run, args=("a", 5)), threading.Thread(target=run, args=("b", 7))]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {"a": 5, "b": 7})
+
+    def test_count_outside_a_run_is_a_no_op(self):
+        run_stats.count("http_cache.hits")
+        self.assertIsNone(run_stats.current())
+
+
+@mock.patch.object(events, "INTERVAL", 0.01)
+class JobEventsTests(TestCase):
+    async def read_event(self, stream):
+        while True:
+            chunk = await asyncio.wait_for(anext(stream), 2)
+            if chunk.startswith("data: "):
+                return json.loads(chunk[len("data: "):])
+
+    async def test_pushes_changes_until_done(self):
+        job = await Job.objects.acreate(kind="scrape", params={"character": "Goku"})
+        with mock.patch.object(events, "_watchers", {}):
+            stream = events.stream(job)
+            self.assertEqual((await self.read_event(stream))["status"], Job.QUEUED)
+
+            await Job.objects.filter(pk=job.pk).aupdate(status=Job.RUNNING, progress={"stage": "scrape"})
+            self.assertEqual((await self.read_event(stream))["progress"], {"stage": "scrape"})
+
+            await Job.objects.filter(pk=job.pk).aupdate(status=Job.SUCCEEDED)
+            self.assertTrue((await self.read_event(stream))["done"])
+            with self.assertRaises(StopAsyncIteration):
+                await anext(stream)
+            self.assertEqual(events.get_watcher().subscribers, {})
+
+    async def test_finished_job_sends_one_event(self):
+        job = await Job.objects.acreate(kind="scrape", status=Job.FAILED, error="boom")
+        chunks = [chunk async for chunk in events.stream(job)]
+        self.assertEqual(len([c for c in chunks if c.startswith("data: ")]), 1)
+
+    async def test_view_streams_server_sent_events(self):
+        job = await Job.objects.acreate(kind="scrape", status=Job.SUCCEEDED)
+        response = await self.async_client.get(f"/jobs/{job.id}/events/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        body = b"".join([chunk async for chunk in response.streaming_content]).decode()
+        self.assertIn('"status": "succeeded"', body)
+        self.assertEqual((await self.async_client.get("/jobs/999999/events/")).status_code, 404)
@@ -0,0 +1,26 @@
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+
+from jobs import events
+from jobs.models import Job
+
+# Create your views here.
+
+def job_status(request, job_id):
+    """One snapshot of the job (fallback for clients that can't hold the event stream)."""
+    job = get_object_or_404(Job, id=job_id)
+    return JsonResponse(events.as_dict(job))
+
+
+async def job_events(request, job_id):
+    """
+    Server-Sent Events stream of one job, pushed by the process-wide
+    jobs.events watcher. Async, so under ASGI an open stream holds no thread.
+    """
+    job = await Job.objects.filter(id=job_id).afirst()
+    if job is None:
+        raise Http404("No such job")
+    response = StreamingHttpResponse(events.stream(job), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # no proxy buffering of the stream
+    return response
@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
-from .models import Character
+from .models import Character, DomainProfile, ModerationVerdict, ScrapedPage, SearchCache
 from analytics.admin import ScrapeMetricsInline
 
 @admin.register(Character)
@@ -15,4 +15,26 @@ class CharacterAdmin(admin.ModelAdmin):
                 obj.model.id,
                 obj.model.model_id
             )
-        return "No trained model"
\ No newline at end of file
+        return "No trained model"
+
+@admin.register(DomainProfile)
+class DomainProfileAdmin(admin.ModelAdmin):
+    list_display = ("domain", "attempts", "static_wins", "embedded_wins", "dynamic_wins",
+                    "empty_runs", "failures", "dynamic_failures", "avg_latency", "updated_at")
+    search_fields = ("domain",)
+
+@admin.register(SearchCache)
+class SearchCacheAdmin(admin.ModelAdmin):
+    list_display = ("query", "country", "lang", "num", "created_at")
+    search_fields = ("query",)
+
+@admin.register(ScrapedPage)
+class ScrapedPageAdmin(admin.ModelAdmin):
+    list_display = ("url", "character", "quotes_found", "last_scraped")
+    list_filter = ("character",)
+    search_fields = ("url",)
+
+@admin.register(ModerationVerdict)
+class ModerationVerdictAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "model", "model_version", "flagged", "created_at")
+    list_filter = ("model", "model_version", "flagged")
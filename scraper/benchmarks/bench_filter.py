@@ -0,0 +1,74 @@
+"""
+generic_extract candidate filtering: old per-candidate loop vs the
+precompiled batch classifier, on the candidate texts of fixture pages.
+Also checks that both keep exactly the same texts.
+
+    python -m scraper.benchmarks.bench_filter [page.html ...] [--character NAME] [--repeat N]
+"""
+
+import argparse
+import re
+import time
+
+from scraper.benchmarks.fixtures import load_pages
+from scraper.scrape_scripts.candidate_filter import CandidateClassifier
+from scraper.scrape_scripts.html_doc import HtmlDocument
+from scraper.scrape_scripts.text_utils import clean_text
+
+QUOTE_LIKE = re.compile(r"[\"“”'«»‘’].{6,}")
+
+
+def legacy_filter(texts, character):
+    """The loop generic_extract used to run, one candidate at a time."""
+    out = []
+    char_name = character.lower() if character else None
+    for txt in texts:
+        if len(txt) < 12:
+            continue
+        junk_words = ["vote", "photo", "ranker", "comment", "episode", "great quote", "quotes list"]
+        if any(j in txt.lower() for j in junk_words):
+            continue
+        looks_like_quote = QUOTE_LIKE.search(txt)
+        mentions_character = char_name and char_name in txt.lower()
+        if looks_like_quote or mentions_character:
+            if len(txt) > 350:
+                continue
+            out.append(txt)
+    return out
+
+
+def batch_filter(texts, classifier):
+    return [t for t, keep in zip(texts, classifier.classify(texts)) if keep]
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pages", nargs="*")
+    parser.add_argument("--character", default="Luffy")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for name, html_text in load_pages(args.pages):
+        doc = HtmlDocument(html_text)
+        texts = [clean_text(doc.text(c)) for c in doc.select("blockquote, q, li, p")]
+        classifier = CandidateClassifier(args.character)
+
+        same = legacy_filter(texts, args.character) == batch_filter(texts, classifier)
+        old = timed(lambda: legacy_filter(texts, args.character), args.repeat)
+        new = timed(lambda: batch_filter(texts, classifier), args.repeat)
+        print(f"\n{name}: {len(texts)} candidates, best of {args.repeat}, identical output: {same}")
+        print(f"  per-candidate loop   {old:8.2f} ms")
+        print(f"  compiled classifier  {new:8.2f} ms  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Per-page parse cost: old path vs parse-once on each installed backend.
+
+"before" is what scrape_url used to do for a page with no site-specific
+hit: two html.parser parses (site_specific_extract + generic_extract).
+"after" is one parse with the given backend plus the same candidate select.
+
+    python -m scraper.benchmarks.bench_parse [page.html ...] [--repeat N]
+"""
+
+import argparse
+import time
+
+from bs4 import BeautifulSoup
+
+from scraper.benchmarks.fixtures import load_pages
+from scraper.scrape_scripts.html_doc import BACKENDS, HtmlDocument, resolve_backend
+
+CANDIDATES = "blockquote, q, li, p"
+
+
+def before(html_text):
+    BeautifulSoup(html_text, "html.parser").select("div.richText_container__Kvtj0")
+    for node in BeautifulSoup(html_text, "html.parser").select(CANDIDATES):
+        node.get_text(" ", strip=True)
+
+
+def after(html_text, backend):
+    doc = HtmlDocument(html_text, backend)
+    doc.select("div.richText_container__Kvtj0")
+    for node in doc.select(CANDIDATES):
+        doc.text(node)
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("pages", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    backends = [b for b in BACKENDS if resolve_backend(b) == b]
+    for name, html_text in load_pages(args.pages):
+        print(f"\n{name} ({len(html_text) / 1024:.0f} KB), best of {args.repeat}")
+        base = timed(lambda: before(html_text), args.repeat)
+        print(f"  before  html.parser x2   {base:8.1f} ms")
+        for backend in backends:
+            ms = timed(lambda: after(html_text, backend), args.repeat)
+            print(f"  after   {backend:<16} {ms:8.1f} ms  ({base / ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
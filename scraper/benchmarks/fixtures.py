@@ -0,0 +1,49 @@
+"""
+Pages for the scraper benchmarks.
+
+By default the benchmarks run on scraper/benchmarks/pages/*.html: one page
+per site family we scrape (ranker's Next.js lists, goodreads quote tags,
+WordPress articles, sportskeeda articles), with that site's markup, nesting
+and page weight (200-330 KB) but generated quote text; each says so in a
+leading comment. Pass other saved pages on the command line (e.g.
+`curl -o ranker.html <url>`) or add them to pages/. With no pages at all,
+a synthetic listicle is generated.
+"""
+
+import random
+from pathlib import Path
+
+PAGES_DIR = Path(__file__).resolve().parent / "pages"
+
+WORDS = (
+    "never give up dream friends fight power believe world king pirate heart "
+    "strong promise future protect nakama ocean journey win lose smile cry"
+).split()
+
+
+def synthetic_listicle(n_items=400, seed=7):
+    """Long ranker-style quote list padded with nav / comment / vote junk."""
+    rnd = random.Random(seed)
+    parts = ["<html><head><title>Best Luffy Quotes</title>"]
+    parts += [f"<script>var s{i} = {i};</script>" for i in range(12)]
+    parts.append("</head><body><nav><ul>")
+    parts += [f"<li><a href='/c/{i}'>Category {i}</a></li>" for i in range(60)]
+    parts.append("</ul></nav><div class='entry-content'>")
+    for i in range(n_items):
+        quote = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 24))).capitalize()
+        parts.append(
+            f"<div class='richText_container__Kvtj0'><p>“{quote}.”</p></div>"
+            f"<p>Luffy says this in episode {i}.</p>"
+            f"<li>{rnd.randint(1, 999)} votes · Photo: Toei Animation</li>"
+            f"<blockquote>\"{quote}!\" — Monkey D. Luffy</blockquote>"
+        )
+    parts.append("</div><footer><p>Leave a comment below</p></footer></body></html>")
+    return "".join(parts)
+
+
+def load_pages(paths=None):
+    """[(name, html_text)] from the given paths, pages/, or the synthetic page."""
+    files = [Path(p) for p in paths or []] or sorted(PAGES_DIR.glob("*.html"))
+    if files:
+        return [(f.name, f.read_text(encoding="utf-8", errors="replace")) for f in files]
+    return [("synthetic_listicle", synthetic_listicle())]
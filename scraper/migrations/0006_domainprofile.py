@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0005_remove_character_model'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('domain', models.CharField(max_length=255, unique=True)),
+                ('attempts', models.IntegerField(default=0)),
+                ('failures', models.IntegerField(default=0)),
+                ('empty_runs', models.IntegerField(default=0)),
+                ('static_wins', models.IntegerField(default=0)),
+                ('embedded_wins', models.IntegerField(default=0)),
+                ('dynamic_wins', models.IntegerField(default=0)),
+                ('total_quotes', models.IntegerField(default=0)),
+                ('avg_latency', models.FloatField(default=0.0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0006_domainprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('query', models.TextField()),
+                ('country', models.CharField(max_length=10)),
+                ('lang', models.CharField(max_length=10)),
+                ('num', models.IntegerField(default=0)),
+                ('urls', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0007_searchcache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapedPage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2000)),
+                ('url_hash', models.CharField(max_length=40)),
+                ('body_hash', models.CharField(blank=True, max_length=40)),
+                ('quotes_found', models.IntegerField(default=0)),
+                ('first_scraped', models.DateTimeField(auto_now_add=True)),
+                ('last_scraped', models.DateTimeField()),
+                ('character', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scraped_pages', to='scraper.character')),
+            ],
+            options={
+                'unique_together': {('character', 'url_hash')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0008_scrapedpage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ModerationVerdict',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64)),
+                ('model', models.CharField(max_length=100)),
+                ('model_version', models.CharField(blank=True, max_length=100)),
+                ('flagged', models.BooleanField()),
+                ('categories', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('content_hash', 'model')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraper', '0009_moderationverdict'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='domainprofile',
+            name='dynamic_failures',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models
 
+from scraper.scrape_scripts.url_utils import url_hash
+
 # Create your models here.
 
 class Character(models.Model):
@@ -9,4 +11,83 @@ class Character(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):  
-        return self.name
\ No newline at end of file
+        return self.name
+
+class DomainProfile(models.Model):
+    """Per-domain scrape history used to route URLs to the tier that works."""
+    domain = models.CharField(max_length=255, unique=True)
+    attempts = models.IntegerField(default=0)
+    failures = models.IntegerField(default=0)       # static fetch errors
+    dynamic_failures = models.IntegerField(default=0)  # browser render errors
+    empty_runs = models.IntegerField(default=0)     # fetched fine, no quotes
+    static_wins = models.IntegerField(default=0)    # quotes from static HTML extractors
+    embedded_wins = models.IntegerField(default=0)  # quotes from __NEXT_DATA__ / JSON-LD
+    dynamic_wins = models.IntegerField(default=0)   # quotes only after Selenium rendering
+    total_quotes = models.IntegerField(default=0)
+    avg_latency = models.FloatField(default=0.0)    # seconds per URL
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def wins(self):
+        return self.static_wins + self.embedded_wins + self.dynamic_wins
+
+    @property
+    def avg_yield(self):
+        return self.total_quotes / self.wins if self.wins else 0.0
+
+    @property
+    def failure_rate(self):
+        return self.failures / self.attempts if self.attempts else 0.0
+
+    def __str__(self):
+        return self.domain
+
+class SearchCache(models.Model):
+    """Cached SerpAPI organic results, keyed by normalized query + country + language."""
+    key = models.CharField(max_length=64, unique=True)
+    query = models.TextField()
+    country = models.CharField(max_length=10)
+    lang = models.CharField(max_length=10)
+    num = models.IntegerField(default=0)  # results requested when cached
+    urls = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.query} ({self.country}/{self.lang})"
+
+
+class ScrapedPage(models.Model):
+    """A URL already scraped for a character, so refreshes only redo new or changed pages."""
+    character = models.ForeignKey(Character, on_delete=models.CASCADE, related_name="scraped_pages")
+    url = models.URLField(max_length=2000)      # canonical_url
+    url_hash = models.CharField(max_length=40)  # url_utils.url_hash(url), indexed instead of the long url
+    body_hash = models.CharField(max_length=40, blank=True)  # sha1 of the static HTML, "" if rendered
+    quotes_found = models.IntegerField(default=0)
+    first_scraped = models.DateTimeField(auto_now_add=True)
+    last_scraped = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("character", "url_hash")
+
+    def save(self, *args, **kwargs):
+        if not self.url_hash:
+            self.url_hash = url_hash(self.url)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.url
+
+class ModerationVerdict(models.Model):
+    """Cached moderation result per exact text and moderation model, shared by scraper and trainer."""
+    content_hash = models.CharField(max_length=64)   # sha256 of the moderated text
+    model = models.CharField(max_length=100)         # model requested, e.g. omni-moderation-latest
+    model_version = models.CharField(max_length=100, blank=True)  # model that answered
+    flagged = models.BooleanField()
+    categories = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("content_hash", "model")
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.model_version or self.model}: {'flagged' if self.flagged else 'ok'})"
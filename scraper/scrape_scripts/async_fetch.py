@@ -0,0 +1,132 @@
+"""
+asyncio fetch engine for the scraper.
+
+Keeps many static page requests in flight on a single event loop thread
+(aiohttp), capped globally and per host. Extraction is CPU / Selenium work,
+so each fetched page is handed to a thread pool while the loop keeps fetching.
+Rate limits and retry/backoff come from the shared transport, so both
+engines respect the same per-host budgets. The HTTP cache is synchronous
+SQLite, so its lookups and writes run on worker threads (asyncio.to_thread)
+and never stall the other fetches on the loop.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .http_cache import get_http_cache
+from .transport import (
+    CHUNK_SIZE, DEFAULT_MAX_BODY_BYTES, RETRY_STATUSES, backoff_delay, check_html_content_type,
+    detect_charset, get_transport, parse_retry_after,
+)
+from .url_utils import canonical_url
+
+DEFAULT_MAX_IN_FLIGHT = 200
+DEFAULT_PER_HOST = 4
+
+
+async def read_capped_async(resp, max_bytes):
+    """Streamed read that stops once max_bytes have arrived. Returns (body, truncated)."""
+    buf = bytearray()
+    async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+        buf += chunk
+        if len(buf) >= max_bytes:
+            return bytes(buf[:max_bytes]), True
+    return bytes(buf), False
+
+
+async def fetch_text(session, url, timeout, headers, max_bytes=DEFAULT_MAX_BODY_BYTES):
+    """GET one URL on the shared session and return its decoded body (cache-aware, like fetch())."""
+    import aiohttp
+
+    cache = get_http_cache()
+    key = canonical_url(url)
+    entry = await asyncio.to_thread(cache.lookup, key)
+    if entry and entry.is_fresh(cache.ttl):
+        cache.count("hits")
+        return entry.as_response().text
+    if entry:
+        headers = {**headers, **entry.validators()}
+
+    # Same budget as Transport.request: every attempt and backoff inside one
+    # deadline, and a timed-out attempt is not retried
+    loop = asyncio.get_running_loop()
+    transport = get_transport()
+    bucket = transport.bucket_for(url)
+    expires = loop.time() + transport.deadline
+    attempt = 0
+    while True:
+        await asyncio.sleep(bucket.reserve())
+        remaining = expires - loop.time()
+        if remaining <= 0:
+            raise asyncio.TimeoutError(f"deadline exceeded for {url}")
+        try:
+            client_timeout = aiohttp.ClientTimeout(total=min(timeout, remaining))
+            async with session.get(url, headers=headers, timeout=client_timeout) as resp:
+                if entry and resp.status == 304:
+                    await asyncio.to_thread(cache.refresh, key)
+                    cache.count("revalidated")
+                    return entry.as_response().text
+                delay = None
+                if resp.status in RETRY_STATUSES and attempt < transport.max_retries:
+                    delay = backoff_delay(attempt, retry_after=parse_retry_after(resp.headers.get("Retry-After")))
+                    if loop.time() + delay >= expires:
+                        delay = None
+                if delay is None:
+                    resp.raise_for_status()
+                    content_type = resp.headers.get("Content-Type", "")
+                    check_html_content_type(content_type, url)
+                    body, truncated = await read_capped_async(resp, max_bytes)
+                    if truncated:
+                        print(f"[fetch] {url}: body capped at {max_bytes} bytes")
+                    encoding = detect_charset(content_type, body)
+                    cache.count("misses")
+                    if not truncated:
+                        await asyncio.to_thread(cache.store, key, url, body, resp.headers, encoding, resp.status)
+                    return body.decode(encoding, errors="replace")
+        except asyncio.TimeoutError:
+            raise
+        except aiohttp.ClientConnectionError:
+            delay = backoff_delay(attempt)
+            if attempt >= transport.max_retries or loop.time() + delay >= expires:
+                raise
+        await asyncio.sleep(delay)
+        attempt += 1
+
+
+async def _scrape_all(urls, extract, timeout, headers, max_in_flight, per_host, extract_workers, max_bytes):
+    import aiohttp
+
+    loop = asyncio.get_running_loop()
+    connector = aiohttp.TCPConnector(limit=max_in_flight, limit_per_host=per_host)
+    all_quotes = []
+
+    async def one(session, pool, url):
+        t0 = loop.time()
+        try:
+            html_text = await fetch_text(session, url, timeout, headers, max_bytes)
+        except Exception as e:
+            html_text = None
+            print(f"[scrape error] {url}: {e}")
+        try:
+            return await loop.run_in_executor(pool, extract, url, html_text, loop.time() - t0)
+        except Exception as e:
+            print(f"✖ error {url}: {e}")
+            return []
+
+    with ThreadPoolExecutor(max_workers=extract_workers) as pool:
+        async with aiohttp.ClientSession(connector=connector) as session:
+            tasks = [asyncio.ensure_future(one(session, pool, u)) for u in urls]
+            for fut in asyncio.as_completed(tasks):
+                all_quotes.extend(await fut)
+    return all_quotes
+
+
+def scrape_all(urls, extract, timeout, headers=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT,
+               per_host=DEFAULT_PER_HOST, extract_workers=4, max_bytes=DEFAULT_MAX_BODY_BYTES):
+    """
+    Fetch every URL concurrently and run extract(url, html_text, fetch_seconds)
+    on each page. html_text is None when the static fetch failed. Returns the flattened (url, quote) list.
+    """
+    return asyncio.run(_scrape_all(
+        list(urls), extract, timeout, headers or {}, max_in_flight, per_host, extract_workers, max_bytes
+    ))
@@ -0,0 +1,226 @@
+"""
+Bounded pool of warm headless Chrome drivers for the dynamic fallback.
+
+Instead of launching (and quitting) a browser per URL, drivers are checked
+out of the pool and returned after the page:
+- at most `size` browsers exist at once; callers wait for a free one
+- idle drivers are health-checked on checkout, dead ones are replaced
+- a driver is recycled after `max_pages` pages or whenever a page raised
+- stats(): checkouts, wait time, busy time (utilization), recycles
+"""
+
+import atexit
+import threading
+import time
+from contextlib import contextmanager
+
+from . import run_stats
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_PAGES = 50
+
+
+def chrome_options():
+    """Headless, text-only Chrome options (no images / css / plugins)."""
+    from selenium.webdriver.chrome.options import Options
+
+    opts = Options()
+    opts.add_argument("--headless=new")
+    opts.add_argument("--no-sandbox")
+    opts.add_argument("--disable-dev-shm-usage")
+    opts.add_argument("--window-size=1600,900")
+    # 🚀 speed tweaks
+    opts.add_argument("--disable-gpu")
+    opts.add_argument("--blink-settings=imagesEnabled=false")   # no images
+    opts.add_argument("--disable-extensions")
+    opts.add_argument("--disable-notifications")
+    # block unnecessary content types
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.stylesheets": 2,
+        "profile.managed_default_content_settings.plugins": 2,
+        "profile.managed_default_content_settings.popups": 2,
+        "profile.managed_default_content_settings.geolocation": 2,
+        "profile.managed_default_content_settings.notifications": 2,
+    }
+    opts.add_experimental_option("prefs", prefs)
+    return opts
+
+
+def launch_chrome():
+    from selenium import webdriver
+
+    return webdriver.Chrome(options=chrome_options())
+
+
+class _Slot:
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class DriverPool:
+    def __init__(self, size=DEFAULT_POOL_SIZE, max_pages=DEFAULT_MAX_PAGES, factory=launch_chrome):
+        self.size = size
+        self.max_pages = max_pages
+        self.factory = factory
+        self._idle = []
+        self._live = 0
+        self._cond = threading.Condition()
+        self._started = time.monotonic()
+        self._stats = {
+            "launched": 0, "checkouts": 0, "recycled": 0, "crashed": 0,
+            "wait_seconds": 0.0, "max_wait_seconds": 0.0, "busy_seconds": 0.0,
+        }
+
+    # --- lifecycle ---
+
+    def _launch(self):
+        try:
+            slot = _Slot(self.factory())
+        except Exception:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats["launched"] += 1
+        return slot
+
+    def _discard(self, slot):
+        try:
+            slot.driver.quit()
+        except Exception:
+            pass
+        with self._cond:
+            self._live -= 1
+            self._cond.notify()
+
+    def warm(self, n=None, background=False):
+        """Pre-launch up to n (default: size) drivers in parallel and park them idle."""
+        with self._cond:
+            todo = max(0, min(n or self.size, self.size) - self._live)
+            self._live += todo
+
+        def one():
+            try:
+                slot = self._launch()
+            except Exception as e:
+                print(f"[browser pool] warm launch failed: {e}")
+                return
+            with self._cond:
+                self._idle.append(slot)
+                self._cond.notify()
+
+        threads = [threading.Thread(target=one, daemon=True) for _ in range(todo)]
+        for t in threads:
+            t.start()
+        if not background:
+            for t in threads:
+                t.join()
+
+    def shutdown(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+        for slot in idle:
+            self._discard(slot)
+
+    # --- checkout / checkin ---
+
+    @staticmethod
+    def _healthy(driver):
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _checkout(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._live >= self.size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("no browser available in pool")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    slot = self._idle.pop()
+                else:
+                    self._live += 1
+                    slot = None
+            if slot is None:
+                return self._launch()
+            if self._healthy(slot.driver):
+                return slot
+            with self._cond:
+                self._stats["crashed"] += 1
+            self._discard(slot)
+
+    def _checkin(self, slot, ok):
+        slot.pages += 1
+        if ok:
+            try:
+                slot.driver.get("about:blank")
+            except Exception:
+                ok = False
+        if not ok or slot.pages >= self.max_pages:
+            with self._cond:
+                self._stats["recycled"] += 1
+                if not ok:
+                    self._stats["crashed"] += 1
+            self._discard(slot)
+            return
+        with self._cond:
+            self._idle.append(slot)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=None):
+        """Check out a driver for one page: `with pool.driver() as driver: ...`"""
+        t0 = time.monotonic()
+        slot = self._checkout(timeout)
+        t1 = time.monotonic()
+        ok = False
+        try:
+            yield slot.driver
+            ok = True
+        finally:
+            busy = time.monotonic() - t1
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_seconds"] += t1 - t0
+                self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], t1 - t0)
+                self._stats["busy_seconds"] += busy
+            run_stats.count("browser.checkouts")
+            run_stats.count("browser.wait_seconds", t1 - t0)
+            run_stats.count("browser.busy_seconds", busy)
+            self._checkin(slot, ok)
+
+    def stats(self):
+        """Cumulative counters plus utilization = busy time / (size × lifetime)."""
+        with self._cond:
+            out = dict(self._stats)
+            out["live"] = self._live
+            out["idle"] = len(self._idle)
+        elapsed = time.monotonic() - self._started
+        out["utilization"] = round(out["busy_seconds"] / (self.size * elapsed), 3) if elapsed else 0.0
+        return out
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_driver_pool():
+    """Process-wide pool configured from settings; drivers are quit at exit."""
+    global _pool
+    from django.conf import settings
+
+    with _pool_lock:
+        if _pool is None:
+            _pool = DriverPool(
+                size=getattr(settings, "SCRAPER_BROWSER_POOL_SIZE", DEFAULT_POOL_SIZE),
+                max_pages=getattr(settings, "SCRAPER_BROWSER_MAX_PAGES", DEFAULT_MAX_PAGES),
+            )
+            atexit.register(_pool.shutdown)
+        return _pool
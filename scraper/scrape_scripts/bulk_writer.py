@@ -0,0 +1,64 @@
+"""
+Buffered, chunked inserts for pipeline output (ScrapedQuote, RewrittenQuote).
+
+Rows are collected in memory and written with bulk_create, chunk_size rows
+per INSERT and one transaction per chunk, instead of one autocommitted
+INSERT per row. bulk_create skips Model.save(), so callers fill derived
+fields (e.g. ScrapedQuote.content_hash) themselves.
+
+Used as a context manager the writer flushes on a clean exit only; if the
+block raises, the rows still buffered are dropped. Chunks flushed before the
+error are already committed (each in its own transaction), so a failed run
+can leave a partial insert behind. Callers that need all or nothing wrap the
+whole block in transaction.atomic().
+"""
+
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+CHUNK_SIZE = getattr(settings, "BULK_WRITE_CHUNK_SIZE", 500)
+
+
+class BulkWriter:
+    def __init__(self, model, chunk_size=CHUNK_SIZE):
+        self.model = model
+        self.chunk_size = max(1, chunk_size)
+        self.buffer = []
+        self.rows = 0
+        self.seconds = 0.0
+        self.flushes = 0
+
+    def add(self, **fields):
+        self.buffer.append(self.model(**fields))
+        if len(self.buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        t0 = time.perf_counter()
+        with transaction.atomic():
+            self.model.objects.bulk_create(batch, batch_size=self.chunk_size)
+        self.seconds += time.perf_counter() - t0
+        self.rows += len(batch)
+        self.flushes += 1
+
+    @property
+    def rows_per_second(self):
+        return round(self.rows / self.seconds, 1) if self.seconds else 0.0
+
+    def stats(self):
+        return {"rows": self.rows, "seconds": round(self.seconds, 3),
+                "flushes": self.flushes, "rows_per_second": self.rows_per_second}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self.buffer = []
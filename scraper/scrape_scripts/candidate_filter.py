@@ -0,0 +1,48 @@
+"""
+Precompiled candidate classifier for generic_extract.
+
+Built once per character (classifier_for is cached):
+- every junk word is folded into one compiled alternation, so each text is
+  lowercased once and scanned once instead of once per junk word
+- quote-mark detection is a compiled pattern; the character name is
+  lowercased once and matched with a plain substring test
+The rules are the original ones:
+- drop texts shorter than 12 or longer than 350 characters
+- drop texts containing any junk word (case-insensitive substring)
+- keep texts that look quote-ish or mention the character
+
+classify() takes a whole page's candidates. Scanning one NUL-joined
+string instead was measured slower under CPython (the extra bisect per
+match outweighs the saved calls), so matchers run per text.
+"""
+
+import re
+from functools import lru_cache
+
+JUNK_WORDS = ("vote", "photo", "ranker", "comment", "episode", "great quote", "quotes list")
+JUNK = re.compile("|".join(map(re.escape, JUNK_WORDS)))
+QUOTE_LIKE = re.compile(r"[\"“”'«»‘’].{6}")
+MIN_LEN, MAX_LEN = 12, 350
+
+
+class CandidateClassifier:
+    def __init__(self, character=None):
+        self.name = character.lower() if character else None
+
+    def keep(self, txt):
+        if not MIN_LEN <= len(txt) <= MAX_LEN:
+            return False
+        low = txt.lower()
+        if JUNK.search(low):
+            return False
+        return bool(QUOTE_LIKE.search(txt)) or bool(self.name and self.name in low)
+
+    def classify(self, texts):
+        """One bool per text, in order."""
+        keep = self.keep
+        return [keep(t) for t in texts]
+
+
+@lru_cache(maxsize=64)
+def classifier_for(character=None):
+    return CandidateClassifier(character)
@@ -0,0 +1,94 @@
+"""
+Per-domain routing learned from past scrapes.
+
+Profiles (scraper.DomainProfile) are loaded once before a run, consulted
+per URL from worker threads / the event loop without touching the DB,
+and written back once after the run as F() increments, so runs saving the
+same domain concurrently don't overwrite each other's counts:
+- "skip":    enough attempts and the domain never yielded a quote
+             (re-probed after SKIP_RETRY_DAYS in case the site changed)
+- "dynamic": quotes only ever came from the rendered page, so the static
+             fetch is skipped and the URL goes straight to the browser
+- "static":  the normal static → embedded → dynamic pipeline
+"""
+
+import threading
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.db.models import F
+from django.utils import timezone
+
+from scraper.models import DomainProfile
+
+MIN_ATTEMPTS = 3
+SKIP_RETRY_DAYS = 7
+TIERS = ("static", "embedded", "dynamic")
+COUNTERS = ("failures", "dynamic_failures", "empty_runs", "total_quotes", *(f"{t}_wins" for t in TIERS))
+
+
+def domain_of(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainRouter:
+    def __init__(self, profiles=None):
+        self.profiles = {p.domain: p for p in profiles or []}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, urls=None):
+        """Profiles for the given URLs (or every known domain) in one query."""
+        qs = DomainProfile.objects.all()
+        if urls is not None:
+            qs = qs.filter(domain__in={domain_of(u) for u in urls})
+        return cls(list(qs))
+
+    def plan(self, url):
+        p = self.profiles.get(domain_of(url))
+        if p is None or p.attempts < MIN_ATTEMPTS:
+            return "static"
+        if p.wins == 0:
+            if timezone.now() - p.updated_at < timedelta(days=SKIP_RETRY_DAYS):
+                return "skip"
+            return "static"
+        if p.dynamic_wins > p.static_wins + p.embedded_wins:
+            return "dynamic"
+        return "static"
+
+    def record(self, url, tier=None, quotes=0, latency=0.0, failed=False):
+        """
+        Remember one URL outcome; tier is the one that produced the quotes,
+        or "render_failed" when the browser errored. failed is a static fetch error.
+        """
+        with self._lock:
+            d = self._pending.setdefault(domain_of(url), {"attempts": 0, "latency": 0.0,
+                                                          **{field: 0 for field in COUNTERS}})
+            d["attempts"] += 1
+            d["latency"] += latency
+            if failed:
+                d["failures"] += 1
+            elif tier == "render_failed":
+                d["dynamic_failures"] += 1
+            elif quotes and tier in TIERS:
+                d[f"{tier}_wins"] += 1
+                d["total_quotes"] += quotes
+            else:
+                d["empty_runs"] += 1
+
+    def save(self):
+        """Fold this run's outcomes into the stored profiles."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for domain, d in pending.items():
+            DomainProfile.objects.get_or_create(domain=domain)
+            # One UPDATE; the right-hand sides all read the row's current values
+            DomainProfile.objects.filter(domain=domain).update(
+                attempts=F("attempts") + d["attempts"],
+                avg_latency=(F("avg_latency") * F("attempts") + d["latency"]) / (F("attempts") + d["attempts"]),
+                updated_at=timezone.now(),
+                **{field: F(field) + d[field] for field in COUNTERS},
+            )
+            self.profiles[domain] = DomainProfile.objects.get(domain=domain)
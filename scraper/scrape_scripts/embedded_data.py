@@ -0,0 +1,67 @@
+"""
+Quotes from data embedded in the static HTML.
+
+Many "JS" sites (ranker, screenrant, ...) ship the full list data in the
+initial HTML as a Next.js __NEXT_DATA__ blob or JSON-LD. Reading those
+blobs gets the quotes without rendering the page in a browser.
+"""
+
+import html
+import json
+import re
+
+EMBEDDED_SCRIPTS = "script#__NEXT_DATA__, script[type='application/ld+json']"
+
+# Keys whose string value is a quote by definition
+QUOTE_KEYS = {"quote", "quotetext", "quote_text"}
+# Keys that may hold a quote; the value must also look like one
+TEXT_KEYS = {"text", "description", "name", "body", "content", "caption", "richtext", "headline"}
+
+TAG = re.compile(r"<[^>]+>")
+STARTS_QUOTED = re.compile(r"^\s*[\"“”«‘’']")
+MIN_LEN, MAX_LEN = 12, 350
+
+
+def iter_blobs(doc):
+    """Parsed JSON payloads from the page's embedded data scripts."""
+    for node in doc.select(EMBEDDED_SCRIPTS):
+        raw = (doc.raw_text(node) or "").strip()
+        if not raw:
+            continue
+        try:
+            yield json.loads(raw)
+        except ValueError:
+            continue
+
+
+def _plain(value):
+    return html.unescape(TAG.sub(" ", value)).strip()
+
+
+def _walk(node, out):
+    if isinstance(node, dict):
+        is_quotation = node.get("@type") == "Quotation"
+        for key, value in node.items():
+            k = key.lower()
+            if isinstance(value, str):
+                text = _plain(value)
+                if not (MIN_LEN <= len(text) <= MAX_LEN) or len(text.split()) < 4:
+                    continue
+                if k in QUOTE_KEYS or (is_quotation and k == "text"):
+                    out.append(text)
+                elif k in TEXT_KEYS and STARTS_QUOTED.match(text):
+                    out.append(text)
+            else:
+                _walk(value, out)
+    elif isinstance(node, list):
+        for item in node:
+            _walk(item, out)
+
+
+def find_embedded_quotes(doc):
+    """Quote strings found in __NEXT_DATA__ / JSON-LD blobs, in document order, deduplicated."""
+    found = []
+    for blob in iter_blobs(doc):
+        _walk(blob, found)
+    seen = set()
+    return [q for q in found if not (q in seen or seen.add(q))]
@@ -0,0 +1,73 @@
+"""
+Host-indexed registry of declarative site extraction rules.
+
+Each supported site is one SiteRule: a container selector, an optional
+selector for the text node inside it, and text filters. Selectors are
+compiled once at import; site_rule_for(url) is a dict lookup on the host
+(with and without subdomains), so adding sites does not slow dispatch.
+"""
+
+import re
+from urllib.parse import urlparse
+
+from .html_doc import compile_selector
+from .text_utils import clean_text
+
+QUOTE_OPENERS = ('"', "“", "'")  # what the original ranker extractor accepted
+# trailing "― Author" / "— Naruto, Naruto Shippuden" attribution after the quote
+ATTRIBUTION = re.compile(r"\s*[―—–-]\s*[^\"“”]{1,80}$")
+
+
+class SiteRule:
+    def __init__(self, container, text=None, starts_with_quote=False, min_words=0, max_len=None,
+                 strip_attribution=False):
+        self.container = compile_selector(container)
+        self.text = compile_selector(text) if text else None
+        self.starts_with_quote = starts_with_quote
+        self.min_words = min_words
+        self.max_len = max_len
+        self.strip_attribution = strip_attribution
+
+    def keep(self, txt):
+        if not txt:
+            return False
+        if self.starts_with_quote and not txt.startswith(QUOTE_OPENERS):
+            return False
+        if self.min_words and len(txt.split()) < self.min_words:
+            return False
+        return not (self.max_len and len(txt) > self.max_len)
+
+    def extract(self, doc, url):
+        out = []
+        for node in doc.select(self.container):
+            if self.text is not None:
+                node = doc.select_one(self.text, node)
+                if node is None:
+                    continue
+            txt = clean_text(doc.text(node))
+            if self.strip_attribution:
+                txt = ATTRIBUTION.sub("", txt)
+            if self.keep(txt):
+                out.append((url, txt))
+        return out
+
+
+SITE_RULES = {
+    "ranker.com": SiteRule("div.richText_container__Kvtj0", text="p", starts_with_quote=True),
+    "scatteredquotes.com": SiteRule("blockquote.quote"),
+    "epicquotes.com": SiteRule("div.entry-content p", min_words=5),
+    "goodreads.com": SiteRule("div.quoteText", strip_attribution=True, min_words=3),
+    "sportskeeda.com": SiteRule("#article-content blockquote, #article-content li",
+                                starts_with_quote=True, max_len=350),
+    "animemotivation.com": SiteRule("div.entry-content blockquote, div.entry-content p",
+                                    starts_with_quote=True, strip_attribution=True, max_len=350),
+}
+
+
+def site_rule_for(url):
+    """Rule for the URL's host or its parent domain, else None."""
+    host = urlparse(url).netloc.lower().split(":")[0]
+    rule = SITE_RULES.get(host)
+    if rule is None:
+        rule = SITE_RULES.get(".".join(host.rsplit(".", 2)[-2:]))
+    return rule
@@ -0,0 +1,97 @@
+"""
+Parse-once HTML document with a pluggable parser backend.
+
+A page is parsed a single time into an HtmlDocument and that object is
+passed through every extractor (site-specific, generic, embedded data).
+Backends, fastest first:
+- "selectolax": lexbor engine, used when selectolax is installed
+- "lxml":       BeautifulSoup on the lxml parser
+- "html.parser": BeautifulSoup on the stdlib parser (always available)
+"auto" picks the fastest installed one.
+"""
+
+import importlib.util
+
+import soupsieve
+
+BACKENDS = ("selectolax", "lxml", "html.parser")
+
+
+def _installed(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def compile_selector(selector):
+    """
+    Precompile a CSS selector once (soupsieve). BeautifulSoup backends match
+    with the compiled pattern; selectolax is handed pattern.pattern, the
+    original string, which lexbor parses in C.
+    """
+    return soupsieve.compile(selector)
+
+
+def resolve_backend(name="auto"):
+    """Map a configured backend name to one that is actually installed."""
+    if name in (None, "", "auto"):
+        candidates = BACKENDS
+    elif name in BACKENDS:
+        candidates = BACKENDS[BACKENDS.index(name):]
+    else:
+        raise ValueError(f"Unknown HTML parser backend: {name!r}")
+    for backend in candidates:
+        if backend == "html.parser" or _installed(backend):
+            return backend
+    return "html.parser"
+
+
+class HtmlDocument:
+    """
+    Thin common API over BeautifulSoup and selectolax:
+    select / select_one (optionally scoped to a node) and text(node).
+    """
+
+    def __init__(self, html_text, backend="auto"):
+        self.backend = resolve_backend(backend)
+        self.html = html_text or ""
+        if self.backend == "selectolax":
+            from selectolax.lexbor import LexborHTMLParser
+            self.root = LexborHTMLParser(self.html)
+        else:
+            from bs4 import BeautifulSoup
+            self.root = BeautifulSoup(self.html, self.backend)
+
+    def select(self, selector, node=None):
+        """selector: CSS string or a pattern from compile_selector."""
+        node = self.root if node is None else node
+        if self.backend == "selectolax":
+            return node.css(getattr(selector, "pattern", selector))
+        if isinstance(selector, str):
+            return node.select(selector)
+        return selector.select(node)
+
+    def select_one(self, selector, node=None):
+        node = self.root if node is None else node
+        if self.backend == "selectolax":
+            return node.css_first(getattr(selector, "pattern", selector))
+        if isinstance(selector, str):
+            return node.select_one(selector)
+        return selector.select_one(node)
+
+    def text(self, node):
+        """Visible text of a node, space-joined and stripped."""
+        if self.backend == "selectolax":
+            return node.text(separator=" ", strip=True)
+        return node.get_text(" ", strip=True)
+
+    def raw_text(self, node):
+        """Unmodified text content (e.g. the JSON inside a <script>)."""
+        if self.backend == "selectolax":
+            return node.text()
+        return node.string or node.get_text()
+
+
+def as_document(page, backend="auto"):
+    """Accept raw HTML or an already parsed HtmlDocument."""
+    if isinstance(page, HtmlDocument):
+        return page
+    return HtmlDocument(page, backend)
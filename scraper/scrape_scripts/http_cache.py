@@ -0,0 +1,175 @@
+"""
+Persistent on-disk HTTP response cache for scraped pages.
+
+Entries live in one SQLite file keyed by canonical URL:
+- fresh entries (younger than the TTL) are served without touching the network
+- stale entries are revalidated with If-None-Match / If-Modified-Since,
+  a 304 refreshes the entry and serves the stored body
+- total body size is bounded; least recently used entries are evicted first
+- bodies cut off at the fetch byte cap are never stored
+Hit / revalidated / miss counters are kept so ScrapeMetrics can report the gain.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from . import run_stats
+
+DEFAULT_TTL = 24 * 60 * 60              # seconds
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024   # 256 MB of bodies
+
+
+class CachedResponse:
+    """
+    Just enough of requests.Response for the scraper (text / content / headers).
+    Also wraps streamed network bodies, with from_cache=False.
+    """
+
+    def __init__(self, url, status_code, headers, content, encoding, from_cache=True, truncated=False):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+        self.truncated = truncated
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def raise_for_status(self):
+        pass
+
+
+class CacheEntry:
+    def __init__(self, key, url, status, headers, body, encoding, etag, last_modified, stored_at):
+        self.key = key
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl):
+        return (time.time() - self.stored_at) < ttl
+
+    def validators(self):
+        """Conditional request headers for revalidation."""
+        h = {}
+        if self.etag:
+            h["If-None-Match"] = self.etag
+        if self.last_modified:
+            h["If-Modified-Since"] = self.last_modified
+        return h
+
+    def as_response(self):
+        return CachedResponse(self.url, self.status, self.headers, self.body, self.encoding)
+
+
+class HttpCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0}
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, body BLOB,"
+            " encoding TEXT, etag TEXT, last_modified TEXT,"
+            " stored_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self.db.commit()
+
+    # --- counters ---
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+        run_stats.count(f"http_cache.{name}")
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
+
+    # --- storage ---
+
+    def lookup(self, key):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT key, url, status, headers, body, encoding, etag, last_modified, stored_at"
+                " FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+        key, url, status, headers, body, encoding, etag, last_modified, stored_at = row
+        return CacheEntry(key, url, status, json.loads(headers), body, encoding, etag, last_modified, stored_at)
+
+    def store(self, key, url, body, headers=None, encoding=None, status=200):
+        headers = dict(headers or {})
+        lower = {k.lower(): v for k, v in headers.items()}
+        if "no-store" in lower.get("cache-control", "").lower():
+            return
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(headers), body, encoding,
+                 lower.get("etag"), lower.get("last-modified"), now, now, len(body)),
+            )
+            self._evict()
+            self.db.commit()
+
+    def refresh(self, key):
+        """Mark an entry fresh again after a 304."""
+        now = time.time()
+        with self.lock:
+            self.db.execute("UPDATE entries SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM entries")
+            self.db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_http_cache():
+    """Process-wide cache configured from settings."""
+    global _cache
+    from django.conf import settings
+
+    with _cache_lock:
+        if _cache is None:
+            _cache = HttpCache(
+                Path(settings.SCRAPER_CACHE_DIR) / "http_cache.sqlite3",
+                ttl=settings.SCRAPER_HTTP_CACHE_TTL,
+                max_bytes=settings.SCRAPER_HTTP_CACHE_MAX_MB * 1024 * 1024,
+            )
+        return _cache
@@ -0,0 +1,169 @@
+"""
+Batched, concurrent OpenAI moderation with a persistent verdict cache.
+
+Verdicts are stored per (sha256 of the exact text, moderation model) in
+scraper.ModerationVerdict and consulted before any API call, by both the
+scraper (clean_dataset) and the trainer (moderation_check), so repeat runs
+of a character need close to no moderation requests. Entries older than
+MODERATION_CACHE_TTL_DAYS are ignored, since an alias such as
+omni-moderation-latest can move to a newer model; invalidate() drops
+entries outright, e.g. for one superseded model_version.
+
+Uncached texts first go through the offline pre-filter (prefilter.py):
+blocklist hits are flagged locally (narrow positive lines are passed too
+when MODERATION_PREFILTER_LOCAL_SAFE is on), and only the uncertain rest
+is cut into batches of BATCH_SIZE (the endpoint takes a list of inputs)
+and sent MAX_CONCURRENCY requests at a time. Results come back aligned
+with the input list, duplicates included.
+"""
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from openai import OpenAI
+
+from jobs import progress
+from scraper.models import ModerationVerdict
+
+from . import prefilter, run_stats
+
+MODEL = getattr(settings, "MODERATION_MODEL", "omni-moderation-latest")
+BATCH_SIZE = getattr(settings, "MODERATION_BATCH_SIZE", 32)
+MAX_CONCURRENCY = getattr(settings, "MODERATION_CONCURRENCY", 4)
+CACHE_TTL = timedelta(days=getattr(settings, "MODERATION_CACHE_TTL_DAYS", 30))
+PREFILTER = getattr(settings, "MODERATION_PREFILTER", True)
+LOOKUP_CHUNK = 10000  # hashes per IN (...) query
+
+client = OpenAI(api_key=settings.OPENAI_KEY, base_url=getattr(settings, "OPENAI_BASE_URL", None) or None)
+
+_lock = threading.Lock()
+_counters = {"cached": 0, "prefiltered": 0, "moderated": 0, "requests": 0, "requests_saved": 0}
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _count(name, n=1):
+    with _lock:
+        _counters[name] += n
+    run_stats.count(f"moderation.{name}", n)
+
+
+def stats():
+    with _lock:
+        return dict(_counters)
+
+
+def flagged_categories(result):
+    return [name for name, value in result.categories.model_dump().items() if value]
+
+
+def cached_verdicts(texts, model=MODEL):
+    """{text: verdict} for the texts with a live cache entry."""
+    by_hash = {text_hash(t): t for t in texts}
+    hashes = list(by_hash)
+    since = timezone.now() - CACHE_TTL
+    found = {}
+    for i in range(0, len(hashes), LOOKUP_CHUNK):
+        rows = ModerationVerdict.objects.filter(
+            content_hash__in=hashes[i:i + LOOKUP_CHUNK], model=model, created_at__gte=since,
+        ).values_list("content_hash", "flagged", "categories")
+        for h, flagged, categories in rows:
+            found[by_hash[h]] = {"flagged": flagged, "categories": categories}
+    return found
+
+
+def store_verdicts(verdicts, model=MODEL, model_version=""):
+    """Cache {text: verdict}; failed calls (None) are not cached."""
+    hashes = {text_hash(t): v for t, v in verdicts.items() if v is not None}
+    # Replace expired rows for the same key; together, so a failed insert keeps the old rows
+    with transaction.atomic():
+        ModerationVerdict.objects.filter(content_hash__in=list(hashes), model=model).delete()
+        ModerationVerdict.objects.bulk_create([
+            ModerationVerdict(content_hash=h, model=model, model_version=model_version,
+                              flagged=v["flagged"], categories=v["categories"])
+            for h, v in hashes.items()
+        ], ignore_conflicts=True)
+
+
+def invalidate(model=None, model_version=None):
+    """Drop cached verdicts, all or those of one model / model_version. Returns the count."""
+    qs = ModerationVerdict.objects.all()
+    if model:
+        qs = qs.filter(model=model)
+    if model_version:
+        qs = qs.filter(model_version=model_version)
+    return qs.delete()[0]
+
+
+def _moderate_batch(batch):
+    """({text: verdict}, model_version) for one request; verdicts are None when the call failed."""
+    _count("requests")
+    try:
+        resp = client.moderations.create(model=MODEL, input=batch)
+    except Exception as e:
+        print(f"⚠️ Moderation check failed for {len(batch)} texts: {e}")
+        return dict.fromkeys(batch), ""
+    verdicts = {
+        text: {"flagged": r.flagged, "categories": flagged_categories(r)}
+        for text, r in zip(batch, resp.results)
+    }
+    return verdicts, getattr(resp, "model", "") or ""
+
+
+def _prefilter(texts):
+    """Local verdicts for the clear cases; returns ({text: verdict}, uncertain texts)."""
+    local, uncertain = {}, []
+    for text in texts:
+        label, categories = prefilter.classify(text)
+        if label == "uncertain":
+            uncertain.append(text)
+        else:
+            local[text] = {"flagged": label == "unsafe", "categories": categories}
+    return local, uncertain
+
+
+def moderate(texts, batch_size=BATCH_SIZE, concurrency=MAX_CONCURRENCY, use_prefilter=PREFILTER):
+    """
+    Verdicts aligned with texts: {"flagged", "categories"}, or None where
+    the API call failed.
+    """
+    unique = list(dict.fromkeys(texts))
+    progress.report("moderate", done=0, total=len(unique), message="OpenAI moderation")
+
+    verdicts = cached_verdicts(unique)
+    _count("cached", len(verdicts))
+    progress.advance(len(verdicts), moderation_cached=len(verdicts))
+
+    todo = [t for t in unique if t not in verdicts]
+    if use_prefilter and todo:
+        local, uncertain = _prefilter(todo)
+        saved = -(-len(todo) // batch_size) - -(-len(uncertain) // batch_size)
+        verdicts.update(local)
+        todo = uncertain
+        _count("prefiltered", len(local))
+        _count("requests_saved", saved)
+        progress.advance(len(local), moderation_prefiltered=len(local), moderation_requests_saved=saved)
+        print(f"🧹 Pre-filter settled {len(local)} texts locally, {len(todo)} left for the API "
+              f"({saved} requests saved)")
+    batches = [todo[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as pool:
+            # Results arrive in order on this thread, which owns the DB writes
+            for batch, (result, model_version) in zip(batches, pool.map(run_stats.bind(_moderate_batch), batches)):
+                verdicts.update(result)
+                store_verdicts(result, model_version=model_version)
+                _count("moderated", len(batch))
+                progress.advance(len(batch), moderation_requests=1)
+    return [verdicts[t] for t in texts]
+
+
+def safe_flags(texts, **kwargs):
+    """True per text that passed moderation; failed calls count as unsafe."""
+    return [v is not None and not v["flagged"] for v in moderate(texts, **kwargs)]
@@ -0,0 +1,153 @@
+"""
+Near-duplicate quote detection: shingled MinHash + LSH banding.
+
+Exact dedupe misses the same quote with different punctuation, an
+attribution suffix ("— Naruto") or a truncated ending. Each quote is
+normalized (lowercase, attribution / punctuation stripped), cut into
+character shingles and summarized by a MinHash signature. Signatures are
+split into bands; quotes sharing any band bucket are candidates, and
+candidates are confirmed on the real shingle sets by Jaccard similarity
+(reworded / re-punctuated copies) or containment (truncated copies).
+Lookups only touch bucket-mates, so the cost grows ~linearly with the
+number of quotes instead of comparing every pair.
+"""
+
+import hashlib
+import re
+
+DEFAULT_THRESHOLD = 0.8     # Jaccard on shingle sets
+DEFAULT_CONTAINMENT = 0.9   # share of the shorter quote found in the longer one
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 16          # 16 bands × 4 rows → candidates from ~0.5 similarity
+SHINGLE = 4
+MASK64 = (1 << 64) - 1
+MAX_HASH = MASK64
+MIX = 0x9E3779B97F4A7C15    # 64-bit golden-ratio multiplier
+
+# "— Naruto", "~ Luffy", " - Itachi Uchiha" at the end; hyphenated words are left alone
+ATTRIBUTION = re.compile(r"\s*(?:[–—―~]+|\s-+)\s*[\w .,'()]{1,40}$")
+NON_WORD = re.compile(r"[^\w\s]+")
+SPACES = re.compile(r"\s+")
+
+
+def normalize(text):
+    """Comparison form: attribution, punctuation and case removed."""
+    text = ATTRIBUTION.sub("", text.strip())
+    text = NON_WORD.sub(" ", text.lower())
+    return SPACES.sub(" ", text).strip()
+
+
+def fingerprint(text):
+    """
+    Stable content hash (stored on ScrapedQuote.content_hash): case,
+    punctuation and spacing are folded, but unlike normalize() no words are
+    dropped, so a trailing " — ..." clause changes the hash.
+    """
+    text = NON_WORD.sub(" ", text.lower())
+    return hashlib.sha1(SPACES.sub(" ", text).strip().encode("utf-8")).hexdigest()
+
+
+def shingles(text, k=SHINGLE):
+    """Hashed character k-grams of the normalized text (in-process hashes, never persisted)."""
+    norm = normalize(text)
+    if len(norm) <= k:
+        return {hash(norm)} if norm else set()
+    return {hash(norm[i:i + k]) for i in range(len(norm) - k + 1)}
+
+
+class NearDupIndex:
+    def __init__(self, threshold=DEFAULT_THRESHOLD, containment=DEFAULT_CONTAINMENT,
+                 num_perm=DEFAULT_NUM_PERM, bands=DEFAULT_BANDS):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.containment = containment
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.buckets = [{} for _ in range(bands)]
+        self.sets = {}
+        self.band_keys = {}  # key -> its band bucket keys, to unindex it
+
+    def signature(self, sh):
+        """
+        One-permutation MinHash: each shingle hash is mixed once and lands in
+        one of num_perm bins, keeping the minimum per bin; empty bins borrow
+        from the next filled bin. One pass over the shingles instead of
+        num_perm passes, with the same collision behaviour for LSH.
+        """
+        n = self.num_perm
+        sig = [MAX_HASH] * n
+        for h in sh:
+            h = (h * MIX) & MASK64
+            b, v = h % n, h // n
+            if v < sig[b]:
+                sig[b] = v
+        if len(sh) < n:
+            filled = [i for i in range(n) if sig[i] != MAX_HASH]
+            if filled:
+                for i in range(n):
+                    if sig[i] == MAX_HASH:
+                        j = next((f for f in filled if f > i), filled[0])
+                        sig[i] = sig[j] + (j - i) % n
+        return sig
+
+    def _bands(self, sig):
+        r = self.rows
+        return [hash(tuple(sig[b * r:(b + 1) * r])) for b in range(self.bands)]
+
+    def similar(self, a, b):
+        inter = len(a & b)
+        if not inter:
+            return False
+        if inter / len(a | b) >= self.threshold:
+            return True
+        return inter / min(len(a), len(b)) >= self.containment
+
+    def match(self, text):
+        """Key of an indexed near-duplicate of text, or None."""
+        sh = shingles(text)
+        return self._match(sh, self._bands(self.signature(sh)))
+
+    def _match(self, sh, band_keys):
+        seen = set()
+        for bucket, bk in zip(self.buckets, band_keys):
+            for key in bucket.get(bk, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                if self.similar(sh, self.sets[key]):
+                    return key
+        return None
+
+    def add(self, key, text):
+        sh = shingles(text)
+        self._add(key, sh, self._bands(self.signature(sh)))
+
+    def _add(self, key, sh, band_keys):
+        self.sets[key] = sh
+        self.band_keys[key] = band_keys
+        for bucket, bk in zip(self.buckets, band_keys):
+            bucket.setdefault(bk, []).append(key)
+
+    def remove(self, key):
+        self.sets.pop(key, None)
+        for bucket, bk in zip(self.buckets, self.band_keys.pop(key, ())):
+            keys = bucket[bk]
+            keys.remove(key)
+            if not keys:
+                del bucket[bk]
+
+    def replace(self, key, text):
+        """Re-index key under text (e.g. the longer variant of a quote), dropping its old shingles and buckets."""
+        self.remove(key)
+        self.add(key, text)
+
+    def add_if_new(self, key, text):
+        """Index text under key unless it near-duplicates an indexed quote; returns the existing key if so."""
+        sh = shingles(text)
+        band_keys = self._bands(self.signature(sh))
+        existing = self._match(sh, band_keys)
+        if existing is None:
+            self._add(key, sh, band_keys)
+        return existing
@@ -0,0 +1,117 @@
+"""
+Event-driven readiness for dynamically rendered pages.
+
+Replaces the fixed sleep-and-count scroll loop: a script injected into the
+page watches DOM mutations (MutationObserver) and network activity, and
+scrolls the newest quote container into view whenever the count grows to
+trigger lazy loading. Network activity is the page's fetch / XHR calls,
+wrapped so a request counts as in flight from the moment it starts (a
+lazy-load slower than the quiet window must not look like idle), plus
+PerformanceObserver resource entries for everything else.
+
+The page is ready once the containers have stopped growing and no tracked
+request has been in flight for `quiet` seconds; before accepting that, the
+script scrolls to the very bottom once more and waits another quiet window,
+since infinite-scroll pages often only fetch the next batch from there.
+`max_wait` caps it all.
+"""
+
+import time
+
+DEFAULT_QUIET = 0.5      # seconds without growth / network activity
+DEFAULT_MAX_WAIT = 15.0  # hard cap per page
+STUCK_MS = 3000          # stable this long counts as ready even with requests still open (ads, long-polls)
+
+READY_JS = """
+const [selector, quietMs, maxMs, stuckMs, done] = arguments;
+const start = performance.now();
+let count = -1, lastGrowth = start, lastNet = start, timer = null, inflight = 0, confirming = false;
+
+const po = (typeof PerformanceObserver !== "undefined") ? new PerformanceObserver(() => { lastNet = performance.now(); }) : null;
+try { po && po.observe({type: "resource"}); } catch (e) {}
+
+function started() { inflight++; lastNet = performance.now(); }
+function settled() { inflight = Math.max(0, inflight - 1); lastNet = performance.now(); }
+
+const origFetch = window.fetch;
+if (origFetch) {
+  window.fetch = function () {
+    started();
+    try { return origFetch.apply(this, arguments).finally(settled); }
+    catch (e) { settled(); throw e; }
+  };
+}
+const origSend = XMLHttpRequest.prototype.send;
+XMLHttpRequest.prototype.send = function () {
+  started();
+  this.addEventListener("loadend", settled, {once: true});
+  try { return origSend.apply(this, arguments); }
+  catch (e) { settled(); throw e; }
+};
+
+function recount() {
+  const els = document.querySelectorAll(selector);
+  if (els.length !== count) {
+    count = els.length;
+    lastGrowth = performance.now();
+    confirming = false;
+    if (els.length) { els[els.length - 1].scrollIntoView({block: "end"}); }
+    else { window.scrollBy(0, 1000); }
+  }
+}
+
+const mo = new MutationObserver((records) => {
+  for (const r of records) {
+    if (r.addedNodes.length) { recount(); break; }
+  }
+});
+mo.observe(document.documentElement, {childList: true, subtree: true});
+
+function finish(timedOut) {
+  mo.disconnect();
+  po && po.disconnect();
+  if (origFetch) { window.fetch = origFetch; }
+  XMLHttpRequest.prototype.send = origSend;
+  clearTimeout(timer);
+  done({count: count, waited_ms: performance.now() - start, timed_out: timedOut});
+}
+
+function check() {
+  recount();
+  const now = performance.now();
+  const stable = now - lastGrowth >= quietMs;
+  const netIdle = inflight === 0 && now - lastNet >= quietMs;
+  // Containers stopped growing and the network settled; ads can keep the
+  // network busy forever, so a much longer stable window also counts.
+  if (document.readyState === "complete" && stable && (netIdle || now - lastGrowth >= stuckMs)) {
+    if (confirming) { return finish(false); }
+    // One more pass from the very bottom before trusting the quiet
+    confirming = true;
+    window.scrollTo(0, document.body.scrollHeight);
+    lastGrowth = performance.now();
+  }
+  if (now - start >= maxMs) { return finish(true); }
+  timer = setTimeout(check, Math.min(100, quietMs / 2));
+}
+check();
+"""
+
+
+def wait_until_ready(driver, selector, quiet=DEFAULT_QUIET, max_wait=DEFAULT_MAX_WAIT):
+    """
+    Block until quote containers matching selector stop growing.
+    Returns {"count", "waited", "timed_out"} with waited in seconds.
+    """
+    t0 = time.monotonic()
+    driver.set_script_timeout(max_wait + 5)
+    try:
+        result = driver.execute_async_script(READY_JS, selector, int(quiet * 1000), int(max_wait * 1000),
+                                              max(STUCK_MS, int(4 * quiet * 1000))) or {}
+    except Exception as e:
+        print(f"[page ready] readiness script failed, using page as-is: {e}")
+        result = {"count": -1, "timed_out": True}
+    return {
+        "count": result.get("count", -1),
+        "waited": round(time.monotonic() - t0, 3),
+        "timed_out": bool(result.get("timed_out")),
+    }
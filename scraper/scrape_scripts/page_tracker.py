@@ -0,0 +1,80 @@
+"""
+Per-character memory of scraped pages, for incremental refreshes.
+
+Like the DomainRouter, a tracker is loaded once before a run, consulted
+from worker threads / the event loop without touching the DB, and written
+back once after the run (scraper.ScrapedPage):
+- "fresh":   scraped less than REFRESH_MIN_AGE ago, not fetched at all
+- "known":   fetched again (the HTTP cache revalidates it), but when the
+             body hashes the same as last time extraction is skipped
+- "new":     never scraped for this character
+"""
+
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from scraper.models import ScrapedPage
+
+from .url_utils import canonical_url, url_hash
+
+REFRESH_MIN_AGE = timedelta(hours=getattr(settings, "SCRAPER_REFRESH_MIN_AGE_HOURS", 24))
+
+
+def body_hash(html_text):
+    return hashlib.sha1(html_text.encode("utf-8", "replace")).hexdigest()
+
+
+class PageTracker:
+    def __init__(self, pages=None):
+        self.pages = {p.url: p for p in pages or []}
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, character_name):
+        """Pages already scraped for this character (none if it does not exist yet)."""
+        return cls(list(ScrapedPage.objects.filter(character__name__iexact=character_name)))
+
+    def plan(self, url):
+        page = self.pages.get(canonical_url(url))
+        if page is None:
+            return "new"
+        if timezone.now() - page.last_scraped < REFRESH_MIN_AGE:
+            return "fresh"
+        return "known"
+
+    def select(self, urls):
+        """URLs worth fetching: new ones and known ones past REFRESH_MIN_AGE."""
+        return [u for u in urls if self.plan(u) != "fresh"]
+
+    def unchanged(self, url, html_text):
+        """True if the page body is the one extracted last time (nothing new on it)."""
+        page = self.pages.get(canonical_url(url))
+        if page is None or not page.body_hash or html_text is None:
+            return False
+        if page.body_hash != body_hash(html_text):
+            return False
+        self.record(url, html_text, page.quotes_found)
+        return True
+
+    def record(self, url, html_text=None, quotes=0):
+        """Remember one scraped page; html_text is None for browser-rendered pages."""
+        digest = body_hash(html_text) if html_text is not None else ""
+        with self._lock:
+            self._seen[canonical_url(url)] = (digest, quotes)
+
+    def save(self, character):
+        """Write this run's pages for character."""
+        with self._lock:
+            seen, self._seen = self._seen, {}
+        now = timezone.now()
+        for url, (digest, quotes) in seen.items():
+            page, _ = ScrapedPage.objects.update_or_create(
+                character=character, url_hash=url_hash(url),
+                defaults={"url": url, "body_hash": digest, "quotes_found": quotes, "last_scraped": now},
+            )
+            self.pages[url] = page
@@ -0,0 +1,127 @@
+"""
+Offline moderation pre-filter, run before the OpenAI moderation API.
+
+Each text gets one of three labels:
+- "unsafe":    a blocklist term matched (compiled lexicon, word-bounded)
+- "uncertain": everything else by default; these all go to the API
+- "safe":      only with MODERATION_PREFILTER_LOCAL_SAFE on, and only for
+               a narrow positive signal: short, at least one positive term
+               (dreams, friends, never give up...), no risk-lexicon term,
+               and a low lexicon score
+
+A word list cannot show that a text is harmless (threats, dehumanising
+or sexual lines often use no flagged word at all), so the local "safe"
+label is opt-in and the default only short-circuits blocklist hits.
+
+The score is a small linear model over lexicon features: a weighted count
+of risk terms per category, positive terms pulling it down, and a length
+term, squashed with a sigmoid.
+
+Extra blocklist terms (one per line) can be loaded from
+MODERATION_BLOCKLIST_PATH, e.g. a slur list kept outside the repo.
+"""
+
+import math
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+LOCAL_SAFE = getattr(settings, "MODERATION_PREFILTER_LOCAL_SAFE", False)
+SAFE_BELOW = getattr(settings, "MODERATION_PREFILTER_SAFE_BELOW", 0.2)
+MAX_SAFE_LENGTH = 120  # longer texts always go to the API
+
+# Hard blocks: matching any of these is enough to drop a text
+BLOCKLIST = {
+    "sexual/minors": ["child porn", "underage sex", "loli porn"],
+    "sexual": ["porn", "pornhub", "blowjob", "handjob", "cumshot", "gangbang", "hentai"],
+    "self-harm/instructions": ["kill yourself", "kys", "slit your wrists", "hang yourself"],
+    "violence/graphic": ["behead", "dismember", "disembowel"],
+}
+
+# Risk terms: not blocked, but the API has to look at the text
+RISK_TERMS = {
+    "violence": (1.5, ["kill", "killed", "killing", "murder", "blood", "bloody", "stab", "shoot", "gun",
+                       "slaughter", "massacre", "torture", "destroy", "die", "dead", "death", "corpse", "war",
+                       "rip", "throat", "find you", "hunt you", "burn", "beat", "hurt", "punch", "crush"]),
+    "self-harm": (2.5, ["suicide", "cut myself", "end my life", "want to die", "self harm", "jump off",
+                        "bridge", "overdose", "not worth living"]),
+    "harassment": (1.5, ["stupid", "idiot", "worthless", "pathetic", "loser", "trash", "scum", "bastard"]),
+    "hate": (2.5, ["hate", "inferior", "vermin", "subhuman", "filth", "animals", "exterminate",
+                   "exterminated", "wipe out", "people like them", "their kind", "those people"]),
+    "sexual": (2.0, ["sex", "sexy", "naked", "nude", "breasts", "boobs", "horny", "seduce", "clothes",
+                     "undress", "bed", "touch", "body"]),
+    "minors": (3.0, ["girl", "boy", "child", "children", "kid", "kids", "little one", "young", "school"]),
+    "profanity": (1.0, ["damn", "hell", "shit", "fuck", "bitch", "ass", "crap"]),
+    "drugs": (1.5, ["drug", "drugs", "cocaine", "heroin", "meth", "weed"]),
+}
+
+POSITIVE_WEIGHT = -0.4
+POSITIVE_TERMS = [
+    "dream", "dreams", "friend", "friends", "believe", "hope", "never give up", "strong", "stronger",
+    "protect", "together", "smile", "future", "promise", "courage", "heart", "family", "love", "peace",
+]
+BIAS = -2.5
+LENGTH_WEIGHT = 0.004  # per character: long texts carry more unseen risk
+
+
+def _alternation(terms):
+    # Longest first so multi-word terms win over their prefixes
+    return "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+
+
+def _group_name(category):
+    return re.sub(r"\W", "_", category)
+
+
+def _load_extra_blocklist():
+    path = getattr(settings, "MODERATION_BLOCKLIST_PATH", "")
+    if not path or not Path(path).exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [line.strip().lower() for line in f if line.strip() and not line.startswith("#")]
+
+
+@lru_cache(maxsize=1)
+def compiled():
+    """(blocklist pattern, {category: (weight, pattern)}, positive pattern), built once."""
+    blocked = dict(BLOCKLIST)
+    extra = _load_extra_blocklist()
+    if extra:
+        blocked["custom"] = extra
+    block = re.compile(
+        "|".join(rf"(?P<{_group_name(cat)}>\b(?:{_alternation(terms)})\b)" for cat, terms in blocked.items()),
+        re.I,
+    )
+    block_names = {_group_name(cat): cat for cat in blocked}
+    risk = {cat: (w, re.compile(rf"\b(?:{_alternation(terms)})\b", re.I)) for cat, (w, terms) in RISK_TERMS.items()}
+    positive = re.compile(rf"\b(?:{_alternation(POSITIVE_TERMS)})\b", re.I)
+    return block, block_names, risk, positive
+
+
+def score(text):
+    """(probability-like risk score in 0..1, risk categories hit)."""
+    _, _, risk, positive = compiled()
+    z = BIAS + LENGTH_WEIGHT * len(text)
+    hit = []
+    for cat, (weight, pattern) in risk.items():
+        n = len(pattern.findall(text))
+        if n:
+            hit.append(cat)
+            z += weight * n
+    z += POSITIVE_WEIGHT * len(positive.findall(text))
+    return 1 / (1 + math.exp(-z)), hit
+
+
+def classify(text, local_safe=LOCAL_SAFE):
+    """("safe" | "unsafe" | "uncertain", categories); "safe" only when local_safe is on."""
+    block, block_names, _, positive = compiled()
+    m = block.search(text)
+    if m:
+        return "unsafe", [block_names[m.lastgroup]]
+    p, hit = score(text)
+    if (local_safe and not hit and p < SAFE_BELOW and len(text) <= MAX_SAFE_LENGTH
+            and positive.search(text)):
+        return "safe", []
+    return "uncertain", hit
@@ -0,0 +1,30 @@
+"""
+"Already known?" lookups against every quote stored in analytics.ScrapedQuote.
+
+Quotes are matched on near_dup.fingerprint, so a rescrape that finds the
+same quote with different case, punctuation or spacing still hits. A hit
+hands back the stored text, which is what passed moderation: callers write
+that, never the new scraped variant, without moderating it again.
+"""
+
+from analytics.models import ScrapedQuote
+
+from .near_dup import fingerprint
+
+# Hashes per IN (...) query; stays well under SQLite's bound-parameter limit
+LOOKUP_CHUNK = 10000
+
+
+def known_quotes(quotes):
+    """
+    Stored quotes among `quotes`, in one query per LOOKUP_CHUNK quotes.
+    Returns {content_hash: (stored quote, set(character_id))} for the hashes already held.
+    """
+    hashes = list({fingerprint(q) for q in quotes})
+    known = {}
+    for i in range(0, len(hashes), LOOKUP_CHUNK):
+        rows = ScrapedQuote.objects.filter(content_hash__in=hashes[i:i + LOOKUP_CHUNK]) \
+            .values_list("content_hash", "quote", "character_id")
+        for h, quote, character_id in rows:
+            known.setdefault(h, (quote, set()))[1].add(character_id)
+    return known
@@ -0,0 +1,76 @@
+"""
+Per-run counters for ScrapeMetrics / TrainingMetrics.
+
+The caches, the browser pool and moderation keep process-wide totals, which
+two jobs running side by side in one run_worker process would both see.
+Each of those call sites also counts into the collector of the run it
+belongs to:
+
+    with run_stats.collecting() as stats:
+        ...
+    stats.get("http_cache.hits")
+
+Like jobs.progress, the collector lives in a context variable: outside a
+run count() is a no-op, and work handed to a thread pool has to be wrapped
+with bind() on the calling thread to count into the same run.
+"""
+
+import contextvars
+import threading
+from contextlib import contextmanager
+
+_current = contextvars.ContextVar("run_stats", default=None)
+
+
+class RunStats:
+    def __init__(self):
+        self.counters = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def get(self, name, default=0):
+        with self._lock:
+            return self.counters.get(name, default)
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counters)
+
+
+@contextmanager
+def collecting():
+    """Count everything this thread (and what it bind()s) does into a fresh RunStats."""
+    stats = RunStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+def count(name, n=1):
+    stats = _current.get()
+    if stats is not None:
+        stats.count(name, n)
+
+
+def bind(fn):
+    """fn, set up to count into the calling thread's run from whichever thread calls it."""
+    stats = _current.get()
+    if stats is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _current.set(stats)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+    return run
@@ -5,7 +5,7 @@ Dynamic, parallel quote scraper.
 Features:
 - Discovers URLs with Google (via SerpAPI)
 - Scrapes top-N results in parallel
-- Static HTML first (requests+BS4), optional Selenium fallback for JS pages
+- Static HTML first (pooled requests session + BS4), optional Selenium fallback for JS pages
 - Simple site-specific handlers where helpful; generic extractor otherwise
 - Outputs CSV: source_url, quote
 
@@ -17,17 +17,34 @@ import csv
 import time
 import html
 import argparse
-import threading
+from collections import deque
 from urllib.parse import urlparse
 
 from django.conf import settings
 
 from analytics.models import ScrapedQuote
-import requests
 from bs4 import BeautifulSoup
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from jobs import progress
 from scraper.models import Character
+from . import async_fetch, moderation, run_stats, search_cache
+from .transport import (
+    CHUNK_SIZE, check_html_content_type, detect_charset, get_transport, read_capped,
+)
+from .http_cache import CachedResponse, get_http_cache
+from .url_utils import canonical_url, dedupe_key
+from .domain_router import domain_of
+from .html_doc import as_document, compile_selector, resolve_backend
+from .browser_pool import get_driver_pool
+from .embedded_data import find_embedded_quotes
+from .extractors import site_rule_for
+from .candidate_filter import classifier_for
+from .near_dup import NearDupIndex, fingerprint, normalize as near_dup_normalize
+from .quote_index import known_quotes
+from .bulk_writer import BulkWriter
+from .text_utils import clean_text
+from .page_ready import DEFAULT_MAX_WAIT, DEFAULT_QUIET, wait_until_ready
 
 # ---------------------------
 # Config
@@ -38,6 +55,28 @@ DEFAULT_TIMEOUT = 20
 DEFAULT_WORKERS = 8
 DEFAULT_MAX_URLS = 30
 SERPAPI_KEY = settings.SERPAPI_KEY
+# Jaccard similarity above which two quotes count as the same quote
+NEAR_DUP_THRESHOLD = getattr(settings, "SCRAPER_NEAR_DUP_THRESHOLD", 0.8)
+
+# Discovery fan-out: query variants × result pages searched concurrently
+DISCOVERY_QUERY_VARIANTS = getattr(settings, "SCRAPER_DISCOVERY_QUERY_VARIANTS", 3)
+DISCOVERY_PAGES = getattr(settings, "SCRAPER_DISCOVERY_PAGES", 2)
+DISCOVERY_MAX_PER_DOMAIN = 3
+PREFERRED_QUOTE_SITES = {
+    "ranker.com", "cbr.com", "epicquotes.com", "sportskeeda.com",
+    "scatteredquotes.com", "animemotivation.com", "goodreads.com",
+}
+
+# Fetch engine for scrape_many / scrape_url: "threads" or "async"
+DEFAULT_ENGINE = getattr(settings, "SCRAPER_FETCH_ENGINE", "threads")
+ASYNC_MAX_IN_FLIGHT = getattr(settings, "SCRAPER_ASYNC_MAX_IN_FLIGHT", async_fetch.DEFAULT_MAX_IN_FLIGHT)
+ASYNC_PER_HOST = getattr(settings, "SCRAPER_ASYNC_PER_HOST", async_fetch.DEFAULT_PER_HOST)
+
+# Stop reading a page body after this many bytes
+MAX_PAGE_BYTES = getattr(settings, "SCRAPER_MAX_PAGE_BYTES", 3 * 1024 * 1024)
+
+# HTML parser backend: "auto", "selectolax", "lxml" or "html.parser"
+HTML_PARSER = resolve_backend(getattr(settings, "SCRAPER_HTML_PARSER", "auto"))
 
 # Domains that frequently require JS rendering
 LIKELY_JS_DOMAINS = {
@@ -48,24 +87,66 @@ LIKELY_JS_DOMAINS = {
 # Utilities
 # ---------------------------
 
-def fetch(url, timeout=DEFAULT_TIMEOUT, headers=None):
-    """GET with sensible defaults."""
+def fetch(url, timeout=DEFAULT_TIMEOUT, headers=None, use_cache=True, max_bytes=None):
+    """
+    GET through the shared transport (transport.get_transport): one pooled
+    keep-alive session, per-host rate limits, and retries with backoff on
+    429 / 5xx / connection errors.
+    Served from the on-disk cache while fresh; stale entries are revalidated
+    with a conditional GET and a 304 returns the stored body.
+    Network bodies are streamed: non-HTML content types raise ContentRejected
+    and reading stops after max_bytes (SCRAPER_MAX_PAGE_BYTES by default).
+    """
+    max_bytes = max_bytes or MAX_PAGE_BYTES
     h = {"User-Agent": DEFAULT_USER_AGENT}
     if headers:
         h.update(headers)
-    resp = requests.get(url, headers=h, timeout=timeout)
-    resp.raise_for_status()
-    return resp
+
+    cache = get_http_cache() if use_cache else None
+    key = canonical_url(url)
+    entry = cache.lookup(key) if cache else None
+    if entry and entry.is_fresh(cache.ttl):
+        cache.count("hits")
+        return entry.as_response()
+    if entry:
+        h.update(entry.validators())
+
+    resp = get_transport().get(url, headers=h, timeout=timeout, stream=True)
+    with resp:
+        if entry and resp.status_code == 304:
+            cache.refresh(key)
+            cache.count("revalidated")
+            return entry.as_response()
+        resp.raise_for_status()
+
+        # Stream the body: reject non-HTML before reading, stop at the byte cap
+        content_type = resp.headers.get("Content-Type", "")
+        check_html_content_type(content_type, url)
+        body, truncated = read_capped(resp.iter_content(CHUNK_SIZE), max_bytes)
+
+    encoding = detect_charset(content_type, body)
+    if truncated:
+        print(f"[fetch] {url}: body capped at {max_bytes} bytes")
+    if cache:
+        cache.count("misses")
+        # A capped body is not the page: serve it this once, don't cache it as complete
+        if not truncated:
+            cache.store(key, url, body, resp.headers, encoding, resp.status_code)
+    return CachedResponse(url, resp.status_code, dict(resp.headers), body, encoding,
+                          from_cache=False, truncated=truncated)
 
 def fetch_soup(url, **kwargs):
     """Return BeautifulSoup of the URL (static)."""
     resp = fetch(url, **kwargs)
-    return BeautifulSoup(resp.text, "html.parser")
+    return BeautifulSoup(resp.text, "lxml" if resolve_backend("lxml") == "lxml" else "html.parser")
+
+def is_likely_js_domain(url):
+    host = urlparse(url).netloc.lower()
+    return any(host.endswith(d) for d in LIKELY_JS_DOMAINS)
 
 def is_probably_js(url, html_text=None):
     """Heuristic: JS-rendered if domain is known or HTML is script-heavy/short."""
-    host = urlparse(url).netloc.lower()
-    if any(host.endswith(d) for d in LIKELY_JS_DOMAINS):
+    if is_likely_js_domain(url):
         return True
     if html_text is None:
         try:
@@ -78,76 +159,55 @@ def is_probably_js(url, html_text=None):
 # Selenium (dynamic)
 # ---------------------------
 
-_browser_lock = threading.Lock()  # to avoid spinning up too many browsers at once
+# (url, seconds waited, containers found, timed out) of the most recent rendered pages,
+# for debugging page_ready; per-run totals go through run_stats
+READY_LOG = deque(maxlen=200)
 
-def fetch_dynamic_html(url, scroll_selector=None, max_wait_loops=3, pause=1.0):
+def fetch_dynamic_html(url, scroll_selector=None, quiet=DEFAULT_QUIET, max_wait=DEFAULT_MAX_WAIT):
     """
     Faster text-only dynamic fetch with Selenium.
     Keeps error output visible but disables heavy resources.
+    Uses a warm driver from the shared browser pool instead of launching Chrome,
+    and returns as soon as the quote containers stop growing (see page_ready).
+    Rendered HTML is cached (TTL only, there is nothing to revalidate against).
     """
-    from selenium import webdriver
-    from selenium.webdriver.chrome.options import Options
-    from selenium.webdriver.common.by import By
-    import time
-
-    opts = Options()
-    opts.add_argument("--headless=new")
-    opts.add_argument("--no-sandbox")
-    opts.add_argument("--disable-dev-shm-usage")
-    opts.add_argument("--window-size=1600,900")
-    # 🚀 speed tweaks
-    opts.add_argument("--disable-gpu")
-    opts.add_argument("--blink-settings=imagesEnabled=false")   # no images
-    opts.add_argument("--disable-extensions")
-    opts.add_argument("--disable-notifications")
-    # block unnecessary content types
-    prefs = {
-        "profile.managed_default_content_settings.images": 2,
-        "profile.managed_default_content_settings.stylesheets": 2,
-        "profile.managed_default_content_settings.plugins": 2,
-        "profile.managed_default_content_settings.popups": 2,
-        "profile.managed_default_content_settings.geolocation": 2,
-        "profile.managed_default_content_settings.notifications": 2,
-    }
-    opts.add_experimental_option("prefs", prefs)
-
-    with _browser_lock:
-        driver = webdriver.Chrome(options=opts)
-
-    try:
-        start = time.time()
+    cache = get_http_cache()
+    key = "dynamic:" + canonical_url(url)
+    entry = cache.lookup(key)
+    if entry and entry.is_fresh(cache.ttl):
+        cache.count("hits")
+        return entry.as_response().text
+
+    with get_driver_pool().driver() as driver:
         driver.get(url)
 
-        selector = scroll_selector or "blockquote, q, p"
-        last_count, same = 0, 0
-        while True:
-            elems = driver.find_elements(By.CSS_SELECTOR, selector)
-            if elems:
-                driver.execute_script("arguments[0].scrollIntoView({block:'end'});", elems[-1])
-            else:
-                driver.execute_script("window.scrollBy(0, 1000);")
-
-            time.sleep(pause)
-            new_count = len(driver.find_elements(By.CSS_SELECTOR, selector))
-            same = same + 1 if new_count == last_count else 0
-            last_count = new_count
-            if same >= max_wait_loops or (time.time() - start) > 15:
-                break
+        ready = wait_until_ready(driver, scroll_selector or "blockquote, q, p", quiet=quiet, max_wait=max_wait)
+        READY_LOG.append((url, ready["waited"], ready["count"], ready["timed_out"]))
+        run_stats.count("browser.ready_seconds", ready["waited"])
+        print(f"[dynamic] {url}: ready in {ready['waited']}s "
+              f"({ready['count']} containers{', timed out' if ready['timed_out'] else ''})")
 
         html_source = driver.page_source
+        cache.count("misses")
+        cache.store(key, url, html_source.encode("utf-8"), encoding="utf-8")
         return html_source
-    finally:
-        driver.quit()
 
 # ---------------------------
 # SerpAPI Search
 # ---------------------------
 
-def google_search_serpapi(query, max_results=DEFAULT_MAX_URLS, country="us", lang="en"):
+def google_search_serpapi(query, max_results=DEFAULT_MAX_URLS, country="us", lang="en", use_cache=True, start=0):
     """
     Return a list of organic result URLs using SerpAPI.
-    Set env SERPAPI_KEY.
+    Set env SERPAPI_KEY. start offsets into the result pages.
+    Results are cached per normalized query / country / language for
+    SCRAPER_SEARCH_CACHE_TTL seconds (see search_cache.invalidate).
     """
+    if use_cache:
+        cached = search_cache.get_cached(query, country, lang, max_results, start)
+        if cached is not None:
+            return cached
+
     if not SERPAPI_KEY:
         raise RuntimeError("SERPAPI_KEY environment variable not set. Get one at https://serpapi.com")
 
@@ -159,7 +219,9 @@ def google_search_serpapi(query, max_results=DEFAULT_MAX_URLS, country="us", lan
         "gl": country,
         "api_key": SERPAPI_KEY
     }
-    resp = requests.get("https://serpapi.com/search", params=params, timeout=DEFAULT_TIMEOUT)
+    if start:
+        params["start"] = start
+    resp = get_transport().get("https://serpapi.com/search", params=params, timeout=DEFAULT_TIMEOUT)
     resp.raise_for_status()
     data = resp.json()
     urls = []
@@ -167,7 +229,16 @@ def google_search_serpapi(query, max_results=DEFAULT_MAX_URLS, country="us", lan
         url = item.get("link")
         if url and url.startswith("http"):
             urls.append(url)
-    return urls[:max_results]
+    urls = urls[:max_results]
+    if use_cache:
+        search_cache.store(query, country, lang, max_results, urls, start)
+    return urls
+
+def invalidate_search_cache(character=None):
+    """Forget cached discovery results for one character (or all of them)."""
+    if not character:
+        return search_cache.invalidate()
+    return search_cache.invalidate([q for q, _ in build_queries(character)])
 
 def build_query(character):
     # Bias toward quote pages; include exact or typographic quotes
@@ -175,192 +246,382 @@ def build_query(character):
     extras = ['"best quotes"', '"quotes"', 'site:ranker.com OR site:cbr.com OR site:epicquotes.com OR site:sportskeeda.com OR site:scatteredquotes.com OR site:animemotivation.com OR site:goodreads.com']
     return f"{base} " + " ".join(extras)
 
+def build_queries(character):
+    """
+    Query variants for discovery, most important first, with a ranking weight.
+    Each variant costs one SerpAPI call per result page (cached, see search_cache).
+    """
+    variants = [
+        (build_query(character), 1.0),
+        (f'"{character}" quotes', 0.8),
+        (f'{character} best lines dialogue', 0.6),
+    ]
+    return variants[:DISCOVERY_QUERY_VARIANTS]
+
 # ---------------------------
 # Extraction helpers
 # ---------------------------
 
-def clean_text(t):
-    t = html.unescape(t).strip()
-    t = t.replace("\xa0", " ").replace("\u200b", "")
-    return re.sub(r"\s+", " ", t)
+GENERIC_CANDIDATES = compile_selector("blockquote, q, li, p")
 
-QUOTE_LIKE = re.compile(r"[\"“”'«»‘’].{6,}")
+def parse_html(page):
+    """Parse raw HTML once with the configured backend (no-op for an HtmlDocument)."""
+    return as_document(page, HTML_PARSER)
 
-def generic_extract(html_text, base_url, character=None):
+def generic_extract(page, base_url, character=None):
     """
     Generic quote extraction from blockquote, q, p, li.
-    Stricter heuristics to keep only real character quotes and ignore site junk.
+    Stricter heuristics to keep only real character quotes and ignore site junk
+    (see candidate_filter: junk words, quote-ish text or the character's name,
+    12–350 characters), applied to all candidates in one batch.
+    page: raw HTML or an already parsed HtmlDocument.
     """
-    soup = BeautifulSoup(html_text, "html.parser")
-    candidates = soup.select("blockquote, q, li, p")
-    out = []
-
-    # Lowercase character name for matching
-    char_name = character.lower() if character else None
-
-    for c in candidates:
-        txt = clean_text(c.get_text(" ", strip=True))
-        if len(txt) < 12:
-            continue
-
-        # skip obvious junk text
-        junk_words = ["vote", "photo", "ranker", "comment", "episode", "great quote", "quotes list"]
-        if any(j in txt.lower() for j in junk_words):
-            continue
-
-        # must look quote-ish (starts with a quote mark or contains the character’s name)
-        looks_like_quote = QUOTE_LIKE.search(txt)
-        mentions_character = char_name and char_name in txt.lower()
-
-        if looks_like_quote or mentions_character:
-            # limit excessively long blocks of text
-            if len(txt) > 350:
-                continue
-            out.append((base_url, txt))
-
-    return out
+    doc = parse_html(page)
+    texts = [clean_text(doc.text(c)) for c in doc.select(GENERIC_CANDIDATES)]
+    flags = classifier_for(character).classify(texts)
+    return [(base_url, txt) for txt, keep in zip(texts, flags) if keep]
 
 # --- Site-specific (improve precision where possible) ---
+# Declarative per-host rules live in extractors.SITE_RULES.
 
-def extract_ranker(soup, base_url):
-    quotes = []
-    for div in soup.select("div.richText_container__Kvtj0"):
-        p = div.find("p")
-        if not p:
-            continue
-        txt = clean_text(p.get_text(" ", strip=True))
-        if txt and (txt.startswith('"') or txt.startswith("“") or txt.startswith("'")):
-            quotes.append((base_url, txt))
-    return quotes
+def site_specific_extract(page, url):
+    """Try site-known patterns first; else None. page: raw HTML or HtmlDocument."""
+    rule = site_rule_for(url)
+    if rule is None:
+        return None
+    return rule.extract(parse_html(page), url) or None
 
-def extract_scatteredquotes(soup, base_url):
-    return [(base_url, clean_text(bq.get_text(" ", strip=True)))
-            for bq in soup.select("blockquote.quote") if clean_text(bq.get_text(" ", strip=True))]
+# --- Embedded data (__NEXT_DATA__ / JSON-LD) ---
 
-def extract_epicquotes(soup, base_url):
+def embedded_extract(page, url):
+    """Quotes from JSON blobs shipped in the static HTML."""
+    doc = parse_html(page)
     out = []
-    for p in soup.select("div.entry-content p"):
-        txt = clean_text(p.get_text(" ", strip=True))
-        if len(txt.split()) > 4:
-            out.append((base_url, txt))
+    for q in find_embedded_quotes(doc):
+        txt = clean_text(q)
+        if txt:
+            out.append((url, txt))
     return out
 
-def site_specific_extract(html_text, url):
-    """Try site-known patterns first; else None."""
-    host = urlparse(url).netloc.lower()
-    soup = BeautifulSoup(html_text, "html.parser")
-    if "ranker.com" in host:
-        q = extract_ranker(soup, url)
-        if q:
-            return q
-    if "scatteredquotes.com" in host:
-        q = extract_scatteredquotes(soup, url)
-        if q:
-            return q
-    if "epicquotes.com" in host:
-        q = extract_epicquotes(soup, url)
-        if q:
-            return q
-    # add other per-site extractors here as needed
-    return None
-
 # ---------------------------
 # Scrape single URL
 # ---------------------------
 
-def scrape_url(url, character=None, use_browser_fallback=False):
+DYNAMIC_SCROLL_SELECTOR = "div.richText_container__Kvtj0, blockquote, q, p"
+
+def dynamic_extract(url, character=None):
+    """Render the page in a pooled browser, then site-specific → generic."""
+    dyn_doc = parse_html(fetch_dynamic_html(url, scroll_selector=DYNAMIC_SCROLL_SELECTOR))
+    specific = site_specific_extract(dyn_doc, url)
+    if specific:
+        return specific
+    return generic_extract(dyn_doc, url, character=character)
+
+def extract_page_tiered(url, html_text, character=None, use_browser_fallback=False):
     """
-    Scrape quotes from a single URL.
+    Extract quotes from an already fetched page.
     Strategy:
-      1) Fetch static HTML
-      2) Try site-specific extractors
-      3) Generic extractor
+      1) Try site-specific extractors
+      2) Generic extractor
+      3) Embedded page data (__NEXT_DATA__ / JSON-LD), no browser needed
       4) If nothing & allowed, dynamic (Selenium) fallback then retry
+    html_text is None when the static fetch failed.
+    Each page (static, then rendered) is parsed exactly once.
+    Returns (results, tier) where tier is "static", "embedded", "dynamic",
+    "render_failed" when the browser fallback errored, or None when nothing
+    was found.
     """
     results = []
+    if html_text is None:
+        return results, None
     try:
-        resp = fetch(url)
-        html_text = resp.text
-        specific = site_specific_extract(html_text, url)
+        doc = parse_html(html_text)
+        specific = site_specific_extract(doc, url)
         if specific:
             results.extend(specific)
         else:
-            generic = generic_extract(html_text, url, character=character)
+            generic = generic_extract(doc, url, character=character)
             results.extend(generic)
 
         # If we got good results, return
         if results:
-            return results
+            return results, "static"
+
+        # Many "JS" pages already carry their list data in the static HTML
+        embedded = embedded_extract(doc, url)
+        if embedded:
+            return embedded, "embedded"
 
         # If empty and looks JS-y, optionally do dynamic
         if use_browser_fallback or is_probably_js(url, html_text):
             try:
-                dyn_html = fetch_dynamic_html(
-                    url,
-                    scroll_selector="div.richText_container__Kvtj0, blockquote, q, p"
-                )
-                specific = site_specific_extract(dyn_html, url)
-                if specific:
-                    return specific
-                return generic_extract(dyn_html, url, character=character)
+                dynamic = dynamic_extract(url, character=character)
+                return dynamic, ("dynamic" if dynamic else None)
             except Exception as e:
                 print(f"[dynamic fallback failed] {url}: {e}")
-                return results
-        return results
+                return results, "render_failed"
+        return results, None
     except Exception as e:
         print(f"[scrape error] {url}: {e}")
+        return results, None
+
+def extract_page(url, html_text, character=None, use_browser_fallback=False):
+    """extract_page_tiered without the tier."""
+    return extract_page_tiered(url, html_text, character, use_browser_fallback)[0]
+
+def scrape_url(url, character=None, use_browser_fallback=False, engine=None, router=None, pages=None):
+    """
+    Scrape quotes from a single URL.
+    Strategy:
+      1) Ask the domain router (if any): skip the URL, go straight to the
+         browser, or take the normal path
+      2) Fetch static HTML (fetch() on the pooled transport, or the asyncio engine)
+      3) extract_page: site-specific → generic → embedded → optional dynamic fallback
+    The outcome (winning tier, yield, latency) is recorded on the router.
+    With a PageTracker (incremental refresh), a page whose body is unchanged
+    since the last scrape is not extracted again.
+    """
+    engine = engine or DEFAULT_ENGINE
+    if engine == "async":
+        return _scrape_async([url], character, 1, use_browser_fallback, router, pages)
+
+    plan = router.plan(url) if router else "static"
+    if plan == "skip":
+        print(f"[router] skipping {url}: domain has never yielded quotes")
+        return []
+
+    t0 = time.time()
+    if plan == "dynamic":
+        try:
+            results = dynamic_extract(url, character=character)
+        except Exception as e:
+            print(f"[dynamic fetch failed] {url}: {e}")
+            if router:
+                router.record(url, "render_failed", latency=time.time() - t0)
+            return []
+        if router:
+            router.record(url, "dynamic", len(results), time.time() - t0)
+        if pages:
+            pages.record(url, quotes=len(results))
         return results
 
+    try:
+        html_text = fetch(url).text
+    except Exception as e:
+        print(f"[scrape error] {url}: {e}")
+        if router:
+            router.record(url, latency=time.time() - t0, failed=True)
+        return []
+    if pages and pages.unchanged(url, html_text):
+        return []
+    results, tier = extract_page_tiered(url, html_text, character=character, use_browser_fallback=use_browser_fallback)
+    if router:
+        router.record(url, tier, len(results), time.time() - t0)
+    if pages:
+        pages.record(url, html_text, len(results))
+    return results
+
 # ---------------------------
 # Search → Scrape (Parallel)
 # ---------------------------
 
-def discover_urls(character, max_urls=DEFAULT_MAX_URLS):
-    query = build_query(character)
-    urls = google_search_serpapi(query, max_results=max_urls)
-    # light filtering: avoid PDFs / login / obvious non-content
-    filtered = []
-    seen = set()
-    for u in urls:
-        if any(u.lower().endswith(ext) for ext in (".pdf", ".ppt", ".doc", ".zip")):
-            continue
-        if "login" in u.lower() or "signup" in u.lower():
-            continue
-        if u in seen:
+def is_content_url(u):
+    """Light filtering: avoid PDFs / login / obvious non-content."""
+    lower = u.lower()
+    if any(lower.endswith(ext) for ext in (".pdf", ".ppt", ".doc", ".zip")):
+        return False
+    return "login" not in lower and "signup" not in lower
+
+def discover_urls(character, max_urls=DEFAULT_MAX_URLS, router=None):
+    """
+    Fan out every query variant × result page to SerpAPI concurrently, merge
+    the hits through the URL canonicalizer (AMP / mobile / utm / fragment /
+    trailing-slash copies collapse) and return the max_urls best distinct pages.
+
+    Score per page: sum over the searches that returned it of
+    weight / (1 + position), plus a bonus for known quote sites and for
+    domains the router has seen yield quotes. Domains the router would skip
+    are dropped, and no domain gets more than DISCOVERY_MAX_PER_DOMAIN slots.
+    """
+    searches = [(q, w, page * max_urls) for q, w in build_queries(character) for page in range(DISCOVERY_PAGES)]
+
+    # Cache lookups stay on this thread (DB); only the misses go out in parallel
+    results = {}
+    misses = []
+    for query, weight, start in searches:
+        cached = search_cache.get_cached(query, "us", "en", max_urls, start)
+        if cached is None:
+            misses.append((query, weight, start))
+        else:
+            results[(query, start)] = cached
+    if misses:
+        with ThreadPoolExecutor(max_workers=len(misses)) as pool:
+            futures = {
+                pool.submit(google_search_serpapi, q, max_urls, use_cache=False, start=start): (q, start)
+                for q, _, start in misses
+            }
+            for fut in as_completed(futures):
+                query, start = futures[fut]
+                try:
+                    results[(query, start)] = fut.result()
+                except Exception as e:
+                    print(f"[discovery] search failed ({query!r}, start={start}): {e}")
+        for query, _, start in misses:
+            if (query, start) in results:
+                search_cache.store(query, "us", "en", max_urls, results[(query, start)], start)
+
+    scores, urls = {}, {}
+    for query, weight, start in searches:
+        for pos, u in enumerate(results.get((query, start), []), start=start):
+            if not is_content_url(u):
+                continue
+            key = dedupe_key(u)
+            # Fetch the URL as the search returned it (canonical forms are only keys
+            # and may not resolve); prefer the https copy when both schemes show up
+            if key not in urls or (u.startswith("https") and not urls[key].startswith("https")):
+                urls[key] = u
+            scores[key] = scores.get(key, 0.0) + weight / (1 + pos)
+
+    for key, u in urls.items():
+        domain = domain_of(u)
+        if domain in PREFERRED_QUOTE_SITES:
+            scores[key] += 0.25
+        if router:
+            if router.plan(u) == "skip":
+                scores[key] = None
+                continue
+            profile = router.profiles.get(domain)
+            if profile and profile.wins:
+                scores[key] += 0.25
+
+    ranked = sorted((k for k in urls if scores[k] is not None), key=lambda k: -scores[k])
+    picked, per_domain = [], {}
+    for key in ranked:
+        domain = domain_of(urls[key])
+        if per_domain.get(domain, 0) >= DISCOVERY_MAX_PER_DOMAIN:
             continue
-        seen.add(u)
-        filtered.append(u)
-    return filtered[:max_urls]
+        per_domain[domain] = per_domain.get(domain, 0) + 1
+        picked.append(urls[key])
+        if len(picked) >= max_urls:
+            break
+    return picked
+
+def _scrape_async(urls, character, max_workers, use_browser_fallback, router, pages, reporter=None):
+    """
+    The async engine behind scrape_url / scrape_many. Progress only goes to
+    reporter (one step per URL), so scrape_many owns the batch's progress.
+    """
+    plans = {u: (router.plan(u) if router else "static") for u in urls}
+    skipped = [u for u, p in plans.items() if p == "skip"]
+    for u in skipped:
+        print(f"[router] skipping {u}: domain has never yielded quotes")
+    if reporter and skipped:
+        reporter.advance(len(skipped))
+    static_urls = [u for u, p in plans.items() if p == "static"]
+    dynamic_urls = [u for u, p in plans.items() if p == "dynamic"]
+
+    def extract(u, html_text, fetch_seconds):
+        results = []
+        try:
+            if pages and pages.unchanged(u, html_text):
+                return results
+            t0 = time.time()
+            results, tier = extract_page_tiered(u, html_text, character=character,
+                                                use_browser_fallback=use_browser_fallback)
+            if router:
+                router.record(u, tier, len(results), fetch_seconds + time.time() - t0,
+                              failed=html_text is None)
+            if pages and html_text is not None:
+                pages.record(u, html_text, len(results))
+            return results
+        finally:
+            if reporter:
+                reporter.advance(quotes_extracted=len(results))
+
+    # Browser-only URLs render on their own threads while the loop fetches the rest
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(dynamic_urls)))) as pool:
+        dyn_futures = [pool.submit(run_stats.bind(scrape_url), u, character, use_browser_fallback,
+                                   "threads", router, pages)
+                       for u in dynamic_urls]
+        all_quotes = async_fetch.scrape_all(
+            static_urls,
+            run_stats.bind(extract),
+            timeout=DEFAULT_TIMEOUT,
+            headers={"User-Agent": DEFAULT_USER_AGENT},
+            max_in_flight=ASYNC_MAX_IN_FLIGHT,
+            per_host=ASYNC_PER_HOST,
+            extract_workers=max_workers,
+            max_bytes=MAX_PAGE_BYTES,
+        )
+        for fut in dyn_futures:
+            results = fut.result()
+            all_quotes.extend(results)
+            if reporter:
+                reporter.advance(quotes_extracted=len(results))
+    return all_quotes
+
+def scrape_many(urls, character=None, max_workers=DEFAULT_WORKERS, use_browser_fallback=False, engine=None,
+                router=None, pages=None):
+    """
+    Scrape every URL and return the flattened (url, quote) list.
+    engine="threads" runs blocking scrape_url calls on a thread pool;
+    engine="async" keeps all static fetches in flight on one event loop
+    (per-host capped) and uses max_workers threads only for extraction.
+    With a DomainRouter, known-dead domains are skipped and browser-only
+    domains skip the static fetch; outcomes are recorded on the router.
+    With a PageTracker, unchanged pages are not extracted again.
+    """
+    engine = engine or DEFAULT_ENGINE
+    progress.report("scrape", done=0, total=len(urls), message="Fetching pages", quotes_extracted=0)
+    if engine == "async":
+        # The async extract callback runs on pool threads, which do not see the job context
+        return _scrape_async(urls, character, max_workers, use_browser_fallback, router, pages,
+                             reporter=progress.current())
+    if engine != "threads":
+        raise ValueError(f"Unknown fetch engine: {engine!r}")
 
-def scrape_many(urls, character=None, max_workers=DEFAULT_WORKERS, use_browser_fallback=False):
     all_quotes = []
     with ThreadPoolExecutor(max_workers=max_workers) as pool:
-        futures = {pool.submit(scrape_url, u, character, use_browser_fallback): u for u in urls}
+        futures = {pool.submit(run_stats.bind(scrape_url), u, character, use_browser_fallback, "threads",
+                               router, pages): u
+                   for u in urls}
         for fut in as_completed(futures):
             u = futures[fut]
             try:
                 results = fut.result()
                 all_quotes.extend(results)
+                progress.advance(quotes_extracted=len(results))
             except Exception as e:
                 print(f"✖ error {u}: {e}")
+                progress.advance()
     return all_quotes
 
 # ---------------------------
 # Main
 # ---------------------------
 
-def dedupe(quotes):
-    """quotes: list[(url, quote_text)]"""
+def dedupe(quotes, threshold=NEAR_DUP_THRESHOLD):
+    """
+    quotes: list[(url, quote_text)]
+    Exact copies and near-duplicates (punctuation, attribution suffix,
+    truncated ending) collapse into the first occurrence, which takes the
+    longer text when the earlier copy was the truncated one.
+    """
     seen = set()
+    index = NearDupIndex(threshold=threshold)
     out = []
     for src, q in quotes:
         cq = clean_text(q)
         # drop super-short / noisy lines
-        if len(cq) < 10:
+        if len(cq) < 10 or cq in seen:
             continue
-        if cq not in seen:
-            seen.add(cq)
+        seen.add(cq)
+        match = index.add_if_new(len(out), cq)
+        if match is None:
             out.append((src, cq))
+        elif len(near_dup_normalize(cq)) > len(near_dup_normalize(out[match][1])):
+            out[match] = (src, cq)
+            index.replace(match, cq)
     return out
 
 def save_csv(rows, path):
@@ -374,8 +635,6 @@ def save_csv(rows, path):
 # OpenAI Moderation Checks on jsonl
 # ---------------------------
 
-from openai import OpenAI
-client = OpenAI(api_key=settings.OPENAI_KEY)
 def normalize_quote(text: str) -> str:
     """Strip HTML, normalize spacing, and remove common junk."""
     text = html.unescape(text)
@@ -387,64 +646,152 @@ def normalize_quote(text: str) -> str:
     return text.strip()
 
 def is_safe_quote(text: str) -> bool:
-    """Return True if the quote passes moderation."""
-    try:
-        result = client.moderations.create(
-            model="omni-moderation-latest",
-            input=text
-        )
-        return not result.results[0].flagged
-    except Exception as e:
-        print(f"⚠️ Moderation check failed: {e}")
-        return False
-    
+    """Return True if the quote passes moderation (single text; prefer moderation.safe_flags for lists)."""
+    return moderation.safe_flags([text])[0]
 
-def clean_dataset(csv_path, character):
+def clean_dataset(csv_path, character, writer=None):
     """
     Clean a scraped CSV by removing unsafe, duplicate, or junk quotes.
     Overwrites the original CSV file with a cleaned version.
+    Kept quotes go to ScrapedQuote through writer (a BulkWriter, created
+    here if not given; pass one in to read its insert stats afterwards).
     """
     csv_path = Path(csv_path)
+    if isinstance(character, str):
+        character = Character.objects.get(name__iexact=character)
+    writer = writer or BulkWriter(ScrapedQuote)
     temp_path = csv_path.with_name(f"{csv_path.stem}_temp.csv")
 
     seen = set()
-    kept = removed = 0
+    index = NearDupIndex(threshold=NEAR_DUP_THRESHOLD)
+    kept = removed = reused = 0
 
     with open(csv_path, encoding="utf-8", errors="ignore") as infile, \
-         open(temp_path, "w", newline="", encoding="utf-8") as outfile:
+         open(temp_path, "w", newline="", encoding="utf-8") as outfile, \
+         writer:
 
         reader = csv.DictReader(infile)
-        writer = csv.DictWriter(outfile, fieldnames=["source_url", "quote"])
-        writer.writeheader()
+        csv_writer = csv.DictWriter(outfile, fieldnames=["source_url", "quote"])
+        csv_writer.writeheader()
 
+        rows = []
         for row in reader:
             quote = normalize_quote(row.get("quote", ""))
             if not quote or len(quote) < 10 or quote.lower() in seen:
                 continue
 
             seen.add(quote.lower())
-
-            if is_safe_quote(quote):
-                if is_safe_quote(quote):
-                    # Write to cleaned CSV
-                    writer.writerow({
-                        "source_url": row.get("source_url", ""),
-                        "quote": quote
-                    })
-
-                    # Also save to DB
-                    ScrapedQuote.objects.create(
-                        character=Character.objects.get(name__iexact=character),
-                        source_url=row.get("source_url", ""),
+            if index.add_if_new(len(seen), quote) is not None:
+                continue
+            rows.append((row.get("source_url", ""), quote))
+
+        # One lookup for the whole file: quotes stored by an earlier run passed
+        # moderation already; known for this character they are not re-inserted
+        known = known_quotes([q for _, q in rows])
+
+        # Everything else is moderated in batched, concurrent requests
+        unknown = [q for _, q in rows if fingerprint(q) not in known]
+        safe = dict(zip(unknown, moderation.safe_flags(unknown)))
+
+        for source_url, quote in rows:
+            stored = known.get(fingerprint(quote))
+            if stored is not None:
+                # Keep the stored text: that is what moderation saw
+                quote, owners = stored
+                reused += 1
+                csv_writer.writerow({"source_url": source_url, "quote": quote})
+                if character.id not in owners:
+                    writer.add(
+                        character=character,
+                        source_url=source_url,
                         quote=quote,
+                        content_hash=fingerprint(quote),
                         is_safe=True
                     )
+                kept += 1
+                continue
+
+            if safe[quote]:
+                # Write to cleaned CSV
+                csv_writer.writerow({
+                    "source_url": source_url,
+                    "quote": quote
+                })
+
+                # Also save to DB (buffered, flushed in chunks)
+                writer.add(
+                    character=character,
+                    source_url=source_url,
+                    quote=quote,
+                    content_hash=fingerprint(quote),
+                    is_safe=True
+                )
 
-                    kept += 1
+                kept += 1
             else:
                 removed += 1
 
     new_path = temp_path.replace(csv_path)
     print(f"✅ Cleaned dataset for {character.name}: {csv_path}")
-    print(f"Kept: {kept} | Removed: {removed}")
-    return new_path, kept, removed
\ No newline at end of file
+    print(f"Kept: {kept} | Removed: {removed} | Already known: {reused}")
+    print(f"DB: {writer.rows} rows in {writer.seconds:.2f}s ({writer.rows_per_second} rows/s)")
+    progress.report(db_rows_written=writer.rows, db_rows_per_second=writer.rows_per_second)
+    return new_path, kept, removed
+
+def append_dataset(csv_path, rows, character, writer=None):
+    """
+    Incremental counterpart of clean_dataset: only quotes that are not in
+    the character's dataset yet are moderated, and the safe ones are
+    appended to the CSV and to ScrapedQuote (through writer, as in clean_dataset).
+    rows: list[(url, quote)] from a refresh scrape.
+    Returns (added, removed).
+    """
+    csv_path = Path(csv_path)
+    writer = writer or BulkWriter(ScrapedQuote)
+    index = NearDupIndex(threshold=NEAR_DUP_THRESHOLD)
+    with open(csv_path, encoding="utf-8", errors="ignore") as f:
+        for i, row in enumerate(csv.DictReader(f)):
+            index.add(("csv", i), row.get("quote", ""))
+
+    fresh = []
+    duplicates = 0
+    for source_url, q in rows:
+        quote = normalize_quote(q)
+        if len(quote) < 10:
+            continue
+        if index.add_if_new(("new", len(fresh)), quote) is None:
+            fresh.append((source_url, quote))
+        else:
+            duplicates += 1
+
+    known = known_quotes([q for _, q in fresh])
+    unknown = [q for _, q in fresh if fingerprint(q) not in known]
+    safe = dict(zip(unknown, moderation.safe_flags(unknown)))
+    added = removed = 0
+    with open(csv_path, "a", newline="", encoding="utf-8") as f, writer:
+        csv_writer = csv.writer(f)
+        for source_url, quote in fresh:
+            stored = known.get(fingerprint(quote))
+            if stored is not None:
+                quote, owners = stored
+                if character.id in owners:
+                    duplicates += 1
+                    continue
+                # Stored for another character: that text passed moderation already
+            elif not safe[quote]:
+                removed += 1
+                continue
+            csv_writer.writerow([source_url, quote])
+            writer.add(
+                character=character,
+                source_url=source_url,
+                quote=quote,
+                content_hash=fingerprint(quote),
+                is_safe=True
+            )
+            added += 1
+
+    print(f"✅ Appended to dataset for {character.name}: {csv_path}")
+    print(f"New: {added} | Removed: {removed} | Already in dataset: {duplicates}")
+    progress.report(db_rows_written=writer.rows, db_rows_per_second=writer.rows_per_second)
+    return added, removed
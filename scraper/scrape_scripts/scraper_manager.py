@@ -1,19 +1,27 @@
-from . import scraper
+from . import scraper, run_stats
+from .transport import get_transport
+from .browser_pool import get_driver_pool
+from .domain_router import DomainRouter
+from .page_tracker import PageTracker
+from .bulk_writer import BulkWriter
 
 import time
 import csv
-import requests
 from pathlib import Path
 
+from jobs import progress
 from scraper.models import Character
-from analytics.models import ScrapeMetrics
+from analytics.models import ScrapedQuote, ScrapeMetrics
 from django.conf import settings
 
 class ScraperManager:
-    def __init__(self, character_name):
+    def __init__(self, character_name, refresh=False):
         self.character_name = character_name.strip()
+        # Incremental mode: only new / changed pages, new quotes appended to the dataset
+        self.refresh = refresh
+        self.stats = run_stats.RunStats()
 
-    def create_character_model(self, character_name, file_path):
+    def create_character_model(self, character_name, file_path, writer=None):
         # 1. Create character FIRST
         character, _ = Character.objects.get_or_create(
             name=character_name,
@@ -29,7 +37,7 @@ class ScraperManager:
         print(f"\n⏳ Cleaning dataset with openai moderation check for {num_of_lines} lines")
         print(f"⏳ This may take up to 90 seconds")
         # 2. Clean dataset (now character exists)
-        csv_path, kept, removed = scraper.clean_dataset(file_path, character)
+        csv_path, kept, removed = scraper.clean_dataset(file_path, character, writer=writer)
         
         print(f"\n⏳ Update new path to {str(csv_path)}")
         # 3. Update dataset path AFTER cleaning
@@ -55,9 +63,10 @@ class ScraperManager:
         Returns the image URL or None if not found.
         """
         try:
-            resp = requests.get(
+            resp = get_transport().get(
                 f"https://api.jikan.moe/v4/characters",
-                params={"q": character_name, "limit": 1}
+                params={"q": character_name, "limit": 1},
+                timeout=scraper.DEFAULT_TIMEOUT
             )
             resp.raise_for_status()
             data = resp.json()
@@ -68,6 +77,17 @@ class ScraperManager:
         return None
     
     def scrape(self):
+        ''' Count This Run's Cache / Browser / Moderation Traffic Apart From Concurrent Jobs '''
+        with run_stats.collecting() as stats:
+            self.stats = stats
+            return self._scrape()
+
+    def _scrape(self):
+        ''' Refresh An Existing Dataset Instead Of Rebuilding It '''
+        character = Character.objects.filter(name__iexact=self.character_name).first()
+        if self.refresh and character and character.dataset_path and Path(character.dataset_path).exists():
+            return self.refresh_scrape(character)
+
         ''' Check if Character has Model or not to Avoid Double Scraping '''
         if self.character_has_model(self.character_name):
             print(f"🛑 Character Has Existing Model")
@@ -86,22 +106,38 @@ class ScraperManager:
         ''' Start Scrape Timer '''
         t0 = time.time()
 
-        urls = scraper.discover_urls(self.character_name, max_urls=12)
+        ''' Past Per-Domain Results Guide Both Discovery Ranking And Scraping '''
+        router = DomainRouter.load()
+        # Record-only: a full scrape extracts every page, even ones unchanged since the last run
+        pages = PageTracker()
+        progress.report("discover", message="Searching for quote pages")
+        urls = scraper.discover_urls(self.character_name, max_urls=12, router=router)
+        progress.report(urls_discovered=len(urls))
 
         print(f"\n⏳ Parallel scraping {min(len(urls), 12)} urls")
 
+        ''' Warm Browsers In The Background If Any Page Will Likely Need One '''
+        browser_pool = get_driver_pool()
+        if any(scraper.is_likely_js_domain(u) for u in urls):
+            browser_pool.warm(background=True)
+
         ''' Parallel Scraping '''
         quotes = scraper.scrape_many(
             urls,
             character=self.character_name,
             max_workers=8,
-            use_browser_fallback=False
+            use_browser_fallback=False,
+            router=router,
+            pages=pages
         )
+        router.save()
 
         print(f"\n⏳ Removing duplicate quotes")
 
         ''' Remove Duplicate Quotes '''
+        progress.report("dedupe", message="Removing duplicate quotes")
         uniq = scraper.dedupe(quotes)
+        progress.report(unique_quotes=len(uniq))
 
         ''' Save Quote Dataset '''
         base_dir = Path(__file__).resolve().parent.parent
@@ -111,24 +147,123 @@ class ScraperManager:
 
         ''' Create Character Model in DB '''
         print(f"\n⏳ Creating character model in DB")
-        character, kept, removed = self.create_character_model(self.character_name, file_path)
+        writer = BulkWriter(ScrapedQuote)
+        character, kept, removed = self.create_character_model(self.character_name, file_path, writer=writer)
+        pages.save(character)
 
         ''' Stop Scrape Timer '''
         t1 = time.time()
         scrape_time = t1 - t0
 
-        print(f"\n✅ Saving metrics for {character.name} scraping")
+        self.save_metrics(character, urls, uniq, kept, removed, scrape_time, writer)
 
-        metrics, _ = ScrapeMetrics.objects.get_or_create(character=character)
+        print(f"✅ Dynamic scrape completed for: {character.name} in {scrape_time}ms")
 
-        metrics.total_urls_discovered = len(urls)
-        metrics.unsafe_quotes_extracted = removed
-        metrics.safe_quotes_extracted = kept
-        metrics.unique_quotes = len(uniq)
-        metrics.scrape_duration = round(scrape_time, 2)
+        return scrape_time
 
-        metrics.save()
+    def refresh_scrape(self, character):
+        """
+        Incremental re-scrape: URLs scraped recently are not fetched, unchanged
+        pages are not extracted, and only quotes missing from the dataset are
+        moderated and appended. Cost follows the change, not the corpus.
+        """
+        print(f"\n⏳ Refreshing quotes for: {character.name}")
 
-        print(f"✅ Dynamic scrape completed for: {character.name} in {scrape_time}ms")
+        t0 = time.time()
+
+        router = DomainRouter.load()
+        pages = PageTracker.load(character.name)
+        progress.report("discover", message="Searching for quote pages")
+        discovered = scraper.discover_urls(character.name, max_urls=12, router=router)
+        urls = pages.select(discovered)
+        progress.report(urls_discovered=len(discovered), urls_to_check=len(urls))
+        print(f"\n⏳ {len(urls)} of {len(discovered)} urls are new or due for a re-check")
+
+        browser_pool = get_driver_pool()
+        if any(scraper.is_likely_js_domain(u) for u in urls):
+            browser_pool.warm(background=True)
 
-        return scrape_time
\ No newline at end of file
+        quotes = scraper.scrape_many(
+            urls,
+            character=character.name,
+            max_workers=8,
+            use_browser_fallback=False,
+            router=router,
+            pages=pages
+        )
+        router.save()
+
+        progress.report("dedupe", message="Removing duplicate quotes")
+        uniq = scraper.dedupe(quotes)
+        progress.report(unique_quotes=len(uniq))
+        print(f"\n⏳ Merging {len(uniq)} quotes into: {character.dataset_path}")
+        writer = BulkWriter(ScrapedQuote)
+        added, removed = scraper.append_dataset(character.dataset_path, uniq, character, writer=writer)
+        pages.save(character)
+
+        scrape_time = time.time() - t0
+        self.save_metrics(character, urls, uniq, added, removed, scrape_time, writer, refresh=True)
+
+        print(f"✅ Refresh completed for: {character.name} in {scrape_time}s")
+
+        return scrape_time
+
+    # Per-run counts a refresh adds onto the character's totals
+    ADDITIVE_METRICS = (
+        "total_urls_discovered", "search_cache_hits", "search_cache_misses",
+        "unsafe_quotes_extracted", "safe_quotes_extracted", "unique_quotes", "scrape_duration",
+        "http_cache_hits", "http_cache_revalidated", "http_cache_misses",
+        "browser_pages_rendered", "browser_wait_seconds", "browser_ready_seconds",
+        "db_rows_written", "db_write_seconds", "moderation_requests", "moderation_requests_saved",
+    )
+
+    def save_metrics(self, character, urls, uniq, kept, removed, scrape_time, writer, refresh=False):
+        """
+        Store this run's numbers; cache / browser / moderation counts come
+        from this run's collector (self.stats), so jobs running side by side
+        don't count each other's traffic. writer is the BulkWriter that
+        inserted the quotes.
+        A full scrape replaces the character's metrics, a refresh adds its
+        counts onto them (unique_quotes then counts only the new quotes).
+        """
+        print(f"\n✅ Saving metrics for {character.name} scraping")
+        progress.report("save", message="Saving metrics", safe_quotes=kept, unsafe_quotes=removed)
+
+        stats = self.stats
+        run = {
+            "total_urls_discovered": len(urls),
+            "search_cache_hits": stats.get("search_cache.hits"),
+            "search_cache_misses": stats.get("search_cache.misses"),
+            "unsafe_quotes_extracted": removed,
+            "safe_quotes_extracted": kept,
+            "unique_quotes": kept + removed if refresh else len(uniq),
+            "scrape_duration": round(scrape_time, 2),
+            "http_cache_hits": stats.get("http_cache.hits"),
+            "http_cache_revalidated": stats.get("http_cache.revalidated"),
+            "http_cache_misses": stats.get("http_cache.misses"),
+            "browser_pages_rendered": stats.get("browser.checkouts"),
+            "browser_wait_seconds": round(stats.get("browser.wait_seconds"), 2),
+            "browser_ready_seconds": round(stats.get("browser.ready_seconds"), 2),
+            "db_rows_written": writer.rows,
+            "db_write_seconds": round(writer.seconds, 3),
+            "moderation_requests": stats.get("moderation.requests"),
+            "moderation_requests_saved": stats.get("moderation.requests_saved"),
+        }
+        busy = stats.get("browser.busy_seconds")
+        browser_pool = get_driver_pool()
+
+        metrics, created = ScrapeMetrics.objects.get_or_create(character=character)
+        if refresh and not created:
+            # Utilization as a duration-weighted average over all runs
+            busy += metrics.browser_utilization * browser_pool.size * metrics.scrape_duration
+            for name in self.ADDITIVE_METRICS:
+                run[name] += getattr(metrics, name)
+        for name, value in run.items():
+            setattr(metrics, name, value)
+
+        duration = metrics.scrape_duration
+        metrics.browser_utilization = round(busy / (browser_pool.size * duration), 3) if duration else 0.0
+        seconds = metrics.db_write_seconds
+        metrics.db_rows_per_second = round(metrics.db_rows_written / seconds, 1) if seconds else 0.0
+
+        metrics.save()
@@ -0,0 +1,74 @@
+"""
+Persistent TTL cache for SerpAPI discovery results (scraper.SearchCache).
+
+build_query returns the same query for the same character, so repeat and
+retried scrapes can skip the paid search round-trip entirely.
+"""
+
+import hashlib
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from scraper.models import SearchCache
+
+from . import run_stats
+
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0}
+
+
+def normalize_query(query):
+    return " ".join(query.lower().split())
+
+
+def cache_key(query, country, lang, start=0):
+    raw = f"{normalize_query(query)}|{country.lower()}|{lang.lower()}"
+    if start:
+        raw += f"|start={start}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _count(name):
+    with _lock:
+        _counters[name] += 1
+    run_stats.count(f"search_cache.{name}")
+
+
+def stats():
+    with _lock:
+        return dict(_counters)
+
+
+def get_cached(query, country, lang, num, start=0):
+    """Cached URL list, or None when missing, expired or cached with fewer results."""
+    ttl = timedelta(seconds=settings.SCRAPER_SEARCH_CACHE_TTL)
+    entry = SearchCache.objects.filter(key=cache_key(query, country, lang, start)).first()
+    if entry is None or entry.num < num or timezone.now() - entry.created_at > ttl:
+        _count("misses")
+        return None
+    _count("hits")
+    return entry.urls[:num]
+
+
+def store(query, country, lang, num, urls, start=0):
+    SearchCache.objects.update_or_create(
+        key=cache_key(query, country, lang, start),
+        defaults={"query": normalize_query(query), "country": country, "lang": lang, "num": num, "urls": urls},
+    )
+
+
+def invalidate(queries=None, country="us", lang="en"):
+    """
+    Drop cached results for the given queries (every result page and page
+    size they were cached with), or every cached search when queries is None.
+    Returns rows deleted.
+    """
+    qs = SearchCache.objects.all()
+    if queries is not None:
+        if isinstance(queries, str):
+            queries = [queries]
+        qs = qs.filter(query__in={normalize_query(q) for q in queries}, country=country, lang=lang)
+    return qs.delete()[0]
@@ -0,0 +1,12 @@
+"""
+Text normalization shared by the extractors and the scraper.
+"""
+
+import html
+import re
+
+
+def clean_text(t):
+    t = html.unescape(t).strip()
+    t = t.replace("\xa0", " ").replace("\u200b", "")
+    return re.sub(r"\s+", " ", t)
@@ -0,0 +1,230 @@
+"""
+Shared HTTP transport for every outbound call the scraper makes
+(page fetches, SerpAPI, Jikan).
+
+- One pooled requests.Session: keep-alive connections / TLS sessions are
+  reused per host instead of a fresh handshake on every call
+- Retries 429 / 5xx and connection errors with jittered exponential backoff
+  (honours Retry-After when the server sends one), all inside one overall
+  deadline per request; read timeouts are not retried, a slow server
+  stays slow
+- Per-host token-bucket rate limits so we don't hammer rate-limited hosts
+- Helpers for streamed page bodies: content-type preflight, byte cap and
+  cheap charset detection (header → BOM → <meta>), instead of resp.text's
+  slow apparent_encoding guess
+"""
+
+import codecs
+import random
+import re
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5   # seconds
+DEFAULT_BACKOFF_CAP = 20.0   # seconds
+DEFAULT_POOL_SIZE = 32       # connections kept alive per host
+DEFAULT_DEADLINE = 30.0      # seconds for all attempts and backoff of one request
+
+# host -> (requests per second, burst)
+DEFAULT_HOST_RATE = (4.0, 8)
+HOST_RATES = {
+    "serpapi.com": (5.0, 5),
+    "api.jikan.moe": (1.0, 3),   # Jikan: 3 req/s, 60 req/min
+}
+
+
+DEFAULT_MAX_BODY_BYTES = 3 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+CHARSET_PARAM = re.compile(r"charset\s*=\s*[\"']?([\w.:-]+)", re.I)
+META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class ContentRejected(Exception):
+    """Response is not something we should download (e.g. not HTML)."""
+
+
+def check_html_content_type(content_type, url=""):
+    """Raise ContentRejected for non-HTML types; a missing header is allowed."""
+    if not content_type:
+        return
+    mime = content_type.split(";", 1)[0].strip().lower()
+    if mime not in HTML_CONTENT_TYPES:
+        raise ContentRejected(f"non-HTML content type {mime!r} {url}".strip())
+
+
+def read_capped(chunks, max_bytes=DEFAULT_MAX_BODY_BYTES):
+    """Join body chunks, stopping once max_bytes have been read. Returns (body, truncated)."""
+    buf = bytearray()
+    for chunk in chunks:
+        buf += chunk
+        if len(buf) >= max_bytes:
+            return bytes(buf[:max_bytes]), True
+    return bytes(buf), False
+
+
+def _codec(name):
+    try:
+        return codecs.lookup(name).name
+    except (LookupError, TypeError):
+        return None
+
+
+def detect_charset(content_type, body, default="utf-8"):
+    """Charset from the Content-Type header, a BOM, or a <meta> tag in the first 4 KB."""
+    m = CHARSET_PARAM.search(content_type or "")
+    if m and _codec(m.group(1)):
+        return _codec(m.group(1))
+    for bom, name in BOMS:
+        if body.startswith(bom):
+            return name
+    m = META_CHARSET.search(body[:4096])
+    if m and _codec(m.group(1).decode("ascii", "ignore")):
+        return _codec(m.group(1).decode("ascii", "ignore"))
+    return default
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF_BASE, cap=DEFAULT_BACKOFF_CAP, retry_after=None):
+    """Full-jitter exponential backoff; never shorter than Retry-After."""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, cap))
+    return delay
+
+
+def parse_retry_after(value):
+    """Retry-After in seconds, or None (HTTP-date form is ignored)."""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def clamp_timeout(timeout, remaining):
+    """requests timeout (number or (connect, read) tuple) cut down to the time left."""
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
+
+
+def host_key(url):
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class TokenBucket:
+    """Thread-safe token bucket. reserve(n) takes n tokens and returns how long to wait for them."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, n=1):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= n
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def acquire(self, n=1):
+        wait = self.reserve(n)
+        if wait:
+            time.sleep(wait)
+
+
+class Transport:
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, max_retries=DEFAULT_MAX_RETRIES,
+                 host_rates=None, default_rate=DEFAULT_HOST_RATE, deadline=DEFAULT_DEADLINE):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.host_rates = dict(HOST_RATES if host_rates is None else host_rates)
+        self.default_rate = default_rate
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket_for(self, url):
+        host = host_key(url)
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate, burst = self.host_rates.get(host, self.default_rate)
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+            return bucket
+
+    def request(self, method, url, deadline=None, **kwargs):
+        """
+        session.request with rate limiting and retry/backoff. Returns the last response.
+
+        Every attempt, rate-limit wait and backoff sleep fits inside deadline
+        seconds (self.deadline by default): each attempt's timeout is cut to
+        the time left, and a retry that would not start in time is skipped.
+        With stream=True the body is read after this returns, outside the
+        deadline. Read timeouts are raised straight away.
+        """
+        bucket = self.bucket_for(url)
+        timeout = kwargs.pop("timeout", None)
+        expires = time.monotonic() + (self.deadline if deadline is None else deadline)
+        attempt = 0
+        while True:
+            bucket.acquire()
+            remaining = expires - time.monotonic()
+            if remaining <= 0:
+                raise requests.Timeout(f"deadline exceeded for {url}")
+            try:
+                resp = self.session.request(method, url, timeout=clamp_timeout(timeout, remaining), **kwargs)
+            except requests.ReadTimeout:
+                raise
+            except (requests.ConnectionError, requests.Timeout):
+                delay = backoff_delay(attempt)
+                if attempt >= self.max_retries or time.monotonic() + delay >= expires:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return resp
+            delay = backoff_delay(attempt, retry_after=parse_retry_after(resp.headers.get("Retry-After")))
+            if time.monotonic() + delay >= expires:
+                return resp
+            resp.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport():
+    """Process-wide shared Transport."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
@@ -0,0 +1,52 @@
+"""
+URL helpers shared by the fetch cache and discovery.
+"""
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {"fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ref", "ref_src", "amp", "outputtype"}
+TRACKING_PREFIXES = ("utm_",)
+
+# m.example.com / amp.example.com / mobile.example.com → example.com
+MOBILE_HOST = re.compile(r"^(?:m|mobile|amp)\.")
+# /amp, /amp/ or /amp.html at the end of a path, or an /amp/ leading segment
+AMP_PATH = re.compile(r"(?:/amp(?:\.html)?/?$|^/amp(?=/))")
+
+
+def _keep_param(name):
+    name = name.lower()
+    return name not in TRACKING_PARAMS and not name.startswith(TRACKING_PREFIXES)
+
+
+def canonical_url(url):
+    """
+    Canonical form used as a cache / dedupe key (never fetched itself):
+    lowercase scheme + host, default port and fragment dropped, AMP / mobile
+    variants folded into the desktop page, tracking parameters (utm_*, fbclid, ...)
+    removed, remaining query parameters sorted, trailing slash removed.
+    """
+    parts = urlparse(url.strip())
+    scheme = parts.scheme.lower()
+    host = MOBILE_HOST.sub("", (parts.hostname or "").lower())
+    if parts.port and str(parts.port) != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    path = AMP_PATH.sub("", parts.path).rstrip("/") or "/"
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if _keep_param(k)]
+    query = urlencode(sorted(params))
+    return urlunparse((scheme, host, path, "", query, ""))
+
+
+def dedupe_key(url):
+    """canonical_url without scheme or www., so http/https and www/bare copies collapse."""
+    rest = canonical_url(url).split("://", 1)[-1]
+    return rest[4:] if rest.startswith("www.") else rest
+
+
+def url_hash(url):
+    """sha1 of canonical_url: a fixed-size key for unique indexes (URLs can be 2000 chars)."""
+    return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()
@@ -1,3 +1,365 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import requests
+from django.test import SimpleTestCase, TestCase
+
+from analytics.models import ScrapedQuote
+from jobs.models import Job
+from scraper.models import Character, DomainProfile, ScrapedPage, SearchCache
+from scraper.scrape_scripts import async_fetch, moderation, prefilter, scraper, search_cache, transport
+from scraper.scrape_scripts.bulk_writer import BulkWriter
+from scraper.scrape_scripts.domain_router import DomainRouter
+from scraper.scrape_scripts.extractors import SITE_RULES
+from scraper.scrape_scripts.http_cache import HttpCache
+from scraper.scrape_scripts.near_dup import NearDupIndex, shingles
+from scraper.scrape_scripts.page_ready import READY_JS
+from scraper.scrape_scripts.page_tracker import PageTracker
+
+
+class PrefilterTests(SimpleTestCase):
+    ADVERSARIAL = [
+        "People like them are animals and should be exterminated.",
+        "I will find you and rip your throat out.",
+        "Take off your clothes and get on the bed, little girl.",
+        "…go jump off a bridge.",
+        "Never give up, little girl, take off your clothes.",
+        "My friends and I will hunt you down together.",
+    ]
+
+    def test_adversarial_texts_go_to_the_api(self):
+        for text in self.ADVERSARIAL:
+            for local_safe in (False, True):
+                with self.subTest(text=text, local_safe=local_safe):
+                    label, _ = prefilter.classify(text, local_safe=local_safe)
+                    self.assertEqual(label, "uncertain")
+
+    def test_blocklist_hit_is_unsafe(self):
+        self.assertEqual(prefilter.classify("Go watch porn"), ("unsafe", ["sexual"]))
+        self.assertEqual(prefilter.classify("just kys"), ("unsafe", ["self-harm/instructions"]))
+
+    def test_no_local_safe_by_default(self):
+        self.assertEqual(prefilter.classify("Never give up on your dreams!"), ("uncertain", []))
+
+    def test_local_safe_needs_a_positive_signal(self):
+        self.assertEqual(prefilter.classify("Never give up on your dreams!", local_safe=True), ("safe", []))
+        self.assertEqual(prefilter.classify("The weather is nice today.", local_safe=True)[0], "uncertain")
+        long_line = "Believe in your dreams. " + "And so on. " * 12
+        self.assertEqual(prefilter.classify(long_line, local_safe=True)[0], "uncertain")
+
+
+class SearchCacheInvalidateTests(TestCase):
+    def test_drops_every_page_whatever_the_page_size(self):
+        queries = [q for q, _ in scraper.build_queries("Yoda")]
+        for start in (0, 12, 30):
+            search_cache.store(queries[0], "us", "en", 12, ["https://a.example/"], start)
+        search_cache.store("someone else quotes", "us", "en", 12, ["https://b.example/"])
+
+        self.assertEqual(scraper.invalidate_search_cache("Yoda"), 3)
+        self.assertEqual(list(SearchCache.objects.values_list("query", flat=True)), ["someone else quotes"])
+
+
+class DiscoverUrlsTests(TestCase):
+    @mock.patch.object(scraper, "DISCOVERY_PAGES", 1)
+    def test_fetches_the_url_search_returned(self):
+        found = ["https://m.example.com/amp/quotes/?utm_source=x", "http://example.com/quotes"]
+        with mock.patch.object(scraper, "google_search_serpapi", return_value=found):
+            self.assertEqual(scraper.discover_urls("Yoda", max_urls=5), [found[0]])
+
+
+class BulkWriterTests(TestCase):
+    def setUp(self):
+        self.character = Character.objects.create(name="Yoda")
+
+    def add(self, writer, n):
+        for i in range(n):
+            writer.add(character=self.character, source_url="https://a.example/", quote=f"q{i}", content_hash=str(i))
+
+    def test_flushes_on_clean_exit(self):
+        with BulkWriter(ScrapedQuote, chunk_size=2) as writer:
+            self.add(writer, 3)
+        self.assertEqual(ScrapedQuote.objects.count(), 3)
+
+    def test_error_drops_the_buffer_but_keeps_flushed_chunks(self):
+        with self.assertRaises(ValueError):
+            with BulkWriter(ScrapedQuote, chunk_size=2) as writer:
+                self.add(writer, 3)
+                raise ValueError
+        self.assertEqual(ScrapedQuote.objects.count(), 2)
+
+
+class DomainRouterSaveTests(TestCase):
+    def test_concurrent_runs_both_count(self):
+        first, second = DomainRouter.load(), DomainRouter.load()
+        first.record("https://a.example/1", "static", quotes=4, latency=1.0)
+        second.record("https://a.example/2", latency=3.0, failed=True)
+        second.record("https://www.a.example/3", "render_failed", latency=2.0)
+        first.save()
+        second.save()
+
+        profile = DomainProfile.objects.get(domain="a.example")
+        self.assertEqual((profile.attempts, profile.static_wins, profile.total_quotes), (3, 1, 4))
+        self.assertEqual((profile.failures, profile.dynamic_failures, profile.empty_runs), (1, 1, 0))
+        self.assertAlmostEqual(profile.avg_latency, 2.0)
+
+
+class FetchCacheTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache = HttpCache(Path(tmp.name) / "http.sqlite3")
+        self.addCleanup(self.cache.db.close)
+
+    def fetch(self, url, body, max_bytes):
+        resp = mock.MagicMock(status_code=200, headers={"Content-Type": "text/html"})
+        resp.__enter__.return_value = resp
+        resp.iter_content.return_value = [body]
+        transport = mock.Mock(get=mock.Mock(return_value=resp))
+        with mock.patch.object(scraper, "get_http_cache", return_value=self.cache), \
+                mock.patch.object(scraper, "get_transport", return_value=transport):
+            return scraper.fetch(url, max_bytes=max_bytes)
+
+    def test_truncated_body_is_not_cached(self):
+        self.assertTrue(self.fetch("https://a.example/big", b"x" * 100, max_bytes=10).truncated)
+        self.assertIsNone(self.cache.lookup("https://a.example/big"))
+
+        self.assertFalse(self.fetch("https://a.example/small", b"<p>hi</p>", max_bytes=10).truncated)
+        self.assertIsNotNone(self.cache.lookup("https://a.example/small"))
+
+
+class AsyncFetchTests(SimpleTestCase):
+    def test_cache_lookup_runs_off_the_event_loop(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        cache = HttpCache(Path(tmp.name) / "http.sqlite3")
+        self.addCleanup(cache.db.close)
+        cache.store("https://a.example/", "https://a.example/", b"<p>hi</p>", encoding="utf-8")
+        threads = []
+        lookup = cache.lookup
+        cache.lookup = lambda key: threads.append(threading.get_ident()) or lookup(key)
+
+        async def run():
+            threads.append(threading.get_ident())
+            return await async_fetch.fetch_text(None, "https://a.example/", 5, {})
+
+        with mock.patch.object(async_fetch, "get_http_cache", return_value=cache):
+            self.assertEqual(asyncio.run(run()), "<p>hi</p>")
+        loop_thread, lookup_thread = threads
+        self.assertNotEqual(loop_thread, lookup_thread)
+
+    def test_timed_out_fetch_is_not_retried(self):
+        calls = []
+
+        class Session:
+            def get(self, url, **kwargs):
+                calls.append(kwargs["timeout"].total)
+                raise asyncio.TimeoutError()
+
+        cache = mock.Mock(lookup=mock.Mock(return_value=None))
+        with mock.patch.object(async_fetch, "get_http_cache", return_value=cache), \
+                self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(async_fetch.fetch_text(Session(), "https://slow.example/", 20, {}))
+        self.assertEqual(calls, [20])
+
+    def test_progress_is_reported_per_batch(self):
+        def scrape_all(urls, extract, **kwargs):
+            return [q for u in urls for q in extract(u, "<p>page</p>", 0.1)]
+
+        reporter = mock.Mock()
+        with mock.patch.object(scraper.async_fetch, "scrape_all", scrape_all), \
+                mock.patch.object(scraper, "extract_page_tiered", return_value=([("u", "q")], "generic")), \
+                mock.patch.object(scraper.progress, "current", return_value=reporter), \
+                mock.patch.object(scraper.progress, "report") as report:
+            scraper.scrape_url("https://a.example/", engine="async")
+            report.assert_not_called()
+            reporter.advance.assert_not_called()
+
+            scraper.scrape_many(["https://a.example/", "https://b.example/"], engine="async")
+        report.assert_called_once()
+        self.assertEqual(reporter.advance.call_count, 2)
+
+
+class TransportDeadlineTests(SimpleTestCase):
+    def setUp(self):
+        self.clock = 0.0
+
+        def sleep(seconds):
+            self.clock += seconds
+
+        for patch in (mock.patch.object(transport.time, "monotonic", lambda: self.clock),
+                      mock.patch.object(transport.time, "sleep", sleep),
+                      mock.patch.object(transport, "backoff_delay", lambda *a, **k: 1.0)):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.transport = transport.Transport(deadline=30)
+        self.timeouts = []
+
+    def fail_with(self, exc):
+        def request(method, url, timeout=None, **kwargs):
+            self.timeouts.append(timeout)
+            self.clock += timeout
+            raise exc
+        self.transport.session.request = request
+
+    def test_read_timeout_is_not_retried(self):
+        self.fail_with(requests.ReadTimeout())
+        with self.assertRaises(requests.ReadTimeout):
+            self.transport.get("https://slow.example/", timeout=20)
+        self.assertEqual(self.timeouts, [20])
+
+    def test_retries_stop_at_the_deadline(self):
+        self.fail_with(requests.ConnectionError())
+        with self.assertRaises(requests.ConnectionError):
+            self.transport.get("https://down.example/", timeout=20)
+        self.assertEqual(self.timeouts, [20, 9])
+        self.assertLessEqual(self.clock, 30)
+
+
+class NearDupIndexTests(SimpleTestCase):
+    def test_replace_drops_the_old_buckets(self):
+        index = NearDupIndex()
+        short = "Believe it, I never go back on my word, that is my ninja way"
+        longer = short + " of life"
+        self.assertIsNone(index.add_if_new(0, short))
+        self.assertEqual(index.add_if_new(1, longer), 0)
+        old_bands = index.band_keys[0]
+
+        index.replace(0, longer)
+        self.assertEqual(index.sets[0], shingles(longer))
+        indexed = {(b, bk) for b, bucket in enumerate(index.buckets) for bk, keys in bucket.items() if 0 in keys}
+        self.assertEqual(indexed, set(enumerate(index.band_keys[0])))
+        self.assertNotEqual(index.band_keys[0], old_bands)
+
+    def test_dedupe_keeps_the_longest_variant(self):
+        base = "Hard work is worthless for those that don't believe in themselves"
+        quotes = [("a", base[:50]), ("b", base), ("c", base + " — Naruto")]
+        self.assertEqual(scraper.dedupe(quotes), [("b", base)])
+
+
+class SiteRuleTests(SimpleTestCase):
+    def test_ranker_keeps_the_original_quote_openers(self):
+        rule = SITE_RULES["ranker.com"]
+        for text in ('"Believe it!"', "“Believe it!”", "'Believe it!'"):
+            self.assertTrue(rule.keep(text), text)
+        for text in ("‘Believe it!’", "«Believe it!»", "Believe it!"):
+            self.assertFalse(rule.keep(text), text)
+
+
+class KnownQuoteTests(TestCase):
+    stored = "Whatever happens, happens"
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.csv_path = Path(tmp.name) / "b.csv"
+        a = Character.objects.create(name="Spike")
+        self.b = Character.objects.create(name="Faye")
+        ScrapedQuote.objects.create(character=a, source_url="https://a.example/", quote=self.stored)
+
+    def clean(self, quote, safe):
+        with open(self.csv_path, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([["source_url", "quote"], ["https://b.example/", quote]])
+        with mock.patch.object(moderation, "safe_flags", side_effect=lambda qs: [safe] * len(qs)) as flags:
+            scraper.clean_dataset(self.csv_path, self.b)
+        return flags, list(ScrapedQuote.objects.filter(character=self.b).values_list("quote", flat=True))
+
+    def test_trailing_clause_is_moderated(self):
+        flags, kept = self.clean(self.stored + " — go kill yourself", safe=False)
+        self.assertEqual(flags.call_args.args[0], [self.stored + " — go kill yourself"])
+        self.assertEqual(kept, [])
+
+    def test_variant_of_a_stored_quote_reuses_the_stored_text(self):
+        flags, kept = self.clean("whatever happens... HAPPENS!", safe=False)
+        self.assertEqual(flags.call_args.args[0], [])
+        self.assertEqual(kept, [self.stored])
+        with open(self.csv_path, encoding="utf-8") as f:
+            self.assertEqual([row["quote"] for row in csv.DictReader(f)], [self.stored])
+
+
+class PageTrackerSaveTests(TestCase):
+    def test_one_row_per_canonical_url(self):
+        character = Character.objects.create(name="Yoda")
+        url = "https://a.example/quotes?" + "p=x&" * 400
+        for variant in (url, url.replace("https://", "https://m.") + "&utm_source=feed"):
+            tracker = PageTracker()
+            tracker.record(variant, "<p>hi</p>", quotes=2)
+            tracker.save(character)
+        self.assertEqual(ScrapedPage.objects.count(), 1)
+        page = ScrapedPage.objects.get()
+        self.assertEqual(len(page.url_hash), 40)
+        self.assertEqual(PageTracker.load("yoda").plan(url), "fresh")
+
+
+class ScrapeViewTests(TestCase):
+    def test_blank_name_is_not_queued(self):
+        response = self.client.post("/scrape/", {"character": "   "})
+        self.assertRedirects(response, "/", fetch_redirect_response=False)
+        self.assertFalse(Job.objects.exists())
+
+    def test_new_character_page_has_no_train_or_refresh(self):
+        response = self.client.post("/scrape/", {"character": "Goku"})
+        self.assertIsNone(response.context["character"])
+        self.assertNotContains(response, "Train Model")
+        self.assertNotContains(response, "Refresh Quotes")
+
+    def test_double_submit_follows_one_job(self):
+        first = self.client.post("/scrape/", {"character": "Goku"}).context["job"]
+        second = self.client.post("/scrape/", {"character": "Goku"}).context["job"]
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+
+# A fake infinite-scroll page for READY_JS: 10 items, and every scroll to the end
+# starts a slow XHR that appends 10 more, three times
+FAKE_PAGE_JS = r"""
+const [script, latency, quiet] = [require("fs").readFileSync(process.argv[2], "utf8"), +process.argv[3], +process.argv[4]];
+const items = [];
+const observers = [];
+let batches = 0, loading = false;
+function append(n) {
+  for (let i = 0; i < n; i++) items.push({scrollIntoView: maybeLoad});
+  observers.forEach(cb => cb([{addedNodes: [1]}]));
+}
+function maybeLoad() {
+  if (loading || batches >= 3) return;
+  loading = true;
+  const xhr = new XMLHttpRequest();
+  xhr.onload = () => { loading = false; batches++; append(10); };
+  xhr.send();
+}
+class XMLHttpRequest {
+  addEventListener(name, fn) { (this.listeners = this.listeners || []).push(fn); }
+  send() { setTimeout(() => { this.onload(); (this.listeners || []).forEach(fn => fn()); }, latency); }
+}
+global.XMLHttpRequest = XMLHttpRequest;
+global.window = {scrollBy() {}, scrollTo: maybeLoad};
+global.document = {readyState: "complete", documentElement: {}, body: {scrollHeight: 1000},
+                   querySelectorAll: () => items};
+global.MutationObserver = class { constructor(cb) { observers.push(cb); } observe() {} disconnect() {} };
+append(10);
+new Function(script).call(null, "q", quiet, 10000, 3000, result => console.log(JSON.stringify(result)));
+"""
+
+
+@skipUnless(shutil.which("node"), "needs node to run the page script")
+class PageReadyScriptTests(SimpleTestCase):
+    def run_script(self, latency_ms, quiet_ms):
+        with tempfile.TemporaryDirectory() as tmp:
+            script, page = Path(tmp) / "ready.js", Path(tmp) / "page.js"
+            script.write_text(READY_JS, encoding="utf-8")
+            page.write_text(FAKE_PAGE_JS, encoding="utf-8")
+            out = subprocess.run(["node", str(page), str(script), str(latency_ms), str(quiet_ms)],
+                                 capture_output=True, text=True, timeout=30, check=True).stdout
+        return json.loads(out)
+
+    def test_waits_for_lazy_loads_slower_than_the_quiet_window(self):
+        result = self.run_script(latency_ms=400, quiet_ms=200)
+        self.assertEqual(result["count"], 40)
+        self.assertFalse(result["timed_out"])
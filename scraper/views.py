@@ -1,26 +1,27 @@
 from django.shortcuts import redirect, render
 
 from scraper.models import Character
-from scraper.scrape_scripts.scraper_manager import ScraperManager
+from jobs.runner import enqueue
 
 # Create your views here.
 
 def scrape_character(request):
+    """Queue the scrape for `manage.py run_worker`; the page follows the job."""
     if request.method == "POST":
-        character_name = request.POST.get("character")
+        character_name = request.POST.get("character", "").strip()
+        refresh = request.POST.get("refresh") == "1"
+        if not character_name:
+            return redirect("home")
 
-        manager = ScraperManager(character_name=character_name)
-        scrape_time = manager.scrape()
+        job = enqueue("scrape", character=character_name, refresh=refresh)
 
-        character = Character.objects.get(name__iexact=character_name)
-        
-        quotes = character.scraped_quotes.all()
-
-        metrics = getattr(character, "scrape_metrics", None)
+        character = Character.objects.filter(name__iexact=character_name).first()
 
         return render(request, "scrape_results.html", {
             "character": character,
-            "quotes": quotes,
-            "metrics": metrics,
-            "scrape_time": scrape_time,
+            "character_name": character_name,
+            "quotes": character.scraped_quotes.all() if character else [],
+            "metrics": getattr(character, "scrape_metrics", None),
+            "job": job,
         })
+    return redirect("home")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from training.openAI.stub_server import make_server
+
+
+class Command(BaseCommand):
+    help = "Serve a local stand-in for the OpenAI endpoints used by the training pipeline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8787)
+        parser.add_argument("--batch-delay", type=float, default=1.0,
+                            help="Seconds a batch stays in_progress before it completes.")
+
+    def handle(self, *args, **options):
+        server = make_server(options["host"], options["port"], options["batch_delay"])
+        self.stdout.write(f"🧪 OpenAI stub on http://{options['host']}:{options['port']}/v1")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,136 @@
+"""
+OpenAI Batch API runner for bulk chat completions.
+
+Instead of one synchronous request per quote, every request goes into a
+single batch-input JSONL, uploaded with purpose="batch" and submitted as
+one batch job against /v1/chat/completions. The batch is polled until it
+ends, and its output (and error) files are merged back by custom_id, so
+callers get answers keyed the way they asked. A batch can run for hours:
+callers that must survive a restart persist the id returned by submit()
+and later hand it to collect() instead of submitting again. Batch requests are billed
+at a discount and don't count against the synchronous rate limits, at
+the price of latency (completion window up to 24h), so this is meant for
+overnight dataset preparation, not interactive runs.
+
+Point OPENAI_BASE_URL at training.openAI.stub_server to try it offline.
+"""
+
+import json
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+from jobs import progress
+
+ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+POLL_SECONDS = getattr(settings, "OPENAI_BATCH_POLL_SECONDS", 30)
+TIMEOUT_SECONDS = getattr(settings, "OPENAI_BATCH_TIMEOUT_SECONDS", 24 * 60 * 60)
+TERMINAL = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_request(custom_id, body):
+    return {"custom_id": custom_id, "method": "POST", "url": ENDPOINT, "body": body}
+
+
+def write_input(requests, path):
+    with open(path, "w", encoding="utf-8") as f:
+        for request in requests:
+            f.write(json.dumps(request, ensure_ascii=False) + "\n")
+    return Path(path)
+
+
+def parse_output(text):
+    """
+    {custom_id: {"content", "status_code", "error"}}; content is None where
+    the request failed, status_code None where it never got a response
+    (e.g. the batch expired first).
+    """
+    results = {}
+    for raw in text.splitlines():
+        if not raw.strip():
+            continue
+        record = json.loads(raw)
+        response = record.get("response") or {}
+        status_code = response.get("status_code")
+        if record.get("error") or status_code != 200:
+            error = record.get("error") or (response.get("body") or {}).get("error") or {}
+            results[record["custom_id"]] = {"content": None, "status_code": status_code,
+                                            "error": error.get("message") or str(error)}
+            continue
+        content = response["body"]["choices"][0]["message"]["content"].strip()
+        results[record["custom_id"]] = {"content": content, "status_code": status_code, "error": None}
+    return results
+
+
+def is_permanent(result):
+    """The request itself was rejected (4xx other than 408 / 429): resubmitting won't help."""
+    code = result["status_code"]
+    return code is not None and 400 <= code < 500 and code not in (408, 429)
+
+
+def submit(client, requests, metadata=None):
+    """Upload the batch-input JSONL and create the batch; returns the Batch."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_input(requests, Path(tmp) / "batch_input.jsonl")
+        with open(path, "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+    return client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=ENDPOINT,
+        completion_window=COMPLETION_WINDOW,
+        **({"metadata": metadata} if metadata else {}),
+    )
+
+
+def wait(client, batch, poll_seconds=None, timeout=None):
+    """Poll until the batch ends; returns the final Batch."""
+    poll_seconds = POLL_SECONDS if poll_seconds is None else poll_seconds
+    timeout = TIMEOUT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    while batch.status not in TERMINAL:
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Batch {batch.id} still {batch.status} after {timeout}s")
+        time.sleep(poll_seconds)
+        batch = client.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        if counts:
+            progress.report(done=counts.completed + counts.failed, total=counts.total,
+                            message=f"Batch {batch.id}: {batch.status}")
+    return batch
+
+
+def collect(client, batch_id, poll_seconds=None, timeout=None):
+    """
+    Wait for a submitted batch and return its parse_output results. Raises
+    RuntimeError if the whole batch failed; requests missing from the
+    output of an expired / cancelled batch are simply absent.
+    """
+    batch = wait(client, client.batches.retrieve(batch_id), poll_seconds=poll_seconds, timeout=timeout)
+    print(f"📦 Batch {batch.id} {batch.status}")
+    if batch.status == "failed":
+        raise RuntimeError(f"Batch {batch.id} failed: {batch.errors}")
+
+    results = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if file_id:
+            results.update(parse_output(client.files.content(file_id).text))
+    return results
+
+
+def run(client, requests, metadata=None, poll_seconds=None, timeout=None):
+    """
+    Submit requests as one batch and wait for it. Returns parse_output
+    results for every custom_id; requests missing from the output come
+    back as failed without a status code.
+    """
+    if not requests:
+        return {}
+    batch = submit(client, requests, metadata=metadata)
+    print(f"📦 Submitted batch {batch.id} with {len(requests)} requests")
+    results = {r["custom_id"]: {"content": None, "status_code": None, "error": "missing from batch output"}
+               for r in requests}
+    results.update(collect(client, batch.id, poll_seconds=poll_seconds, timeout=timeout))
+    return results
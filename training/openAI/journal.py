@@ -0,0 +1,115 @@
+"""
+Append-only journal of finished rewrite lines, so a crashed or killed run
+resumes instead of starting over.
+
+One JSON record per finished input line, appended and flushed as soon as
+the line is done (from any worker thread):
+
+    {"line": 12, "key": "<sha1 of the quote>", "entry": {...}}
+    {"line": 13, "key": "...", "skipped": "<error>"}
+
+"skipped" marks lines the API rejected outright (bad request), which a
+retry would not fix. Batch mode also journals the id of a submitted batch
+({"batch": "<id>"}, then {"batch": null} once its answers are in), so a
+rerun polls that batch instead of submitting and paying for it again. The key ties a record to the quote it was made for;
+if the input changed under the same line number the line is redone. A
+torn last record from a killed process is ignored on load.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+
+def line_key(data):
+    """Identity of an input line: its quote (the assistant message)."""
+    return hashlib.sha1(data["messages"][-1]["content"].encode("utf-8")).hexdigest()
+
+
+class RewriteJournal:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.records = {}
+        self.batch_id = None
+        self._lock = threading.Lock()
+        self._file = None
+
+    def load(self):
+        """Read existing records; returns how many lines were found."""
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for raw in f:
+                    try:
+                        record = json.loads(raw)
+                    except json.JSONDecodeError:
+                        continue
+                    if "batch" in record:
+                        self.batch_id = record["batch"]
+                    else:
+                        self.records[record["line"]] = record
+        return len(self.records)
+
+    def is_done(self, line, data):
+        record = self.records.get(line)
+        return record is not None and record["key"] == line_key(data)
+
+    def record(self, line, data, entry=None, skipped=None):
+        record = {"line": line, "key": line_key(data)}
+        if entry is not None:
+            record["entry"] = entry
+        else:
+            record["skipped"] = skipped
+        self._append(record)
+        with self._lock:
+            self.records[line] = record
+
+    def record_batch(self, batch_id):
+        """Remember the batch in flight (None once its answers are journaled)."""
+        self._append({"batch": batch_id})
+        self.batch_id = batch_id
+
+    def _append(self, record):
+        raw = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            if self._file is None:
+                self._file = self._open()
+            self._file.write(raw)
+            self._file.flush()
+
+    def _open(self):
+        torn = False
+        if self.path.exists() and self.path.stat().st_size:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+        f = open(self.path, "a", encoding="utf-8")
+        if torn:
+            # Don't glue the next record onto a torn one
+            f.write("\n")
+        return f
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def promote(self, lines, output_path):
+        """
+        Write the entries of lines (input order) to output_path via a temp
+        file and os.replace, then drop the journal.
+        """
+        output_path = Path(output_path)
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for line in lines:
+                entry = self.records[line].get("entry")
+                if entry is not None:
+                    f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, output_path)
+        self.close()
+        self.path.unlink(missing_ok=True)
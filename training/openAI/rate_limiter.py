@@ -0,0 +1,125 @@
+"""
+Client-side rate limiting for OpenAI chat calls made from worker threads.
+
+Two token buckets mirror the account limits: one for requests per minute,
+one for tokens per minute (a request is charged its prompt estimate plus
+max_tokens up front). On a 429 the limiter backs off adaptively:
+
+- the calling thread sleeps with jittered exponential backoff (at least
+  the server's Retry-After),
+- every thread pauses until that moment, so the pool doesn't keep firing
+  into the limit,
+- both bucket rates are halved (once per pause window), then recover a
+  little with each success.
+
+Transient failures (5xx, connection errors, timeouts) are retried with the
+same jittered backoff, on the calling thread only: they say nothing about
+the account limits, so neither the pool nor the rates are touched.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from openai import APIConnectionError, InternalServerError, RateLimitError
+
+from scraper.scrape_scripts.transport import TokenBucket, backoff_delay, parse_retry_after
+
+REQUESTS_PER_MINUTE = getattr(settings, "OPENAI_REQUESTS_PER_MINUTE", 500)
+TOKENS_PER_MINUTE = getattr(settings, "OPENAI_TOKENS_PER_MINUTE", 200_000)
+MAX_RETRIES = 6
+MIN_SCALE = 0.1       # never slow down below 10% of the configured rates
+RECOVERY_STEP = 0.05  # scale regained per successful call
+CHARS_PER_TOKEN = 4   # rough prompt-size estimate
+# APITimeoutError is an APIConnectionError
+TRANSIENT_ERRORS = (InternalServerError, APIConnectionError)
+
+
+def estimate_tokens(messages, max_tokens=0):
+    return sum(len(m["content"]) for m in messages) // CHARS_PER_TOKEN + max_tokens
+
+
+class RateLimiter:
+    def __init__(self, rpm=REQUESTS_PER_MINUTE, tpm=TOKENS_PER_MINUTE, max_retries=MAX_RETRIES):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm / 60, max(1, rpm / 60))
+        self.tokens = TokenBucket(tpm / 60, max(1, tpm / 60))
+        self.max_retries = max_retries
+        self.scale = 1.0
+        self.paused_until = 0.0
+        self.rate_limited = 0
+        self._lock = threading.Lock()
+
+    def _set_scale(self, scale):
+        self.scale = min(1.0, max(MIN_SCALE, scale))
+        self.requests.rate = self.rpm / 60 * self.scale
+        self.tokens.rate = self.tpm / 60 * self.scale
+
+    def _throttled(self, delay):
+        with self._lock:
+            self.rate_limited += 1
+            now = time.monotonic()
+            # The 429s of requests that were already in flight when the pool paused
+            # are the same overload: halve once per pause window, not once per thread
+            if now >= self.paused_until:
+                self._set_scale(self.scale / 2)
+            self.paused_until = max(self.paused_until, now + delay)
+
+    def _succeeded(self):
+        if self.scale < 1.0:
+            with self._lock:
+                self._set_scale(self.scale + RECOVERY_STEP)
+
+    def _wait_for_pause(self):
+        wait = self.paused_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def call(self, fn, cost=1):
+        """
+        fn() once the buckets allow it; 429s and transient errors are retried,
+        anything else raises. fn's client should not retry on its own
+        (max_retries=0), or its hidden retries bypass the buckets and the backoff.
+        """
+        attempt = 0
+        while True:
+            self._wait_for_pause()
+            self.requests.acquire()
+            self.tokens.acquire(cost)
+            try:
+                result = fn()
+            except RateLimitError as e:
+                if attempt >= self.max_retries:
+                    raise
+                headers = getattr(getattr(e, "response", None), "headers", {}) or {}
+                delay = backoff_delay(attempt, retry_after=parse_retry_after(headers.get("retry-after")))
+                self._throttled(delay)
+                time.sleep(delay)
+                attempt += 1
+                continue
+            except TRANSIENT_ERRORS:
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(backoff_delay(attempt))
+                attempt += 1
+                continue
+            self._succeeded()
+            return result
+
+    def stats(self):
+        with self._lock:
+            return {"rate_limited": self.rate_limited, "scale": round(self.scale, 2)}
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Process-wide limiter shared by every chat call against the account limits."""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
@@ -1,65 +1,210 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from openai import OpenAI
+from openai import BadRequestError, OpenAI
 from django.conf import settings
+
+from jobs import progress
+from . import batch
+from .journal import RewriteJournal, line_key
+from .rate_limiter import estimate_tokens, get_rate_limiter
 '''
     The objective of this script is to allow an openai model to read my json quotes and create
     converational dialogue that the model will interpret as a speaking pattern. This speaking
     pattern should resemble roughly the character the quotes are from which will allow us
     to "talk" to the character.
 '''
-client = OpenAI(api_key=settings.OPENAI_KEY)
+# Retries are the rate limiter's job (RateLimiter.call)
+client = OpenAI(api_key=settings.OPENAI_KEY, base_url=getattr(settings, "OPENAI_BASE_URL", None) or None,
+                max_retries=0)
+
+MODEL = "gpt-3.5-turbo"
+MAX_TOKENS = 200
+CONCURRENCY = getattr(settings, "REWRITE_CONCURRENCY", 8)  # requests in flight
+MODE = getattr(settings, "REWRITE_MODE", "sync")  # "sync" or "batch" (Batch API)
+
+SYSTEM_PROMPT = (
+    "You rewrite scraped quote data into natural chat form. "
+    "Keep the character's tone and remove all article or narration text. "
+    "Make each assistant reply sound like real dialogue."
+)
+
+
+def build_messages(data):
+    quote_text = " ".join(m["content"] for m in data["messages"])
+    char_name = data["messages"][0]["content"].split(",")[0]
+    prompt = f"Convert this into a realistic dialogue between a user and {char_name}:\n\n{quote_text}"
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def request_body(data):
+    """Chat completion parameters for one input line (sync call or batch request)."""
+    return {"model": MODEL, "messages": build_messages(data), "temperature": 0.7, "max_tokens": MAX_TOKENS}
+
+
+def to_entry(data, rewritten):
+    return {
+        "messages": [
+            {"role": "system", "content": data["messages"][0]["content"]},
+            {"role": "user", "content": "Let's talk!"},
+            {"role": "assistant", "content": rewritten},
+        ]
+    }
+
+
+def rewrite_line(data, limiter):
+    """The rewritten training entry for one input line."""
+    body = request_body(data)
+    resp = limiter.call(
+        lambda: client.chat.completions.create(**body),
+        cost=estimate_tokens(body["messages"], MAX_TOKENS),
+    )
+    return to_entry(data, resp.choices[0].message.content.strip())
+
+
+def rewrite_concurrently(todo, journal, concurrency=CONCURRENCY):
+    """Sync mode: up to `concurrency` requests in flight under the shared RPM / TPM limiter."""
+    limiter = get_rate_limiter()
+    limited_before = limiter.stats()["rate_limited"]
+    reporter = progress.current()
+
+    def work(item):
+        i, data = item
+        try:
+            entry = rewrite_line(data, limiter)
+        except BadRequestError as e:
+            # Rejected outright, a retry won't help
+            journal.record(i, data, skipped=str(e))
+            result = i, None, e
+        except Exception as e:
+            result = i, None, e
+        else:
+            journal.record(i, data, entry=entry)
+            result = i, entry, None
+        # Pool threads don't inherit the job context, report through the captured reporter
+        if reporter:
+            reporter.advance(rewrite_failed=int(result[1] is None))
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        for i, entry, error in pool.map(work, todo):
+            if entry is None:
+                print(f"⚠️ Skipped line {i} ({error})")
+            else:
+                print(f"✅ Rewrote line {i}")
+
+    rate_limited = limiter.stats()["rate_limited"] - limited_before
+    progress.report(rewrite_rate_limited=rate_limited)
+    print(f"⏳ {rate_limited} rate-limited retries")
+
+
+def batch_custom_id(i, data):
+    # The quote hash ties an answer to the line it was asked for, even if the input changed since
+    return f"line-{i}-{line_key(data)[:16]}"
+
+
+def merge_batch(results, todo, journal):
+    """Journal the answers a batch returned for todo; transient failures stay pending."""
+    for i, data in todo:
+        result = results.get(batch_custom_id(i, data))
+        if result is None:
+            continue
+        if result["content"] is not None:
+            journal.record(i, data, entry=to_entry(data, result["content"]))
+        elif batch.is_permanent(result):
+            # Rejected outright, resubmitting won't help
+            journal.record(i, data, skipped=result["error"])
+            print(f"⚠️ Skipped line {i} ({result['error']})")
+        else:
+            print(f"⚠️ Line {i} failed in batch ({result['error']}), left for the next run")
+
+
+def rewrite_batched(todo, journal):
+    """
+    Batch mode: the pending lines as one Batch API job, merged back by
+    custom_id. The batch id is journaled before waiting, so a rerun after a
+    crash or restart polls the same batch instead of paying for a new one.
+    """
+    if journal.batch_id:
+        print(f"↩️ Resuming batch {journal.batch_id}")
+        try:
+            results = batch.collect(client, journal.batch_id)
+        except RuntimeError:
+            # The batch failed as a whole; the next run submits a new one
+            journal.record_batch(None)
+            raise
+        merge_batch(results, todo, journal)
+        journal.record_batch(None)
+        todo = [(i, data) for i, data in todo if not journal.is_done(i, data)]
 
-def rewrite_dataset(input_path: str, output_path: str = None) -> Path:
+    if not todo:
+        return
+    requests = [batch.build_request(batch_custom_id(i, data), request_body(data)) for i, data in todo]
+    submitted = batch.submit(client, requests, metadata={"purpose": "rewrite"})
+    journal.record_batch(submitted.id)
+    print(f"📦 Submitted batch {submitted.id} with {len(requests)} requests")
+    try:
+        results = batch.collect(client, submitted.id)
+    except RuntimeError:
+        journal.record_batch(None)
+        raise
+    merge_batch(results, todo, journal)
+    journal.record_batch(None)
+
+
+def rewrite_dataset(input_path: str, output_path: str = None, concurrency: int = CONCURRENCY,
+                    mode: str = MODE) -> Path:
+    """
+    Rewrite every line, either with concurrent chat calls (mode="sync") or
+    as one Batch API job (mode="batch").
+
+    Finished lines go to <output>.journal as they complete, and a rerun
+    only sends the lines not in it. The output file is written (in input
+    order, atomically) only once every line is done, so its existence
+    means the dataset is complete. Lines that failed transiently make the
+    run raise; running it again resumes them.
+    """
+    if mode not in ("sync", "batch"):
+        raise ValueError(f"Unknown rewrite mode: {mode!r}")
     input_path = Path(input_path)
     if output_path is None:
         output_path = input_path.with_name(f"{input_path.stem}_rewritten.jsonl")
+    output_path = Path(output_path)
 
-    if Path(output_path).exists():
+    if output_path.exists():
         print(f"🛑 Rewritten dataset already exists → {output_path}, rewriting skipped")
-        return Path(output_path)
-
-    system_prompt = (
-        "You rewrite scraped quote data into natural chat form. "
-        "Keep the character's tone and remove all article or narration text. "
-        "Make each assistant reply sound like real dialogue."
-    )
+        return output_path
 
-    # Count before moderation
     with open(input_path, "r", encoding="utf-8") as f:
-        num_of_lines = len([line for line in f if line.strip()])
-
-    print(f"\n⏳ Starting rewriting process on {num_of_lines} quotes")
-    with open(input_path, "r", encoding="utf-8") as infile, \
-         open(output_path, "w", encoding="utf-8") as outfile:
-        for i, line in enumerate(infile, 1):
-            data = json.loads(line)
-            quote_text = " ".join(m["content"] for m in data["messages"])
-            char_name = data["messages"][0]["content"].split(",")[0]
-            prompt = f"Convert this into a realistic dialogue between a user and {char_name}:\n\n{quote_text}"
-
-            try:
-                resp = client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=[
-                        {"role": "system", "content": system_prompt},
-                        {"role": "user", "content": prompt},
-                    ],
-                    temperature=0.7,
-                    max_tokens=200,
-                )
-                rewritten = resp.choices[0].message.content.strip()
-                new_entry = {
-                    "messages": [
-                        {"role": "system", "content": data["messages"][0]["content"]},
-                        {"role": "user", "content": "Let's talk!"},
-                        {"role": "assistant", "content": rewritten},
-                    ]
-                }
-                outfile.write(json.dumps(new_entry, ensure_ascii=False) + "\n")
-                print(f"✅ Rewrote line {i}")
-            except Exception as e:
-                print(f"⚠️ Skipped line {i} ({e})")
+        lines = [json.loads(line) for line in f if line.strip()]
+    num_of_lines = len(lines)
+
+    journal = RewriteJournal(output_path.with_name(output_path.name + ".journal"))
+    if journal.load():
+        print(f"↩️ Resuming rewrite from {journal.path}")
+    todo = [(i, data) for i, data in enumerate(lines, 1) if not journal.is_done(i, data)]
+
+    print(f"\n⏳ Starting {mode} rewriting process on {len(todo)} of {num_of_lines} quotes")
+    progress.report("rewrite", done=num_of_lines - len(todo), total=num_of_lines,
+                    message="Rewriting quotes into dialogue", rewrite_resumed=num_of_lines - len(todo))
+    try:
+        if mode == "batch":
+            rewrite_batched(todo, journal)
+        else:
+            rewrite_concurrently(todo, journal, concurrency=concurrency)
+    finally:
+        journal.close()
 
+    missing = [i for i, data in enumerate(lines, 1) if not journal.is_done(i, data)]
+    progress.report(done=num_of_lines - len(missing))
+    if missing:
+        raise RuntimeError(
+            f"Rewrite incomplete: {len(missing)} of {num_of_lines} lines failed, "
+            f"run again to resume from {journal.path}"
+        )
+    journal.promote(range(1, num_of_lines + 1), output_path)
     print(f"\n✅ Rewriting complete → {output_path}")
     return output_path
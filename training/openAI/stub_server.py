@@ -0,0 +1,182 @@
+"""
+Local stand-in for the parts of the OpenAI API the training pipeline uses,
+so rewrite / batch mode can be exercised without a key or any spend:
+
+    python manage.py openai_stub --port 8787
+    OPENAI_BASE_URL=http://127.0.0.1:8787/v1
+
+Served endpoints (in-memory, nothing persists):
+- POST /v1/chat/completions  echoes the last message back
+- POST /v1/moderations       never flags
+- POST /v1/files, GET /v1/files/<id>/content
+- POST /v1/batches, GET /v1/batches/<id>; a batch stays in_progress for
+  batch_delay seconds, then completes with one echoed reply per request.
+  Requests whose last message contains FAIL_MARKER fail (error file), and
+  ones containing REJECT_MARKER get a 400 response, to exercise both paths.
+"""
+
+import itertools
+import json
+import re
+import threading
+import time
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FAIL_MARKER = "[stub-fail]"
+REJECT_MARKER = "[stub-400]"
+
+_ids = itertools.count(1)
+
+
+def new_id(prefix):
+    return f"{prefix}_stub{next(_ids)}"
+
+
+def echo(body):
+    text = body["messages"][-1]["content"]
+    return f"Stub reply to: ...{text[-80:]}"
+
+
+def completion(body):
+    return {
+        "id": new_id("chatcmpl"),
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "finish_reason": "stop",
+                     "message": {"role": "assistant", "content": echo(body)}}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+class StubState:
+    def __init__(self, batch_delay=1.0):
+        self.batch_delay = batch_delay
+        self.files = {}    # id -> (purpose, filename, bytes)
+        self.batches = {}  # id -> (monotonic start, batch dict)
+        self.lock = threading.Lock()
+
+    def add_file(self, purpose, filename, content):
+        file_id = new_id("file")
+        with self.lock:
+            self.files[file_id] = (purpose, filename, content)
+        return {"id": file_id, "object": "file", "bytes": len(content), "created_at": int(time.time()),
+                "filename": filename, "purpose": purpose, "status": "processed"}
+
+    def create_batch(self, params):
+        batch_id = new_id("batch")
+        requests = self.files[params["input_file_id"]][2].decode("utf-8").splitlines()
+        batch = {
+            "id": batch_id, "object": "batch", "endpoint": params["endpoint"],
+            "input_file_id": params["input_file_id"], "completion_window": params["completion_window"],
+            "status": "in_progress", "created_at": int(time.time()), "metadata": params.get("metadata"),
+            "output_file_id": None, "error_file_id": None, "errors": None,
+            "request_counts": {"total": len([r for r in requests if r.strip()]), "completed": 0, "failed": 0},
+        }
+        with self.lock:
+            self.batches[batch_id] = (time.monotonic(), batch)
+        return batch
+
+    def get_batch(self, batch_id):
+        with self.lock:
+            started, batch = self.batches[batch_id]
+        if batch["status"] == "in_progress" and time.monotonic() - started >= self.batch_delay:
+            self._complete(batch)
+        return batch
+
+    def _complete(self, batch):
+        output, errors = [], []
+        for raw in self.files[batch["input_file_id"]][2].decode("utf-8").splitlines():
+            if not raw.strip():
+                continue
+            request = json.loads(raw)
+            content = request["body"]["messages"][-1]["content"]
+            if FAIL_MARKER in content:
+                errors.append({"id": new_id("batch_req"), "custom_id": request["custom_id"], "response": None,
+                               "error": {"code": "stub_failure", "message": "Failed on purpose"}})
+            elif REJECT_MARKER in content:
+                output.append({"id": new_id("batch_req"), "custom_id": request["custom_id"], "error": None,
+                               "response": {"status_code": 400, "request_id": new_id("req"), "body": {
+                                   "error": {"type": "invalid_request_error", "message": "Rejected on purpose"}}}})
+            else:
+                output.append({"id": new_id("batch_req"), "custom_id": request["custom_id"], "error": None,
+                               "response": {"status_code": 200, "request_id": new_id("req"),
+                                            "body": completion(request["body"])}})
+        # Real batch output is not in input order; reversed, callers have to merge by custom_id
+        output.reverse()
+        output_file = self.add_file("batch_output", "output.jsonl", _jsonl(output)) if output else None
+        error_file = self.add_file("batch_output", "errors.jsonl", _jsonl(errors)) if errors else None
+        with self.lock:
+            batch["output_file_id"] = output_file and output_file["id"]
+            batch["error_file_id"] = error_file and error_file["id"]
+            batch["request_counts"].update(completed=len(output), failed=len(errors))
+            batch["status"] = "completed"
+            batch["completed_at"] = int(time.time())
+
+
+def _jsonl(records):
+    return "".join(json.dumps(r) + "\n" for r in records).encode("utf-8")
+
+
+def parse_multipart(content_type, body):
+    """{field name: (filename or None, bytes)} of a multipart/form-data body."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+    )
+    return {
+        part.get_param("name", header="content-disposition"): (part.get_filename(), part.get_payload(decode=True))
+        for part in message.iter_parts()
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None  # set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, payload, content_type="application/json"):
+        data = payload if isinstance(payload, bytes) else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def do_POST(self):
+        body = self._body()
+        if self.path == "/v1/chat/completions":
+            return self._send(200, completion(json.loads(body)))
+        if self.path == "/v1/moderations":
+            inputs = json.loads(body)["input"]
+            inputs = inputs if isinstance(inputs, list) else [inputs]
+            return self._send(200, {"id": new_id("modr"), "model": "stub-moderation", "results": [
+                {"flagged": False, "categories": {}, "category_scores": {}} for _ in inputs
+            ]})
+        if self.path == "/v1/files":
+            fields = parse_multipart(self.headers["Content-Type"], body)
+            filename, content = fields["file"]
+            purpose = fields["purpose"][1].decode("utf-8")
+            return self._send(200, self.state.add_file(purpose, filename or "upload.jsonl", content))
+        if self.path == "/v1/batches":
+            return self._send(200, self.state.create_batch(json.loads(body)))
+        self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+    def do_GET(self):
+        m = re.fullmatch(r"/v1/files/([\w-]+)/content", self.path)
+        if m and m.group(1) in self.state.files:
+            return self._send(200, self.state.files[m.group(1)][2], "application/jsonl")
+        m = re.fullmatch(r"/v1/batches/([\w-]+)", self.path)
+        if m and m.group(1) in self.state.batches:
+            return self._send(200, self.state.get_batch(m.group(1)))
+        self._send(404, {"error": {"message": f"Unknown endpoint {self.path}"}})
+
+
+def make_server(host="127.0.0.1", port=8787, batch_delay=1.0):
+    handler = type("BoundStubHandler", (StubHandler,), {"state": StubState(batch_delay)})
+    return ThreadingHTTPServer((host, port), handler)
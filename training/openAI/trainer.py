@@ -8,10 +8,13 @@ from openai import OpenAI
 
 from django.conf import settings
 
+from jobs import progress
 from scraper.models import Character
 from training.models import TrainedModel
 from analytics.models import RewrittenQuote
 
+from scraper.scrape_scripts import moderation
+from scraper.scrape_scripts.bulk_writer import BulkWriter
 from . import rewriter
 
 APP_DIR = Path(__file__).resolve().parent.parent
@@ -19,7 +22,7 @@ DATASET_DIR = APP_DIR / "datasets"
 DATASET_DIR.mkdir(exist_ok=True)
 
 # Initialize client (reads key from OPENAI_API_KEY env variable)
-client = OpenAI(api_key=settings.OPENAI_KEY)
+client = OpenAI(api_key=settings.OPENAI_KEY, base_url=getattr(settings, "OPENAI_BASE_URL", None) or None)
 
 
 def generate_user_prompt(character: str, quote: str) -> str:
@@ -107,28 +110,28 @@ def moderation_check(jsonl_path: str, safe_jsonl: str):
 
     rewritten_quotes_buffer = []
 
-    with open(jsonl_path, "r", encoding="utf-8") as infile, \
-         open(safe_jsonl, "w", encoding="utf-8") as outfile:
-        for i, line in enumerate(infile, 1):
-            data = json.loads(line)
-            msgs = data.get("messages", [])
-            text = " ".join(m.get("content", "") for m in msgs)
-            result = client.moderations.create(
-                model="omni-moderation-latest",
-                input=text
-            )
-            if not result.results[0].flagged:
+    with open(jsonl_path, "r", encoding="utf-8") as infile:
+        lines = [line for line in infile if line.strip()]
+    messages = [json.loads(line).get("messages", []) for line in lines]
+
+    # Batched, and cached verdicts (e.g. from a previous training run) cost no request
+    verdicts = moderation.moderate([" ".join(m.get("content", "") for m in msgs) for msgs in messages])
+
+    with open(safe_jsonl, "w", encoding="utf-8") as outfile:
+        for i, (line, msgs, verdict) in enumerate(zip(lines, messages, verdicts), 1):
+            if verdict is not None and not verdict["flagged"]:
                 outfile.write(line)
                 original = msgs[0]["content"]
                 rewritten = msgs[-1]["content"]
                 rewritten_quotes_buffer.append((original, rewritten))
+            elif verdict is None:
+                print(f"⚠️ Line {i} removed, moderation check failed")
             else:
-                cats = result.results[0].categories
                 print(f"⚠️ Line {i} removed due to moderation flag:")
-                for cat, value in cats.model_dump().items():
-                    if value:
-                        print(f"   - {cat}")
+                for cat in verdict["categories"]:
+                    print(f"   - {cat}")
     # Create fine tuning job file.
+    progress.report("upload", message="Uploading training file")
     with open(safe_jsonl, "rb") as f:
         return client.files.create(file=f, purpose="fine-tune"), rewritten_quotes_buffer
 
@@ -201,6 +204,7 @@ def train(csv_path: str, character_name: str):
         dataset_size_kb = round(Path(safe_jsonl).stat().st_size / 1024, 2)
 
     # ---- Same for both branches below ----
+    progress.report("fine-tune", message="Starting fine-tune job", quotes_used=safe_count, quotes_removed=removed_count)
 
     job = client.fine_tuning.jobs.create(
         training_file=file_obj.id,
@@ -225,17 +229,20 @@ def train(csv_path: str, character_name: str):
         trained_model.training_status = job.status
         trained_model.save(update_fields=["job_id", "training_status"])
 
-    for original, rewritten in rewritten_quotes_buffer:
-        RewrittenQuote.objects.create(
-            character=character,
-            original_quote=original,
-            rewritten_quote=rewritten,
-            trained_model=trained_model
-        )
+    with BulkWriter(RewrittenQuote) as writer:
+        for original, rewritten in rewritten_quotes_buffer:
+            writer.add(
+                character=character,
+                original_quote=original,
+                rewritten_quote=rewritten,
+                trained_model=trained_model
+            )
+    print(f"✅ Saved {writer.rows} rewritten quotes in {writer.seconds:.2f}s ({writer.rows_per_second} rows/s)")
 
     return {
         "job": job,
         "total_quotes_used": safe_count,
         "quotes_removed": removed_count,
         "dataset_size_kb": dataset_size_kb,
+        "db_write": writer.stats(),
     }
\ No newline at end of file
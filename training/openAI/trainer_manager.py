@@ -1,6 +1,7 @@
 from django.utils import timezone
 from analytics.models import TrainingMetrics
 from scraper.models import Character
+from scraper.scrape_scripts import run_stats
 from training.models import TrainedModel
 from . import trainer
 
@@ -21,7 +22,9 @@ class TrainerManager:
             return None
         
         print(f"⏳ Tuning GPT model on conversational dataset")
-        result = trainer.train(csv_path, character_name)
+        # Count this run's moderation requests apart from jobs running alongside it
+        with run_stats.collecting() as stats:
+            result = trainer.train(csv_path, character_name)
         job = result["job"]
         rewritten_preview = result.get("rewritten_preview", [])
 
@@ -38,6 +41,11 @@ class TrainerManager:
         metrics.total_quotes_used = result["total_quotes_used"]
         metrics.quotes_removed = result["quotes_removed"]
         metrics.dataset_size_kb = result["dataset_size_kb"]
+        metrics.db_rows_written = result["db_write"]["rows"]
+        metrics.db_write_seconds = result["db_write"]["seconds"]
+        metrics.db_rows_per_second = result["db_write"]["rows_per_second"]
+        metrics.moderation_requests = stats.get("moderation.requests")
+        metrics.moderation_requests_saved = stats.get("moderation.requests_saved")
         metrics.fine_tune_start = timezone.now()
         metrics.job_status = job.status
         metrics.save()
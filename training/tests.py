@@ -1,3 +1,265 @@
-from django.test import TestCase
+import json
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import httpx
+from django.test import SimpleTestCase, TestCase
+from openai import APITimeoutError, BadRequestError, InternalServerError, OpenAI
+
+from jobs.models import Job
+from scraper.models import Character
+from training.openAI import batch, rewriter
+from training.openAI.journal import RewriteJournal
+from training.openAI import rate_limiter
+from training.openAI.rate_limiter import RateLimiter
+from training.openAI.stub_server import FAIL_MARKER, REJECT_MARKER, make_server
+
+
+def write_input(path, quotes):
+    with open(path, "w", encoding="utf-8") as f:
+        for quote in quotes:
+            f.write(json.dumps({"messages": [
+                {"role": "system", "content": "Goku, a saiyan"},
+                {"role": "user", "content": "hi"},
+                {"role": "assistant", "content": quote},
+            ]}) + "\n")
+
+
+def line(quote):
+    return {"messages": [{"role": "system", "content": "Goku, a saiyan"}, {"role": "assistant", "content": quote}]}
+
+
+def read_replies(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["messages"][-1]["content"] for line in f]
+
+
+class StubServerTestCase(SimpleTestCase):
+    """Runs training.openAI.stub_server on a free port for the test class."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = make_server(port=0, batch_delay=0.1)
+        cls.state = cls.server.RequestHandlerClass.state
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        host, port = cls.server.server_address
+        cls.api = OpenAI(api_key="test", base_url=f"http://{host}:{port}/v1", max_retries=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+
+class BatchRunTests(StubServerTestCase):
+    def test_results_merge_back_by_custom_id(self):
+        requests = [
+            batch.build_request(f"q-{i}", {"model": "m", "messages": [{"role": "user", "content": text}]})
+            for i, text in enumerate(["first", f"second {FAIL_MARKER}", f"third {REJECT_MARKER}", "fourth"])
+        ]
+        results = batch.run(self.api, requests, poll_seconds=0.05)
+
+        self.assertEqual(set(results), {"q-0", "q-1", "q-2", "q-3"})
+        self.assertTrue(results["q-0"]["content"].endswith("first"))
+        self.assertTrue(results["q-3"]["content"].endswith("fourth"))
+        self.assertIsNone(results["q-1"]["content"])
+        self.assertFalse(batch.is_permanent(results["q-1"]))
+        self.assertEqual(results["q-2"]["status_code"], 400)
+        self.assertTrue(batch.is_permanent(results["q-2"]))
+
+
+@mock.patch.object(batch, "POLL_SECONDS", 0.05)
+class BatchRewriteTests(StubServerTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(rewriter, "client", self.api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.input = self.tmp / "goku_auto.jsonl"
+        self.output = self.tmp / "goku_rewritten.jsonl"
+
+    def test_rejected_line_is_skipped_and_run_completes(self):
+        write_input(self.input, ["q0", f"q1 {REJECT_MARKER}", "q2"])
+        rewriter.rewrite_dataset(self.input, self.output, mode="batch")
+        replies = read_replies(self.output)
+        self.assertEqual(len(replies), 2)
+        self.assertTrue(replies[0].endswith("q0"))
+        self.assertTrue(replies[1].endswith("q2"))
+
+    def test_crash_while_waiting_resumes_the_same_batch(self):
+        write_input(self.input, [f"q{i}" for i in range(5)])
+        with mock.patch.object(batch, "collect", side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                rewriter.rewrite_dataset(self.input, self.output, mode="batch")
+        self.assertFalse(self.output.exists())
+        batches_before = len(self.state.batches)
+
+        with mock.patch.object(batch, "submit", wraps=batch.submit) as submit:
+            rewriter.rewrite_dataset(self.input, self.output, mode="batch")
+        submit.assert_not_called()
+        self.assertEqual(len(self.state.batches), batches_before)
+        replies = read_replies(self.output)
+        self.assertEqual(len(replies), 5)
+        self.assertTrue(all(r.endswith(f"q{i}") for i, r in enumerate(replies)))
+
+    def test_transient_failure_is_resubmitted_on_the_next_run(self):
+        write_input(self.input, ["q0", f"q1 {FAIL_MARKER}"])
+        with self.assertRaises(RuntimeError):
+            rewriter.rewrite_dataset(self.input, self.output, mode="batch")
+        self.assertFalse(self.output.exists())
+
+        write_input(self.input, ["q0", "q1"])
+        with mock.patch.object(batch, "submit", wraps=batch.submit) as submit:
+            rewriter.rewrite_dataset(self.input, self.output, mode="batch")
+        self.assertEqual(len(submit.call_args.args[1]), 1)
+        self.assertEqual(len(read_replies(self.output)), 2)
+
+
+class RateLimiterTests(SimpleTestCase):
+    request = httpx.Request("POST", "http://stub/v1/chat/completions")
+
+    def error(self, cls, status):
+        return cls("boom", response=httpx.Response(status, request=self.request), body=None)
+
+    def flaky(self, *errors):
+        calls = []
+
+        def fn():
+            calls.append(1)
+            if len(calls) <= len(errors):
+                raise errors[len(calls) - 1]
+            return "ok"
+        return fn, calls
+
+    @mock.patch.object(rate_limiter.time, "sleep")
+    def test_transient_errors_are_retried(self, sleep):
+        limiter = RateLimiter(rpm=6000, tpm=600_000, max_retries=3)
+        fn, calls = self.flaky(self.error(InternalServerError, 502), APITimeoutError(request=self.request))
+        self.assertEqual(limiter.call(fn), "ok")
+        self.assertEqual(len(calls), 3)
+        self.assertEqual(sleep.call_count, 2)
+        # Not a rate limit: the shared rates stay where they were
+        self.assertEqual(limiter.stats(), {"rate_limited": 0, "scale": 1.0})
+
+    @mock.patch.object(rate_limiter.time, "sleep")
+    def test_gives_up_after_max_retries(self, sleep):
+        limiter = RateLimiter(rpm=6000, tpm=600_000, max_retries=1)
+        fn, calls = self.flaky(*[self.error(InternalServerError, 500)] * 3)
+        with self.assertRaises(InternalServerError):
+            limiter.call(fn)
+        self.assertEqual(len(calls), 2)
+
+    def test_bad_request_is_not_retried(self):
+        fn, calls = self.flaky(self.error(BadRequestError, 400))
+        with self.assertRaises(BadRequestError):
+            RateLimiter(rpm=6000, tpm=600_000).call(fn)
+        self.assertEqual(len(calls), 1)
+
+    def test_halves_once_per_pause_window(self):
+        limiter = RateLimiter(rpm=600, tpm=60_000)
+        for _ in range(4):
+            limiter._throttled(30)
+        self.assertEqual(limiter.stats(), {"rate_limited": 4, "scale": 0.5})
+
+        limiter.paused_until = 0.0
+        limiter._throttled(30)
+        self.assertEqual(limiter.stats()["scale"], 0.25)
+
+
+class JournalTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "out.jsonl.journal"
+
+    def test_torn_last_record_is_ignored_and_not_glued_to(self):
+        journal = RewriteJournal(self.path)
+        journal.record(1, line("q1"), entry={"n": 1})
+        journal.close()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"line": 2, "key": "ab')  # killed mid-write
+
+        journal = RewriteJournal(self.path)
+        self.assertEqual(journal.load(), 1)
+        journal.record(2, line("q2"), entry={"n": 2})
+        journal.close()
+
+        journal = RewriteJournal(self.path)
+        self.assertEqual(journal.load(), 2)
+        self.assertTrue(journal.is_done(2, line("q2")))
+
+    def test_changed_input_line_is_not_done(self):
+        journal = RewriteJournal(self.path)
+        journal.record(1, line("q1"), entry={"n": 1})
+        self.assertTrue(journal.is_done(1, line("q1")))
+        self.assertFalse(journal.is_done(1, line("q1, edited")))
+        journal.close()
+
+
+class SyncRewriteTests(StubServerTestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(rewriter, "client", self.api)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.input = self.tmp / "goku_auto.jsonl"
+        self.output = self.tmp / "goku_rewritten.jsonl"
+
+    def flaky(self, failing):
+        """rewrite_line that raises a transient error for the quotes in failing."""
+        real = rewriter.rewrite_line
+
+        def rewrite_line(data, limiter):
+            if data["messages"][-1]["content"] in failing:
+                raise ConnectionError("connection reset")
+            return real(data, limiter)
+        return mock.patch.object(rewriter, "rewrite_line", side_effect=rewrite_line)
+
+    def test_transient_failure_raises_and_output_waits_for_every_line(self):
+        write_input(self.input, ["q0", "q1", "q2"])
+        with self.flaky({"q1"}), self.assertRaises(RuntimeError):
+            rewriter.rewrite_dataset(self.input, self.output, mode="sync", concurrency=2)
+        self.assertFalse(self.output.exists())
+        journal = self.output.with_name(self.output.name + ".journal")
+        self.assertTrue(journal.exists())
+
+        with mock.patch.object(rewriter, "rewrite_line", wraps=rewriter.rewrite_line) as rewrite_line:
+            rewriter.rewrite_dataset(self.input, self.output, mode="sync")
+        self.assertEqual(rewrite_line.call_count, 1)
+        self.assertFalse(journal.exists())
+        replies = read_replies(self.output)
+        self.assertEqual(len(replies), 3)
+        self.assertTrue(all(r.endswith(f"q{i}") for i, r in enumerate(replies)))
+
+    def test_changed_input_line_is_redone(self):
+        write_input(self.input, ["q0", "q1"])
+        with self.flaky({"q1"}), self.assertRaises(RuntimeError):
+            rewriter.rewrite_dataset(self.input, self.output, mode="sync")
+
+        write_input(self.input, ["q0 edited", "q1"])
+        with mock.patch.object(rewriter, "rewrite_line", wraps=rewriter.rewrite_line) as rewrite_line:
+            rewriter.rewrite_dataset(self.input, self.output, mode="sync")
+        self.assertEqual(rewrite_line.call_count, 2)
+        self.assertTrue(read_replies(self.output)[0].endswith("q0 edited"))
+
+
+class TrainViewTests(TestCase):
+    def test_get_does_not_queue_a_run(self):
+        Character.objects.create(name="Goku", dataset_path="goku.csv")
+        self.assertEqual(self.client.get("/train/", {"character": "Goku"}).status_code, 405)
+        self.assertFalse(Job.objects.exists())
+
+    def test_post_needs_csrf(self):
+        Character.objects.create(name="Goku", dataset_path="goku.csv")
+        client = self.client_class(enforce_csrf_checks=True)
+        self.assertEqual(client.post("/train/", {"character": "Goku"}).status_code, 403)
+        self.assertFalse(Job.objects.exists())
@@ -4,6 +4,7 @@ from django.conf import settings
 from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
 from openai import InvalidWebhookSignatureError, OpenAI
 
 from analytics.models import RewrittenQuote
@@ -11,19 +12,20 @@ from scraper.models import Character
 from chat.models import ChatSession
 
 from training.models import TrainedModel
-from training.openAI.trainer_manager import TrainerManager
+from jobs.runner import enqueue
 
 # Create your views here.
 
+@require_POST
 def train_model(request):
-    character_name = request.GET.get("character")
+    """Queue a (paid) fine-tune run; POST only, so a link prefetch or reload can't start one."""
+    character_name = request.POST.get("character")
 
     try:
         character = Character.objects.get(name=character_name)
 
-        # Always run training (same structure, just cleaned)
-        manager = TrainerManager(character)
-        model, metrics = manager.train_model()
+        # Fine-tune upload is not idempotent: a crashed run is not retried
+        job = enqueue("train", max_attempts=1, character=character.name)
 
         # NEW: rewritten quotes must always come from DB
         rewritten_quotes = RewrittenQuote.objects.filter(
@@ -32,9 +34,8 @@ def train_model(request):
 
         return render(request, "model.html", {
             "character": character,
-            "model": model,
-            "metrics": metrics,
             "rewritten_quotes": rewritten_quotes,
+            "job": job,
         })
 
     except Character.DoesNotExist: